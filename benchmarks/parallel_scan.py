@@ -0,0 +1,68 @@
+"""
+Compares queries that are scanned in parallel with the single threaded scan, to find the collection size from which
+`--parallel-scan-threshold` pays off on this machine.
+
+The first parallel query of a collection packs its columns into shared memory, later queries of the same collection
+only send the names of the blocks to the workers, so both are measured.
+
+    python benchmarks/parallel_scan.py
+"""
+
+import time
+import typing as t
+
+from data_server.core.data_controller import DataController
+from data_server.core.parallel_scan import available_cpu_count
+
+SIZES = (10_000, 30_000, 100_000, 300_000, 1_000_000)
+QUERY = {'group': 3, 'sort_by': 'name', 'size': 20}
+
+
+def make_items(count: int) -> t.List[t.Dict[str, t.Any]]:
+    # names are mixed with None, which keeps the query off the NumPy path
+    return [{'id': id, 'group': id % 7, 'name': f'name-{(id * 37) % 1009}' if id % 11 else None} for id in range(count)]
+
+
+def time_query(controller: DataController) -> float:
+    start = time.perf_counter()
+    controller.get_items(['items'], **QUERY)
+    return time.perf_counter() - start
+
+
+def measure(size: int, workers: int) -> t.Tuple[float, float, float]:
+    data = {'items': make_items(size)}
+    serial = DataController(data)
+    parallel = DataController(data, parallel_scan_threshold=1, parallel_scan_workers=workers)
+    try:
+        # starts the pool, so only packing the columns is measured below
+        parallel.get_items(['items'], **QUERY, id=-1)
+        first = time_query(parallel)
+        repeated = min(time_query(parallel) for _ in range(3))
+        return min(time_query(serial) for _ in range(3)), first, repeated
+    finally:
+        parallel.close()
+
+
+def main() -> None:
+    workers = max(available_cpu_count(), 2)
+    print(f'{workers} workers')
+    print(f'{"items":>10} {"serial":>10} {"first":>10} {"repeated":>10}  (milliseconds per query)')
+    timings = []
+    for size in SIZES:
+        serial, first, repeated = measure(size, workers)
+        print(f'{size:>10} {serial * 1000:>10.1f} {first * 1000:>10.1f} {repeated * 1000:>10.1f}')
+        timings.append((size, repeated < serial))
+    # the smallest size from which every larger collection is scanned faster in parallel
+    break_even = None
+    for size, faster in reversed(timings):
+        if not faster:
+            break
+        break_even = size
+    if break_even is None:
+        print('parallel scans are not faster than the single threaded scan on this machine')
+    else:
+        print(f'parallel scans pay off from about {break_even} items: --parallel-scan-threshold {break_even}')
+
+
+if __name__ == '__main__':
+    main()
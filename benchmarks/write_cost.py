@@ -0,0 +1,45 @@
+"""
+Measures the cost of a write against the size of the collection it changes.
+
+Every write publishes a new version of the collection, which copies its list of items, so a write takes time
+proportional to the size of the collection. Finding the item by id scans the collection as well.
+
+    python benchmarks/write_cost.py
+"""
+
+import time
+import typing as t
+
+from data_server.core.data_controller import DataController
+
+SIZES = (1_000, 10_000, 100_000, 1_000_000)
+
+
+def time_writes(write: t.Callable[[int], t.Any], repeat: int) -> float:
+    start = time.perf_counter()
+    for index in range(repeat):
+        write(index)
+    return (time.perf_counter() - start) / repeat
+
+
+def measure(size: int) -> t.Tuple[float, float, float, float]:
+    items = [{'id': id, 'title': 'Emma'} for id in range(size)]
+    controller = DataController({'books': items})
+    repeat = max(5, 100_000 // size)
+    add = time_writes(lambda index: controller.add_item(['books'], {'id': size + index}), repeat)
+    # the last item is the slowest one to find
+    patch = time_writes(lambda index: controller.patch_item(['books'], size - 1, {'title': 'Ulysses'}), repeat)
+    delete = time_writes(lambda index: controller.delete_item(['books'], size + index), repeat)
+    copy = time_writes(lambda index: items.copy(), repeat)
+    return add, patch, delete, copy
+
+
+def main() -> None:
+    print(f'{"items":>10} {"add":>10} {"patch":>10} {"delete":>10} {"list copy":>10}  (milliseconds per write)')
+    for size in SIZES:
+        timings = ' '.join(f'{timing * 1000:>10.3f}' for timing in measure(size))
+        print(f'{size:>10} {timings}')
+
+
+if __name__ == '__main__':
+    main()
@@ -1,3 +1,6 @@
+import logging
+
+import data_server.data_server_types as dt
 from data_server.argument_parser import ArgumentParser
 from data_server.core.data_router import DataRouter
 from data_server.core.server import Server
@@ -7,13 +10,18 @@ from data_server.errors import DataServerError
 def create_server() -> Server:
     parser = ArgumentParser(
         'Data Server',
-        'Spin up a full fake REST API with no coding in less than 3 ' 'seconds using JSON , CSV file as the source.',
+        'Spin up a full fake REST API with no coding in less than 3 seconds using JSON , CSV file as the source.',
     )
 
     arguments = parser.get_parsed_arguments()
+    if not arguments['disable_logs']:
+        # shows startup reports, such as the memory saved by --intern-strings
+        logging.basicConfig(format='%(message)s')
+        logging.getLogger('data_server').setLevel(logging.INFO)
 
     request_handler = DataRouter(
         arguments['file'],
+        resource_type=dt.ResourceType.SQLITE_FILE if arguments['sqlite'] else None,
         id_name=arguments['id_name'],
         sort_key_param_name=arguments['sort_param_name'],
         order_param_name=arguments['order_param_name'],
@@ -24,6 +32,38 @@ def create_server() -> Server:
         created_at_key_name=arguments['created_at_key_name'],
         updated_at_key_name=arguments['updated_at_key_name'],
         default_page_size=arguments['page_size'],
+        parallel_scan_threshold=arguments['parallel_scan_threshold'],
+        vectorized_query_threshold=arguments['vectorized_query_threshold'],
+        flush_interval=arguments['flush_interval'],
+        flush_after_changes=arguments['flush_after_changes'],
+        fsync_saves=arguments['fsync_saves'],
+        write_ahead_log=arguments['write_ahead_log'],
+        wal_fsync=arguments['wal_fsync'],
+        wal_compact_after=arguments['wal_compact_after'],
+        compact_records=arguments['compact_records'],
+        intern_strings=arguments['intern_strings'],
+        startup_cache=arguments['startup_cache'],
+        compression_level=arguments['compression_level'],
+        watch_interval=arguments['watch_interval'],
+        json_codec=arguments['json_codec'],
+        compact_json=arguments['compact_json'],
+        json_options={
+            'streaming': arguments['json_streaming'],
+            'lazy': arguments['json_lazy'],
+            'lazy_cache_size': arguments['json_lazy_cache_size'],
+        },
+        sqlite_options={
+            'wal_mode': arguments['sqlite_wal_mode'],
+            'auto_index': arguments['sqlite_auto_index'],
+        },
+        csv_options={
+            'columnar': arguments['csv_columnar'],
+            'infer_types': arguments['csv_infer_types'],
+            'schema_file': arguments['csv_schema'],
+            'schema_sample_size': arguments['csv_schema_sample_size'],
+            'lazy': arguments['csv_lazy'],
+            'parallel_read_threshold': arguments['csv_parallel_read_threshold'],
+        },
     )
 
     server = Server(
@@ -38,6 +78,7 @@ def create_server() -> Server:
         additional_headers=arguments['additional_headers'],
         sleep_before_request=arguments['sleep_before_request'],
         extra_files=[arguments['file']],
+        json_codec=arguments['json_codec'],
     )
 
     return server
@@ -35,11 +35,18 @@ class ArgumentParser:
         )
         self._add_server_arguments()
         self._add_controller_arguments()
+        self._add_adapter_arguments()
         self._add_hidden_arguments()
         self.parsed_args = self._arg_parser.parse_args(self.arguments)
 
     def _add_server_arguments(self) -> None:
-        self._arg_parser.add_argument('file', help='The path of a json or csv file to serve')
+        self._arg_parser.add_argument(
+            'file',
+            help=(
+                'The path of a json, json lines, csv or sqlite file to serve, or of a directory whose files are each '
+                'served as a collection'
+            ),
+        )
         self._arg_parser.add_argument(
             '--host',
             default='127.0.0.1',
@@ -148,6 +155,25 @@ class ArgumentParser:
             default='id',
             help='The name of key for denoting the id of a resource. Defaults to %(default)s',
         )
+        self._arg_parser.add_argument(
+            '--parallel-scan-threshold',
+            default=0,
+            type=int,
+            help=(
+                'Minimum number of items in a collection before queries on it are scanned in parallel by a process '
+                'pool. The size from which this pays off depends on the number of cores, benchmarks/parallel_scan.py '
+                'measures it. Defaults to %(default)s, which disables parallel scans.'
+            ),
+        )
+        self._arg_parser.add_argument(
+            '--vectorized-query-threshold',
+            default=50_000,
+            type=int,
+            help=(
+                'Minimum number of items in a collection before queries on it are answered with NumPy arrays. Only '
+                'used when NumPy is installed. Defaults to %(default)s, 0 disables it.'
+            ),
+        )
         # auto_generate_ids
         self._arg_parser.add_argument(
             '--auto-generate-ids',
@@ -187,6 +213,257 @@ class ArgumentParser:
             help='Disable use of timestamps.',
         )
 
+    def _add_adapter_arguments(self) -> None:
+        self._arg_parser.add_argument(
+            '--flush-interval',
+            default=0,
+            type=float,
+            help=(
+                'Save changes in the background at most once every this many seconds instead of after every '
+                'request. Pending changes are always saved on shutdown. Defaults to %(default)s, which saves after '
+                'every request.'
+            ),
+        )
+        self._arg_parser.add_argument(
+            '--flush-after-changes',
+            default=100,
+            type=int,
+            help=(
+                'Save in the background as soon as this many changes are pending, even before --flush-interval has '
+                'passed. Defaults to %(default)s'
+            ),
+        )
+        self._arg_parser.add_argument(
+            '--fsync-saves',
+            type=str2bool,
+            nargs='?',
+            const=True,
+            default=False,
+            help=(
+                'Sync every save of the data file to disk before it replaces the old file. Saves are always written '
+                'to a temporary file first, so a crash never leaves a partly written file. Accepts true/false.'
+            ),
+        )
+        self._arg_parser.add_argument(
+            '--write-ahead-log',
+            type=str2bool,
+            nargs='?',
+            const=True,
+            default=False,
+            help=(
+                'Append every change to a log next to the data file instead of rewriting the file. The log is '
+                'folded into the file periodically and replayed on startup. Accepts true/false.'
+            ),
+        )
+        self._arg_parser.add_argument(
+            '--wal-fsync',
+            default='interval',
+            choices=['always', 'interval', 'never'],
+            help=(
+                "When the write-ahead log is synced to disk: after every change, at most every 100ms for 'interval', "
+                'or when the operating system decides. Defaults to %(default)s'
+            ),
+        )
+        self._arg_parser.add_argument(
+            '--wal-compact-after',
+            default=1000,
+            type=int,
+            help='Fold the write-ahead log into the data file after this many changes. Defaults to %(default)s',
+        )
+        self._arg_parser.add_argument(
+            '--compact-records',
+            type=str2bool,
+            nargs='?',
+            const=True,
+            default=False,
+            help=(
+                'Store the items of list collections as compact read-only records that share their keys. Items are '
+                'turned back into dictionaries when they are changed. Accepts true/false.'
+            ),
+        )
+        self._arg_parser.add_argument(
+            '--intern-strings',
+            type=str2bool,
+            nargs='?',
+            const=True,
+            default=False,
+            help=(
+                'Share one string object between repeated keys and short values while loading the file, which saves '
+                'memory for files with many repeated categorical values. Accepts true/false.'
+            ),
+        )
+        self._arg_parser.add_argument(
+            '--watch-interval',
+            default=0,
+            type=float,
+            help=(
+                'Seconds between checks of the data file for changes made by other programs. Changed files are read '
+                'again and only the items that differ are applied. Defaults to %(default)s, which disables watching.'
+            ),
+        )
+        self._arg_parser.add_argument(
+            '--json-codec',
+            choices=['auto', 'orjson', 'ujson', 'json'],
+            default='auto',
+            help=(
+                'The library json is encoded and decoded with. auto uses orjson or ujson when one is installed and the '
+                'json module of the standard library otherwise. orjson writes NaN and infinity as null, the other '
+                'libraries keep them. Defaults to %(default)s'
+            ),
+        )
+        self._arg_parser.add_argument(
+            '--compact-json',
+            type=str2bool,
+            nargs='?',
+            const=True,
+            default=False,
+            help=(
+                'Save json files without indentation and without sorting their keys, which is much faster for large '
+                'files. Accepts true/false.'
+            ),
+        )
+        self._arg_parser.add_argument(
+            '--compression-level',
+            type=int,
+            default=None,
+            help=(
+                'The level files ending in .gz, .bz2 or .xz are compressed with when they are saved, from 0 or 1 to 9. '
+                'Higher levels write smaller files more slowly. Defaults to the default level of the format'
+            ),
+        )
+        self._arg_parser.add_argument(
+            '--startup-cache',
+            type=str2bool,
+            nargs='?',
+            const=True,
+            default=False,
+            help=(
+                'Save what was read from the file in <file>.cache and load it instead of parsing the file on the next '
+                'starts, as long as the size, modification time and content of the file are unchanged. Accepts '
+                'true/false.'
+            ),
+        )
+        self._arg_parser.add_argument(
+            '--sqlite',
+            type=str2bool,
+            nargs='?',
+            const=True,
+            default=False,
+            help=(
+                'Serve the file as a sqlite database whatever its extension, files ending in .sqlite, .sqlite3 or .db '
+                'always are. Filters, sorting and paging run in sqlite and every change is written right away. '
+                'Accepts true/false.'
+            ),
+        )
+        self._arg_parser.add_argument(
+            '--sqlite-wal-mode',
+            type=str2bool,
+            nargs='?',
+            const=True,
+            default=False,
+            help=(
+                "Switch a sqlite database to sqlite's write-ahead journal, so reads run while a write commits. The "
+                'database keeps this journal mode for other programs. Accepts true/false.'
+            ),
+        )
+        self._arg_parser.add_argument(
+            '--sqlite-auto-index',
+            type=str2bool,
+            nargs='?',
+            const=True,
+            default=False,
+            help=(
+                'Index a field of a sqlite collection the first time it is filtered on. The indexes are added to the '
+                'database. Accepts true/false.'
+            ),
+        )
+        self._arg_parser.add_argument(
+            '--json-streaming',
+            type=str2bool,
+            nargs='?',
+            const=True,
+            default=False,
+            help=(
+                'Read json files in chunks and build collections item by item, so loading needs little more memory '
+                'than the loaded data. Slower than reading the whole file at once. Accepts true/false.'
+            ),
+        )
+        self._arg_parser.add_argument(
+            '--json-lazy',
+            type=str2bool,
+            nargs='?',
+            const=True,
+            default=False,
+            help=(
+                'Map the json file into memory and decode the items of collections only when a request reads them. '
+                'Starts quickly and serves lookups by id on files larger than memory, scans decode every item. '
+                'Accepts true/false.'
+            ),
+        )
+        self._arg_parser.add_argument(
+            '--json-lazy-cache-size',
+            default=10_000,
+            type=int,
+            help='Number of decoded items --json-lazy keeps in memory. Defaults to %(default)s',
+        )
+        self._arg_parser.add_argument(
+            '--csv-columnar',
+            type=str2bool,
+            nargs='?',
+            const=True,
+            default=False,
+            help=(
+                'Store csv rows as one list per column and build dictionaries only for the rows that are returned. '
+                'Uses a fraction of the memory for wide csv files, and writes copy a vector of row ids instead of the '
+                'list of items, which every write to other collections copies. Accepts true/false.'
+            ),
+        )
+        self._arg_parser.add_argument(
+            '--csv-infer-types',
+            type=str2bool,
+            nargs='?',
+            const=True,
+            default=False,
+            help=(
+                'Read csv columns whose cells are all integers, decimals, booleans or empty as typed values, so they '
+                'sort and filter by value. Only types that write every cell back unchanged are used. Accepts '
+                'true/false.'
+            ),
+        )
+        self._arg_parser.add_argument(
+            '--csv-lazy',
+            type=str2bool,
+            nargs='?',
+            const=True,
+            default=False,
+            help=(
+                'Map the csv file into memory and parse rows only when a request reads them. Starts quickly and '
+                'serves lookups by id on files larger than memory, other queries parse every row. Accepts true/false.'
+            ),
+        )
+        self._arg_parser.add_argument(
+            '--csv-parallel-read-threshold',
+            default=0,
+            type=int,
+            help=(
+                'Minimum size in bytes of a csv file before it is split into chunks that are parsed in parallel by a '
+                'process pool. Quotes must only appear in quoted cells. Defaults to %(default)s, which disables '
+                'parallel reads.'
+            ),
+        )
+        self._arg_parser.add_argument(
+            '--csv-schema',
+            help=(
+                'A json file mapping csv column names to one of str, int, float, number, bool or null. Listed columns '
+                'use these types instead of inferred ones. Example: {"age": "int", "active": "bool"}'
+            ),
+        )
+        self._arg_parser.add_argument(
+            '--csv-schema-sample-size',
+            type=int,
+            help='Number of csv rows column types are inferred from. Defaults to every row',
+        )
+
     def _add_hidden_arguments(self) -> None:
         self._arg_parser.add_argument(
             '--disable-stdin',
@@ -244,6 +521,40 @@ class ArgumentParser:
                 'id_name',
                 'auto_generate_ids',
                 'use_timestamps',
+                'parallel_scan_threshold',
+                'vectorized_query_threshold',
+            ],
+        )
+
+    def get_parsed_adapter_arguments(self) -> t.Dict[str, t.Any]:
+        return self.extract_keys(
+            vars(self.parsed_args),
+            [
+                'flush_interval',
+                'flush_after_changes',
+                'fsync_saves',
+                'write_ahead_log',
+                'wal_fsync',
+                'wal_compact_after',
+                'compact_records',
+                'intern_strings',
+                'compression_level',
+                'watch_interval',
+                'json_codec',
+                'compact_json',
+                'startup_cache',
+                'sqlite',
+                'sqlite_wal_mode',
+                'sqlite_auto_index',
+                'json_streaming',
+                'json_lazy',
+                'json_lazy_cache_size',
+                'csv_columnar',
+                'csv_infer_types',
+                'csv_schema',
+                'csv_schema_sample_size',
+                'csv_lazy',
+                'csv_parallel_read_threshold',
             ],
         )
 
@@ -251,5 +562,6 @@ class ArgumentParser:
         args = {}
         args.update(self.get_parsed_server_arguments())
         args.update(self.get_parsed_controller_arguments())
+        args.update(self.get_parsed_adapter_arguments())
         args.update(self.extract_keys(vars(self.parsed_args), ['disable_stdin', 'disable_logs']))
         return args
@@ -1,28 +1,279 @@
+import contextlib
+import itertools
+import logging
+import os
+import threading
+import time
 import typing as t
 from copy import deepcopy
 
 import data_server.data_server_types as dt
+from data_server.core.codec import get_codec
+from data_server.core.columnar import COLLECTION_TYPES, RowCollection
 from data_server.core.data_controller import DataController
+from data_server.core.hot_reload import RESET_SHARE, FileWatcher, diff_data
+from data_server.core.interning import StringInterner
+from data_server.core.persistence import WriteBehindFlusher
+from data_server.core.records import RecordCompactor, compact_collections
+from data_server.core.startup_cache import StartupCache
+from data_server.core.wal import FsyncPolicy, WriteAheadLog
+
+logger = logging.getLogger('data_server')
 
 
 class DataAdapter:
-    def __init__(self, resource: t.Union[str, dt.JSONItem], **kwargs: t.Any):
+    def __init__(
+        self,
+        resource: t.Union[str, dt.JSONItem],
+        *,
+        compact_records: bool = False,
+        intern_strings: bool = False,
+        fsync_saves: bool = False,
+        write_ahead_log: bool = False,
+        wal_fsync: t.Union[str, FsyncPolicy] = FsyncPolicy.INTERVAL,
+        wal_compact_after: int = 1000,
+        wal_compact_interval: float = 60,
+        startup_cache: bool = False,
+        compression_level: t.Optional[int] = None,
+        json_codec: t.Optional[str] = None,
+        compact_json: bool = False,
+        watch_interval: float = 0,
+        copy_on_write: bool = False,
+        **kwargs: t.Any,
+    ):
+        """
+        Loads `resource` and creates the controller for it. With `compact_records`, the items of list collections
+        are stored as compact read-only records that are replaced by dictionaries when they are changed. With
+        `intern_strings`, repeated keys and short values read from a file share one string object. Saves replace
+        the file atomically, with `fsync_saves` they are also synced to disk. Files ending in .gz, .bz2 or .xz are
+        decompressed while they are read and saved compressed with `compression_level`. Json is encoded and
+        decoded by the codec `json_codec` (see `get_codec`), with `compact_json` json files are saved without
+        indentation and in the order of their keys.
+
+        With `write_ahead_log`, every change to a file resource is appended to `<resource>.wal` instead of saving the
+        file. The log is folded back into the file by `save_data` every `wal_compact_interval` seconds or once
+        `wal_compact_after` changes were logged, and is replayed on top of the file when the adapter is created.
+
+        With `startup_cache`, what was read from a file resource is saved in a `StartupCache` and the next adapters
+        created for the unchanged file load the cache instead of parsing the file.
+
+        With a `watch_interval`, the files of the resource are polled every `watch_interval` seconds and files changed
+        by another process are reloaded with `reload_data`, saves of the adapter itself are not reloaded.
+
+        A dictionary resource is deep copied, so writes never change the dictionary of the caller. With
+        `copy_on_write`, the adapter shares its lists and items instead, which the controller never changes in place
+        but replaces with copies when they are written. Only the containers that are changed while the data is
+        loaded, by `fix` or `compact_records`, are copied up front. The caller must not change the dictionary itself
+        afterwards.
+        """
+        self.compact_records = compact_records
+        self.fsync_saves = fsync_saves
+        self.compression_level = compression_level
+        self.codec = get_codec(json_codec)
+        self.compact_json = compact_json
+        self._save_lock = threading.Lock()
+        self._file_watcher: t.Optional[FileWatcher] = None
+        self.interner = StringInterner() if intern_strings else None
+        # adapters that read items one by one can compact them right away, unless the controller fixes them
+        self.record_compactor = RecordCompactor() if compact_records and not kwargs.get('fix') else None
         if isinstance(resource, dict):
-            data = deepcopy(resource)
+            data = self._share_data(resource, kwargs.get('fix', False)) if copy_on_write else deepcopy(resource)
             self.resource = ''
         else:
             assert isinstance(resource, str)
             self.resource = resource
-            data = self.read_data()
+            cache = StartupCache(resource, self._read_options()) if startup_cache else None
+            cached = cache.load() if cache is not None else None
+            if cached is not None:
+                data, state = cached
+                self._set_read_state(state)
+                logger.info('Loaded %s from %s', resource, t.cast(StartupCache, cache).path)
+            else:
+                data = self.read_data()
+                if self.interner is not None:
+                    self.interner.report(self.resource)
+                if cache is not None:
+                    cache.save(data, self._get_read_state())
         self._controller = DataController(data, **kwargs)
+        self._owns_controller = True
+        self._change_listeners: t.List[dt.ChangeListener] = []
+        if self.compact_records:
+            compact_collections(self._controller.data)
+        self.write_ahead_log: t.Optional[WriteAheadLog] = None
+        self._log_compactor: t.Optional[WriteBehindFlusher] = None
+        self.recovery_time = 0.0
+        if write_ahead_log and self.resource:
+            self._open_write_ahead_log(wal_fsync, wal_compact_after, wal_compact_interval)
         self._url_data = self._get_url_data()
+        if watch_interval > 0 and self.resource:
+            self._file_watcher = FileWatcher(self._get_watched_files(), self._reload_changed_files, watch_interval)
 
     def read_data(self) -> t.Dict[str, t.Any]:
         raise NotImplementedError
 
-    def save_data(self) -> None:
+    def save_data(self, data: t.Optional[dt.JSONItem] = None) -> None:
+        """
+        Writes `data` to the resource, the current data when it is None.
+        """
         raise NotImplementedError
 
+    def reload_data(self, paths: t.Sequence[str]) -> int:
+        """
+        Reads the resource again after `paths` were changed by another process and applies the items that differ
+        from the current data, one collection at a time, so requests are served while it runs. Returns the number of
+        changes.
+        """
+        data = self.read_data()
+        if self.compact_records:
+            compact_collections(data)
+        return self._apply_reloaded_data(self._controller.data, data)
+
+    def _share_data(self, data: dt.JSONItem, copy_items: bool) -> dt.JSONItem:
+        # the controller replaces the top level values when it publishes a write, everything below is shared
+        if not (copy_items or self.compact_records):
+            return dict(data)
+        # compacting replaces the collections of nested dictionaries and fixing changes every item
+        return {
+            key: self._share_data(value, copy_items)
+            if isinstance(value, dict)
+            else [dict(item) for item in value]
+            if copy_items and isinstance(value, list)
+            else value
+            for key, value in data.items()
+        }
+
+    def _apply_reloaded_data(self, current: dt.JSONItem, data: dt.JSONItem) -> int:
+        changes = diff_data(current, data, self._controller.id_name)
+        # the changes of a value are next to each other, a value that is replaced has a single reset
+        for key, grouped_changes in itertools.groupby(changes, key=lambda change: change.path[0]):
+            key_changes = list(grouped_changes)
+            if key_changes[0].type == dt.ChangeType.RESET:
+                self._controller.apply_change(key_changes[0])
+                continue
+            written = sum(change.type != dt.ChangeType.DELETE for change in key_changes)
+            if isinstance(data[key], RowCollection) or written > len(data[key]) * RESET_SHARE:
+                # the reloaded collection is used as it is when few of its items can be kept
+                self._controller.apply_change(
+                    dt.Change(dt.ChangeType.RESET, [key], current[key], data[key], persisted=True)
+                )
+            else:
+                self._controller.apply_changes([key], key_changes)
+        if changes:
+            if self._controller.id_type is None:
+                self._controller.id_type = self._controller._get_id_type(self._controller.data)
+            self._url_data = self._get_url_data()
+        return len(changes)
+
+    def _get_watched_files(self) -> t.List[str]:
+        return [self.resource]
+
+    def _reload_changed_files(self) -> None:
+        assert self._file_watcher is not None
+        # saves wait for the reload, requests do not
+        with self._save_lock:
+            paths = self._file_watcher.changed_paths()
+            if paths:
+                started_at = time.perf_counter()
+                changes = self.reload_data(paths)
+                logger.info(
+                    'Reloaded %s with %d changes in %.3f seconds',
+                    ', '.join(paths),
+                    changes,
+                    time.perf_counter() - started_at,
+                )
+
+    @contextlib.contextmanager
+    def _saving(self) -> t.Iterator[None]:
+        """
+        Serializes saves with each other and with reloads, the files written by a save are not reloaded.
+        """
+        with self._save_lock:
+            try:
+                yield
+            finally:
+                if self._file_watcher is not None:
+                    self._file_watcher.mark_current()
+
+    def _read_options(self) -> t.Tuple[t.Any, ...]:
+        """
+        The options that change what `read_data` returns, a startup cache is only used with the same options.
+        """
+        return (type(self).__name__, self.record_compactor is not None, self.interner is not None)
+
+    def _get_read_state(self) -> t.Any:
+        """
+        The state of the adapter that `read_data` sets besides the data, which is saved with it in a startup cache.
+        """
+        return None
+
+    def _set_read_state(self, state: t.Any) -> None:
+        pass
+
+    def close(self) -> None:
+        """
+        Folds the write-ahead log into the resource and closes it.
+        """
+        if self._owns_controller:
+            self._controller.close()
+        else:
+            for listener in self._change_listeners:
+                self._controller.remove_change_listener(listener)
+        if self._file_watcher is not None:
+            self._file_watcher.close()
+        if self._log_compactor is not None:
+            self._log_compactor.close()
+        if self.write_ahead_log is not None:
+            self.write_ahead_log.close()
+
+    def share_controller(self, controller: DataController) -> None:
+        """
+        Makes the adapter save its collection from `controller`, the controller of an adapter that serves it with
+        other values, e.g a directory, instead of keeping a copy of the collection in a controller of its own.
+        """
+        if self._owns_controller:
+            self._controller.close()
+        self._controller = controller
+        self._owns_controller = False
+        for listener in self._change_listeners:
+            controller.add_change_listener(listener)
+
+    def _add_change_listener(self, listener: dt.ChangeListener) -> None:
+        self._change_listeners.append(listener)
+        self._controller.add_change_listener(listener)
+
+    def _open_write_ahead_log(
+        self, fsync: t.Union[str, FsyncPolicy], compact_after: int, compact_interval: float
+    ) -> None:
+        started_at = time.perf_counter()
+        log = WriteAheadLog(self.resource + '.wal', self._controller.id_name, fsync)
+        replayed = 0
+        for change in log.read():
+            self._controller.apply_change(change)
+            replayed += 1
+        if os.path.getsize(log.path):
+            # every logged change is now part of the data, start the new log from a snapshot that holds them
+            self.save_data(self._controller.data)
+            log.truncate()
+        self.recovery_time = time.perf_counter() - started_at
+        logger.info('Recovered %d changes from %s in %.3f seconds', replayed, log.path, self.recovery_time)
+        self.write_ahead_log = log
+        self._log_compactor = WriteBehindFlusher(self._compact_write_ahead_log, compact_interval, compact_after)
+        self._controller.add_change_listener(self._log_change)
+
+    def _log_change(self, change: dt.Change) -> None:
+        assert self.write_ahead_log is not None and self._log_compactor is not None
+        if change.persisted:
+            # reloaded changes are already in the resource
+            return
+        self.write_ahead_log.append(change, self._controller.version)
+        self._log_compactor.mark_dirty()
+
+    def _compact_write_ahead_log(self) -> None:
+        assert self.write_ahead_log is not None
+        snapshot = self._controller.snapshot()
+        self.save_data(snapshot.data)
+        self.write_ahead_log.truncate(snapshot.version)
+
     def execute_get_item_request(self, path: str, id: dt.IdType) -> dt.JSONItem:
         return self._controller.get_item(self._split_paths(path), id)
 
@@ -41,8 +292,23 @@ class DataAdapter:
     def execute_delete_request(self, path: str, id: dt.IdType) -> None:
         return self._controller.delete_item(self._split_paths(path), id)
 
+    def create_snapshot(self, name: str) -> int:
+        return self._controller.create_snapshot(name).version
+
+    def restore_snapshot(self, name: str) -> int:
+        return self._controller.restore_snapshot(name).version
+
+    def delete_snapshot(self, name: str) -> None:
+        self._controller.delete_snapshot(name)
+
+    def get_snapshots(self) -> t.Dict[str, int]:
+        return {name: snapshot.version for name, snapshot in self._controller.get_snapshots().items()}
+
     def get_data(self) -> dt.JSONItem:
-        return self._controller.data
+        """
+        Returns the current version of the data, which later writes do not change.
+        """
+        return self._controller.snapshot().data
 
     def get_urls(self) -> t.List[str]:
         return [item[0] for item in self._url_data]
@@ -56,16 +322,40 @@ class DataAdapter:
         def get_url_helper(data: dt.JSONItem, accumulated_path: str = '') -> None:
             for key, value in data.items():
                 new_path = f'{accumulated_path}/{key}'
-                if isinstance(value, list):
+                if isinstance(value, COLLECTION_TYPES):
                     urls.append((new_path, list))
                 if isinstance(value, dict):
                     urls.append((new_path, dict))
                     get_url_helper(value, new_path)
 
-        get_url_helper(self.get_data())
+        get_url_helper(self._controller.data)
         return urls
 
     @staticmethod
     def _split_paths(path: str) -> t.List[str]:
         path_as_list = [sub_path for sub_path in path.strip('/').split('/') if sub_path]
         return path_as_list
+
+    @staticmethod
+    def _ends_with_newline(path: str) -> bool:
+        """
+        Whether lines can be appended to the file at `path` without a newline before them, which is true for an empty
+        file. The last byte is read in binary mode, since it can be part of a multibyte character.
+        """
+        size = os.path.getsize(path)
+        if not size:
+            return True
+        with open(path, 'rb') as data_file:
+            data_file.seek(size - 1)
+            return data_file.read(1) in (b'\n', b'\r')
+
+    @staticmethod
+    def _generate_key(resource: str, key: t.Optional[str] = None) -> str:
+        if key is not None:
+            return key
+        return DataAdapter._get_file_stem(resource)
+
+    @staticmethod
+    def _get_file_stem(resource: str) -> str:
+        separator = '/' if '/' in resource else '\\'
+        return resource.split(separator)[-1].split('.')[0]
@@ -1,8 +1,16 @@
 import os
+import threading
 import warnings
-from csv import DictReader, DictWriter
-from typing import Any, Dict, Optional
+from csv import DictReader, DictWriter, reader
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
 
+import data_server.data_server_types as dt
+from data_server.core.columnar import ColumnarCollection
+from data_server.core.csv_schema import CsvSchema
+from data_server.core.files import atomic_write, is_compressed, open_text, strip_compression
+from data_server.core.lazy_csv import LazyCsvCollection, LazyCsvFile
+from data_server.core.parallel_csv import read_csv_columns
+from data_server.core.parallel_scan import available_cpu_count
 from data_server.errors import CsvAdapterError
 
 from .adapter import DataAdapter
@@ -11,14 +19,62 @@ from .adapter import DataAdapter
 class CsvAdapter(DataAdapter):
     """
     extends DataAdapter, handles conversion between CSV and Dictionary
-    :args resource("path to a csv file or dictionary"), key("name of the csv file or key of dictionary")
+    :args resource("path to a csv file or dictionary"), key("name of the csv file or key of dictionary"),
+    columnar("store rows as columns and build dictionaries only for the rows that are returned"),
+    infer_types("read int, float, bool and empty columns as typed values"),
+    schema_file("a json file mapping column names to types, overrides inference"),
+    schema_sample_size("number of rows types are inferred from, every row if None"),
+    lazy("map the file into memory and parse rows only when they are read, types are inferred from the first
+    schema_sample_size rows or 1000"),
+    parallel_read_threshold("size in bytes from which a file is parsed in chunks by a process pool, 0 to never")
+
+    Saves write the collection held by the controller. When items were only added since the last save, the new rows
+    are appended to the file, any other change or a new column rewrites the whole file.
     """
 
-    def __init__(self, resource: str, key: Optional[str] = None, **kwargs: Any):
+    def __init__(
+        self,
+        resource: str,
+        key: Optional[str] = None,
+        columnar: bool = False,
+        infer_types: bool = False,
+        schema_file: Optional[str] = None,
+        schema_sample_size: Optional[int] = None,
+        lazy: bool = False,
+        parallel_read_threshold: int = 0,
+        **kwargs: Any,
+    ):
         self.key = self._generate_key(resource, key)
+        self.columnar = columnar
+        self.schema_sample_size = schema_sample_size
+        self.lazy = lazy
+        self.parallel_read_threshold = parallel_read_threshold
+        self.lazy_file: Optional[LazyCsvFile] = None
+        self._id_name = kwargs.get('id_name', 'id')
         if not os.path.exists(resource):
             raise CsvAdapterError(f'{resource} does not exist')
+        if lazy and columnar:
+            raise CsvAdapterError('a csv file cannot be both lazy and columnar')
+        if lazy and is_compressed(resource):
+            raise CsvAdapterError('a compressed csv file cannot be lazy')
+        if lazy and kwargs.get('watch_interval'):
+            # rows of a lazy file are read from the mapped file, which another process may change
+            raise CsvAdapterError('a lazy csv file cannot be watched')
+        self.schema = self._load_schema(schema_file, infer_types)
+        self._fieldnames: List[str] = []
+        # changes since the last save as (data version, added item), None instead of an item requires a rewrite
+        self._unsaved_changes: List[Tuple[int, Optional[dt.JSONItem]]] = []
+        self._changes_lock = threading.Lock()
         super().__init__(resource, **kwargs)
+        if self._controller.fix:
+            # fixing the data on load changed items that are already in the file
+            self._unsaved_changes.append((0, None))
+        self._add_change_listener(self._track_change)
+
+    def execute_get_request(self, path: str, **filters: str) -> dt.JSONItems:
+        if self.schema is not None:
+            filters = {key: self.schema.parse_value(key, value) for key, value in filters.items()}
+        return super().execute_get_request(path, **filters)
 
     def read_data(self) -> Dict[str, Any]:
         """
@@ -26,31 +82,181 @@ class CsvAdapter(DataAdapter):
         :return: Dict[Text, Any]
         """
 
-        if not self.resource.endswith('.csv'):
+        if not strip_compression(self.resource).endswith('.csv'):
             warnings.warn('resource must be a valid CSV file', stacklevel=1)
-        with open(self.resource) as f:
+        if self.lazy and os.path.getsize(self.resource):
+            return {self.key: self._read_lazy_rows()}
+        if self._reads_in_parallel():
+            return {self.key: self._read_parallel_rows()}
+        with open_text(self.resource) as f:
+            if self.columnar or self.schema is not None:
+                csv_reader: Iterator[List[str]] = reader(f)
+                if self.interner is not None:
+                    csv_reader = self.interner.intern_rows(csv_reader)
+                fieldnames = next(csv_reader, [])
+                self._fieldnames = list(fieldnames)
+                if self.schema is None:
+                    return {self.key: ColumnarCollection.from_rows(fieldnames, csv_reader)}
+                try:
+                    columns = self.schema.read_columns(fieldnames, csv_reader, self.schema_sample_size)
+                except ValueError as error:
+                    raise CsvAdapterError(f'Failed to read {self.resource}: {error}') from error
+                if self.columnar:
+                    return {self.key: ColumnarCollection(fieldnames, columns)}
+                return {self.key: [dict(zip(fieldnames, row)) for row in zip(*columns)]}
             dict_reader = DictReader(f)
-            list_of_dicts = list(dict_reader)
+            if self.interner is not None:
+                intern = self.interner.intern
+                list_of_dicts = [{key: intern(value) for key, value in row.items()} for row in dict_reader]
+            else:
+                list_of_dicts = list(dict_reader)
+            self._fieldnames = list(dict_reader.fieldnames or [])
             key_dict = dict({self.key: list_of_dicts})
             return key_dict
 
-    def save_data(self) -> None:
-        assert isinstance(self.read_data(), dict), 'resource must be a non-empty dict'
-        data_list = self.read_data().get(self.key)
-        assert data_list is not None
-        keys = data_list[0].keys()
-        with open(self.resource, 'w', newline='') as output_file:
-            dict_writer = DictWriter(output_file, keys)
+    def save_data(self, data: Optional[Dict[str, Any]] = None) -> None:
+        with self._saving():
+            if data is None:
+                snapshot = self._controller.snapshot()
+                data, version = snapshot.data, snapshot.version
+            else:
+                # the changes that are part of the given data are unknown, so all of them are rewritten
+                version = self._controller.version
+                with self._changes_lock:
+                    self._unsaved_changes.append((0, None))
+            with self._changes_lock:
+                changes = [change for change in self._unsaved_changes if change[0] <= version]
+                self._unsaved_changes = [change for change in self._unsaved_changes if change[0] > version]
+            data_list = data.get(self.key)
+            assert data_list is not None, f'{self.key!r} is missing from the data'
+            added_items = [item for _, item in changes if item is not None]
+            try:
+                # compressed files are always rewritten
+                if (
+                    len(added_items) == len(changes)
+                    and all(item.keys() <= set(self._fieldnames) for item in added_items)
+                    and not is_compressed(self.resource)
+                ):
+                    self._append_rows(added_items)
+                else:
+                    self._write_rows(data_list)
+            except BaseException:
+                with self._changes_lock:
+                    self._unsaved_changes.insert(0, (0, None))
+                raise
+
+    def close(self) -> None:
+        super().close()
+        if self.lazy_file is not None:
+            self.lazy_file.close()
+
+    def _read_options(self) -> Tuple[Any, ...]:
+        schema = None
+        if self.schema is not None:
+            schema = (
+                self.schema.infer,
+                sorted((name, column_type.name) for name, column_type in self.schema.types.items()),
+            )
+        return (*super()._read_options(), self.key, self.columnar, self.lazy, self.schema_sample_size, schema)
+
+    def _get_read_state(self) -> Any:
+        return self._fieldnames, self.schema
+
+    def _set_read_state(self, state: Any) -> None:
+        self._fieldnames, self.schema = state
+
+    def _read_lazy_rows(self) -> LazyCsvCollection:
+        self.lazy_file = LazyCsvFile(self.resource, self._id_name, self.schema, self.schema_sample_size or 1000)
+        try:
+            rows = self.lazy_file.load()
+        except ValueError as error:
+            self.lazy_file.close()
+            raise CsvAdapterError(f'Failed to read {self.resource}: {error}') from error
+        self._fieldnames = list(self.lazy_file.fieldnames)
+        return rows
+
+    def _reads_in_parallel(self) -> bool:
+        # chunks of a compressed file cannot be read on their own
+        return (
+            0 < self.parallel_read_threshold <= os.path.getsize(self.resource)
+            and not is_compressed(self.resource)
+            and available_cpu_count() > 1
+        )
+
+    def _read_parallel_rows(self) -> Sequence[dt.JSONItem]:
+        fieldnames, columns = read_csv_columns(self.resource)
+        self._fieldnames = fieldnames
+        if self.interner is not None:
+            intern = self.interner.intern
+            columns = [list(map(intern, column)) for column in columns]
+        if self.schema is not None:
+            try:
+                columns = self.schema.parse_columns(fieldnames, columns, self.schema_sample_size)
+            except ValueError as error:
+                raise CsvAdapterError(f'Failed to read {self.resource}: {error}') from error
+        if self.columnar:
+            return ColumnarCollection(fieldnames, columns)
+        return [dict(zip(fieldnames, row)) for row in zip(*columns)]
+
+    def _track_change(self, change: dt.Change) -> None:
+        # called while the controller holds its write lock, so the version is the one of this change
+        # reloaded changes are already in the file
+        if change.persisted or change.path != [self.key]:
+            return
+        with self._changes_lock:
+            self._unsaved_changes.append(
+                (self._controller.version, change.item if change.type == dt.ChangeType.ADD else None)
+            )
+
+    def _append_rows(self, items: dt.JSONItems) -> None:
+        if not items:
+            return
+        ends_with_newline = self._ends_with_newline(self.resource)
+        with open(self.resource, 'r+', newline='') as output_file:
+            output_file.seek(0, os.SEEK_END)
+            if not ends_with_newline:
+                output_file.write('\r\n')
+            self._write_items(DictWriter(output_file, self._fieldnames), items)
+            if self.fsync_saves:
+                output_file.flush()
+                os.fsync(output_file.fileno())
+
+    def _write_rows(self, items: dt.JSONItems) -> None:
+        fieldnames = dict.fromkeys(self._fieldnames)
+        changed_items: Iterable[dt.JSONItem] = items
+        if isinstance(items, LazyCsvCollection):
+            # the unchanged rows of a lazy file have the columns of its header
+            changed_items = (items.overrides[row_id] for row_id in items.row_ids if row_id in items.overrides)
+        for item in changed_items:
+            fieldnames.update(dict.fromkeys(item.keys()))
+        unchanged_columns = self.lazy_file is not None and list(fieldnames) == self.lazy_file.fieldnames
+        self._fieldnames = list(fieldnames)
+        with atomic_write(
+            self.resource, fsync=self.fsync_saves, newline='', compression_level=self.compression_level
+        ) as output_file:
+            dict_writer = DictWriter(output_file, self._fieldnames)
             dict_writer.writeheader()
-            dict_writer.writerows(data_list)
+            if isinstance(items, LazyCsvCollection) and unchanged_columns:
+                # rows that were not changed are copied from the mapped file instead of being parsed
+                for item in items.encoded_items():
+                    if isinstance(item, str):
+                        output_file.write(item + '\r\n')
+                    else:
+                        self._write_items(dict_writer, [item])
+            else:
+                self._write_items(dict_writer, items)
 
-    @staticmethod
-    def _generate_key(resource: str, key: Optional[str] = None) -> str:
-        if key is not None:
-            return key
-        return CsvAdapter._get_file_stem(resource)
+    def _write_items(self, dict_writer: 'DictWriter[str]', items: dt.JSONItems) -> None:
+        if self.schema is not None:
+            dict_writer.writerows(map(self.schema.format_row, items))
+        else:
+            dict_writer.writerows(items)
 
     @staticmethod
-    def _get_file_stem(resource: str) -> str:
-        separator = '/' if '/' in resource else '\\'
-        return resource.split(separator)[-1].split('.')[0]
+    def _load_schema(schema_file: Optional[str], infer_types: bool) -> Optional[CsvSchema]:
+        if schema_file is None:
+            return CsvSchema() if infer_types else None
+        try:
+            return CsvSchema.from_file(schema_file, infer=infer_types)
+        except (OSError, ValueError) as error:
+            raise CsvAdapterError(f'Failed to load csv schema {schema_file}: {error}') from error
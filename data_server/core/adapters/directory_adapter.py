@@ -0,0 +1,222 @@
+import json
+import os
+import threading
+from typing import Any, Dict, List, Optional, Sequence, Set
+
+import data_server.data_server_types as dt
+from data_server.core.files import atomic_write, open_text, strip_compression
+from data_server.core.records import compact_collections
+from data_server.errors import DirectoryAdapterError
+
+from .adapter import DataAdapter
+from .csv_adapter import CsvAdapter
+from .json_lines_adapter import JSONLinesAdapter
+
+FILE_EXTENSIONS = ('.json', '.csv', '.jsonl', '.ndjson')
+# options of the directory adapter that the adapters of its csv and json lines files use as well
+FILE_ADAPTER_OPTIONS = (
+    'id_name',
+    'compact_records',
+    'intern_strings',
+    'fsync_saves',
+    'compression_level',
+    'json_codec',
+)
+
+
+class DirectoryAdapter(DataAdapter):
+    """
+    extends DataAdapter, serves every json, json lines and csv file in a directory, compressed or not, as a
+    top-level value named after the file
+    :args resource("path to a directory"), csv_options("options of the CsvAdapter of every csv file")
+
+    A json file holds any json value, csv and json lines files hold a list collection. Lists are loaded the first
+    time a request reads them, except the first ones that are needed to find the type of ids. Objects are loaded
+    when the adapter is created, since the urls below them depend on their content. Saves only write the files of the
+    values that changed since the last save, and append added rows and items to csv and json lines files when they
+    can, like the adapters of these files do.
+    """
+
+    def __init__(
+        self,
+        resource: str,
+        *,
+        csv_options: Optional[Dict[str, Any]] = None,
+        write_ahead_log: bool = False,
+        startup_cache: bool = False,
+        **kwargs: Any,
+    ):
+        if not os.path.isdir(resource):
+            raise DirectoryAdapterError(f'{resource} is not a directory')
+        self.csv_options = csv_options or {}
+        self.files = self._find_files(resource)
+        self._file_options = {key: kwargs[key] for key in FILE_ADAPTER_OPTIONS if key in kwargs}
+        self._file_adapters: Dict[str, DataAdapter] = {}
+        # replaying a log or fixing items needs every value
+        self._load_all_on_start = write_ahead_log or bool(kwargs.get('fix'))
+        self._loaded: Set[str] = set()
+        self._load_lock = threading.Lock()
+        # the version of the data that was saved last
+        self._saved_version = 0
+        super().__init__(resource, write_ahead_log=write_ahead_log, **kwargs)
+        for adapter in self._file_adapters.values():
+            adapter.share_controller(self._controller)
+
+    def read_data(self) -> Dict[str, Any]:
+        data: Dict[str, Any] = {}
+        id_type_known = False
+        for name, path in self.files.items():
+            if self._load_all_on_start or not id_type_known or not self._holds_list(path):
+                data[name] = self._read_file(name)
+                self._loaded.add(name)
+                id_type_known = id_type_known or bool(data[name])
+            else:
+                # lists that are not loaded yet are empty lists in the data
+                data[name] = []
+        return data
+
+    def save_data(self, data: Optional[dt.JSONItem] = None) -> None:
+        with self._saving():
+            if data is not None:
+                # the changes that are part of the given data are unknown, so every loaded value is written
+                self._write_files(data, self._loaded, data_given=True)
+                return
+            snapshot = self._controller.snapshot()
+            self._write_files(
+                snapshot.data, self._controller.changed_collections(self._saved_version), data_given=False
+            )
+            # a failed save keeps the previous version, so the next one writes its values again
+            self._saved_version = snapshot.version
+
+    def close(self) -> None:
+        super().close()
+        for adapter in self._file_adapters.values():
+            adapter.close()
+
+    def get_data(self) -> dt.JSONItem:
+        self._load_all()
+        return self._controller.snapshot().data
+
+    def execute_get_item_request(self, path: str, id: dt.IdType) -> dt.JSONItem:
+        self._load(path)
+        return super().execute_get_item_request(path, id)
+
+    def execute_get_request(self, path: str, **filters: str) -> dt.JSONItems:
+        self._load(path)
+        return super().execute_get_request(path, **filters)
+
+    def execute_post_request(self, path: str, data: Any) -> dt.JSONItem:
+        self._load(path)
+        return super().execute_post_request(path, data)
+
+    def execute_patch_request(self, path: str, id: dt.IdType, data: Any) -> dt.JSONItem:
+        self._load(path)
+        return super().execute_patch_request(path, id, data)
+
+    def execute_put_request(self, path: str, id: dt.IdType, data: Any) -> dt.JSONItem:
+        self._load(path)
+        return super().execute_put_request(path, id, data)
+
+    def execute_delete_request(self, path: str, id: dt.IdType) -> None:
+        self._load(path)
+        return super().execute_delete_request(path, id)
+
+    def reload_data(self, paths: Sequence[str]) -> int:
+        # only values that were loaded can differ from their file, the others are read when they are first requested
+        names = [name for name, path in self.files.items() if path in paths and name in self._loaded]
+        current = {name: self._controller.data[name] for name in names}
+        data = {}
+        for name in names:
+            previous_adapter = self._file_adapters.pop(name, None)
+            if previous_adapter is not None:
+                previous_adapter.close()
+            data[name] = self._read_file(name)
+            self._share_controller(name)
+        return self._apply_reloaded_data(current, data)
+
+    def create_snapshot(self, name: str) -> int:
+        # a snapshot of a value that is not loaded yet would restore it to an empty list
+        self._load_all()
+        return super().create_snapshot(name)
+
+    def _get_watched_files(self) -> List[str]:
+        return list(self.files.values())
+
+    @staticmethod
+    def _find_files(directory: str) -> Dict[str, str]:
+        files: Dict[str, str] = {}
+        for file_name in sorted(os.listdir(directory)):
+            path = os.path.join(directory, file_name)
+            name, extension = os.path.splitext(strip_compression(file_name))
+            if file_name.startswith('.') or extension not in FILE_EXTENSIONS or not os.path.isfile(path):
+                continue
+            if name in files:
+                raise DirectoryAdapterError(f'{files[name]} and {path} cannot both be served as {name!r}')
+            files[name] = path
+        return files
+
+    @staticmethod
+    def _holds_list(path: str) -> bool:
+        if not strip_compression(path).endswith('.json'):
+            return True
+        with open_text(path) as json_file:
+            for chunk in iter(lambda: json_file.read(4096), ''):
+                if not chunk.isspace():
+                    return chunk.lstrip().startswith('[')
+        return False
+
+    def _load(self, path: str) -> None:
+        names = self._split_paths(path)
+        if names and names[0] in self.files and names[0] not in self._loaded:
+            with self._load_lock:
+                if names[0] not in self._loaded:
+                    self._controller.data[names[0]] = self._read_file(names[0])
+                    self._share_controller(names[0])
+                    self._loaded.add(names[0])
+
+    def _load_all(self) -> None:
+        for name in self.files:
+            self._load(name)
+
+    def _read_file(self, name: str) -> Any:
+        path = self.files[name]
+        if strip_compression(path).endswith('.json'):
+            with open_text(path) as json_file:
+                try:
+                    if self.interner is not None:
+                        value = json.load(json_file, object_pairs_hook=self.interner.intern_pairs)
+                    else:
+                        value = self.codec.loads(json_file.read())
+                except json.JSONDecodeError as error:
+                    raise DirectoryAdapterError(f'Failed to decode json file {path}: {error.args}') from error
+            if self.compact_records:
+                data = {name: value}
+                compact_collections(data)
+                value = data[name]
+            return value
+        adapter: DataAdapter
+        if strip_compression(path).endswith('.csv'):
+            adapter = CsvAdapter(path, key=name, **self.csv_options, **self._file_options)
+        else:
+            adapter = JSONLinesAdapter(path, key=name, **self._file_options)
+        self._file_adapters[name] = adapter
+        return adapter.get_data()[name]
+
+    def _share_controller(self, name: str) -> None:
+        # the adapter of a csv or json lines file keeps what it needs to append changes, the data stays here
+        if name in self._file_adapters:
+            self._file_adapters[name].share_controller(self._controller)
+
+    def _write_files(self, data: dt.JSONItem, names: Set[str], *, data_given: bool) -> None:
+        for name in sorted(names & self._loaded & data.keys()):
+            self._write_file(name, data[name], data_given=data_given)
+
+    def _write_file(self, name: str, value: Any, *, data_given: bool) -> None:
+        if name in self._file_adapters:
+            # the adapter appends the changes it was told about since its last save, unless the data was given
+            self._file_adapters[name].save_data({name: value} if data_given else None)
+            return
+        with atomic_write(
+            self.files[name], fsync=self.fsync_saves, compression_level=self.compression_level
+        ) as json_file:
+            self.codec.dump(value, json_file, compact=self.compact_json)
@@ -1,27 +1,116 @@
 import json
 import os
-from typing import Any, Dict
+from typing import Any, Dict, Optional, Tuple
 
+from data_server.core.codec import INDENT
+from data_server.core.files import atomic_write, is_compressed, open_text
+from data_server.core.json_segments import SegmentedJSONWriter, segments_supported
+from data_server.core.json_stream import StreamingJSONLoader
+from data_server.core.lazy_json import LazyJSONFile, dump
 from data_server.errors import AdapterError, JSONAdapterError
 
 from .adapter import DataAdapter
 
 
 class JSONAdapter(DataAdapter):
-    def __init__(self, resource: str, **kwargs: Any):
+    def __init__(
+        self, resource: str, streaming: bool = False, lazy: bool = False, lazy_cache_size: int = 10_000, **kwargs: Any
+    ):
+        """
+        With `streaming`, the file is read in chunks and list collections are built item by item, so loading a large
+        file needs little more memory than the loaded data. Items are turned into compact records as they are read.
+
+        With `lazy`, the file is mapped into memory and lists of objects keep their items encoded in it, see
+        `LazyJSONFile`. Up to `lazy_cache_size` decoded items are cached. Saves copy the unchanged items from the
+        mapped file, which keeps mapping the previous file once a save replaced it. With `compact_json`, the other
+        values are saved without whitespace.
+
+        Other saves only encode the top level values that changed since the previous save and copy the others from
+        the file it wrote, see `SegmentedJSONWriter`. The first save and saves of compressed files encode every value.
+        """
         if not os.path.exists(resource):
             raise AdapterError(f'{resource} does not exist')
+        if lazy and is_compressed(resource):
+            raise JSONAdapterError('a compressed json file cannot be lazy')
+        if lazy and kwargs.get('watch_interval'):
+            # the items of a lazy file are read from the mapped file, which another process may change
+            raise JSONAdapterError('a lazy json file cannot be watched')
+        self.streaming = streaming
+        self.lazy = lazy
+        self.lazy_cache_size = lazy_cache_size
+        self.lazy_file: Optional[LazyJSONFile] = None
+        self._id_name = kwargs.get('id_name', 'id')
+        self._segment_writer: Optional[SegmentedJSONWriter] = None
+        # the version of the data that was saved last, None when the file may hold other data
+        self._saved_version: Optional[int] = None
         super().__init__(resource, **kwargs)
+        if not lazy and not is_compressed(resource) and segments_supported():
+            self._segment_writer = SegmentedJSONWriter(
+                resource, self.codec, compact=self.compact_json, fsync=self.fsync_saves
+            )
 
     def read_data(self) -> Dict[str, Any]:
+        if self.lazy:
+            return self._read_lazy_data()
         json_contents: Dict[str, Any] = {}
-        with open(self.resource) as json_file:
+        with open_text(self.resource) as json_file:
             try:
-                json_contents = json.load(json_file)
+                if self.streaming:
+                    json_contents = StreamingJSONLoader(
+                        json_file,
+                        object_pairs_hook=self.interner.intern_pairs if self.interner is not None else None,
+                        item_hook=self.record_compactor.compact if self.record_compactor is not None else None,
+                    ).load()
+                elif self.interner is not None:
+                    json_contents = json.load(json_file, object_pairs_hook=self.interner.intern_pairs)
+                else:
+                    json_contents = self.codec.loads(json_file.read())
             except json.decoder.JSONDecodeError as error:
                 raise JSONAdapterError(f'Failed to decode json file : {error.args}') from error
         return json_contents
 
-    def save_data(self) -> None:
-        with open(self.resource, 'w') as json_file:
-            json.dump(self.get_data(), json_file, indent=4, sort_keys=True)
+    def save_data(self, data: Optional[Dict[str, Any]] = None) -> None:
+        if self._segment_writer is not None:
+            with self._saving():
+                self._save_segments(data)
+            return
+        with self._saving(), atomic_write(
+            self.resource, fsync=self.fsync_saves, compression_level=self.compression_level
+        ) as json_file:
+            if data is None:
+                data = self._controller.snapshot().data
+            if self.lazy_file is not None:
+                dump(data, json_file, None if self.compact_json else INDENT)
+            else:
+                self.codec.dump(data, json_file, compact=self.compact_json)
+
+    def close(self) -> None:
+        super().close()
+        if self.lazy_file is not None:
+            self.lazy_file.close()
+
+    def _save_segments(self, data: Optional[Dict[str, Any]]) -> None:
+        assert self._segment_writer is not None
+        if data is not None:
+            self._saved_version = None
+            self._segment_writer.write(data)
+            return
+        snapshot = self._controller.snapshot()
+        changed = None if self._saved_version is None else self._controller.changed_collections(self._saved_version)
+        self._segment_writer.write(snapshot.data, changed)
+        self._saved_version = snapshot.version
+
+    def _read_options(self) -> Tuple[Any, ...]:
+        return (*super()._read_options(), self.streaming, self.lazy, self._id_name)
+
+    def _read_lazy_data(self) -> Dict[str, Any]:
+        try:
+            self.lazy_file = LazyJSONFile(self.resource, self._id_name, self.lazy_cache_size)
+            json_contents: Dict[str, Any] = self.lazy_file.load()
+        except ValueError as error:
+            # json.JSONDecodeError, or an empty file that cannot be mapped
+            if self.lazy_file is not None:
+                self.lazy_file.close()
+                self.lazy_file = None
+            raise JSONAdapterError(f'Failed to decode json file : {error.args}') from error
+        return json_contents
@@ -0,0 +1,188 @@
+import itertools
+import json
+import os
+import re
+import threading
+from typing import Any, Dict, Iterator, List, Optional, TextIO, Tuple
+
+import data_server.data_server_types as dt
+from data_server.core.files import atomic_write, is_compressed, open_text
+from data_server.errors import JSONLinesAdapterError
+
+from .adapter import DataAdapter
+
+TOMBSTONE_KEY = '__deleted__'
+# lines decoded by one call to the decoder
+CHUNK_LINES = 1 << 16
+# the end of an object followed by another one, e.g two records on one line
+OBJECT_BOUNDARY = re.compile(r'\}\s*,\s*\{')
+
+
+class JSONLinesAdapter(DataAdapter):
+    """
+    extends DataAdapter, serves a json lines file with one item per line as a list collection
+    :args resource("path to a .jsonl or .ndjson file"), key("name of the collection, the file name by default"),
+    compact_after("number of superseded lines a file may always keep")
+
+    Saves append a line for every added or changed item and a tombstone line `{"__deleted__": <id>}` for every
+    deleted one, so their cost depends on the changes instead of the size of the file. While loading, a line replaces
+    the earlier item with the same id and a tombstone removes it, which means a file cannot keep two items with one
+    id. Once the superseded lines outnumber both `compact_after` and the items, a save rewrites the file with only the
+    current items.
+    """
+
+    def __init__(self, resource: str, key: Optional[str] = None, compact_after: int = 1000, **kwargs: Any):
+        if not os.path.exists(resource):
+            raise JSONLinesAdapterError(f'{resource} does not exist')
+        self.key = self._generate_key(resource, key)
+        self.compact_after = compact_after
+        self._id_name = kwargs.get('id_name', 'id')
+        # lines of the file that were replaced or deleted by later lines, including tombstones
+        self._superseded_lines = 0
+        # changes since the last save as (data version, change), None instead of a change requires a rewrite
+        self._unsaved_changes: List[Tuple[int, Optional[dt.Change]]] = []
+        self._changes_lock = threading.Lock()
+        super().__init__(resource, **kwargs)
+        if self._controller.fix:
+            # fixing the data on load changed items that are already in the file
+            self._unsaved_changes.append((0, None))
+        self._add_change_listener(self._track_change)
+
+    def read_data(self) -> Dict[str, Any]:
+        items: Dict[int, Any] = {}
+        positions: Dict[Any, int] = {}
+        lines = 0
+        with open_text(self.resource, encoding='utf-8') as lines_file:
+            for position, record in enumerate(self._read_records(lines_file)):
+                lines += 1
+                if not isinstance(record, dict):
+                    raise JSONLinesAdapterError(f'record {position + 1} of {self.resource} is not an object')
+                if len(record) == 1 and TOMBSTONE_KEY in record:
+                    deleted = positions.pop(record[TOMBSTONE_KEY], None)
+                    if deleted is not None:
+                        del items[deleted]
+                    continue
+                id = record.get(self._id_name)
+                if id is not None:
+                    # an item that was written again keeps its place in the collection
+                    position = positions.setdefault(id, position)
+                if self.record_compactor is not None:
+                    record = self.record_compactor.compact(record)
+                items[position] = record
+        self._superseded_lines = lines - len(items)
+        return {self.key: list(items.values())}
+
+    def save_data(self, data: Optional[Dict[str, Any]] = None) -> None:
+        with self._saving():
+            if data is None:
+                snapshot = self._controller.snapshot()
+                data, version = snapshot.data, snapshot.version
+            else:
+                # the changes that are part of the given data are unknown, so all of them are rewritten
+                version = self._controller.version
+                with self._changes_lock:
+                    self._unsaved_changes.append((0, None))
+            with self._changes_lock:
+                changes = [change for change_version, change in self._unsaved_changes if change_version <= version]
+                self._unsaved_changes = [change for change in self._unsaved_changes if change[0] > version]
+            items = data.get(self.key)
+            assert items is not None, f'{self.key!r} is missing from the data'
+            try:
+                superseded_lines = self._superseded_lines + sum(map(self._superseded_by, changes))
+                if (
+                    None in changes
+                    or superseded_lines > max(self.compact_after, len(items))
+                    # changes cannot be appended to a compressed file
+                    or is_compressed(self.resource)
+                ):
+                    self._write_items(items)
+                    self._superseded_lines = 0
+                else:
+                    self._append_changes([change for change in changes if change is not None])
+                    self._superseded_lines = superseded_lines
+            except BaseException:
+                with self._changes_lock:
+                    self._unsaved_changes.insert(0, (0, None))
+                raise
+
+    def _read_options(self) -> Tuple[Any, ...]:
+        return (*super()._read_options(), self.key, self._id_name)
+
+    def _get_read_state(self) -> Any:
+        return self._superseded_lines
+
+    def _set_read_state(self, state: Any) -> None:
+        self._superseded_lines = state
+
+    def _read_records(self, lines_file: TextIO) -> Iterator[Any]:
+        decoder = json.JSONDecoder(object_pairs_hook=self.interner.intern_pairs if self.interner is not None else None)
+        line_number = 0
+        for chunk in iter(lambda: list(itertools.islice(lines_file, CHUNK_LINES)), []):
+            lines = [line for line in chunk if line and not line.isspace()]
+            # decoding the lines of a chunk as one array is much faster than decoding them one by one, which is only
+            # equivalent when no line holds the end of one object and the start of the next, so that every comma
+            # between lines separates two records
+            records = None
+            if OBJECT_BOUNDARY.search(''.join(lines)) is None:
+                try:
+                    document = '[' + ','.join(lines) + ']'
+                    records = decoder.decode(document) if self.interner is not None else self.codec.loads(document)
+                except json.JSONDecodeError:
+                    pass
+            if records is None or len(records) != len(lines):
+                records = [self._decode_line(decoder, line, line_number + offset) for offset, line in enumerate(chunk)]
+                records = [record for record, line in zip(records, chunk) if line and not line.isspace()]
+            line_number += len(chunk)
+            yield from records
+
+    def _decode_line(self, decoder: json.JSONDecoder, line: str, line_number: int) -> Any:
+        if not line or line.isspace():
+            return None
+        try:
+            return decoder.decode(line)
+        except json.JSONDecodeError as error:
+            raise JSONLinesAdapterError(
+                f'Failed to decode line {line_number + 1} of {self.resource}: {error}'
+            ) from error
+
+    def _track_change(self, change: dt.Change) -> None:
+        # called while the controller holds its write lock, so the version is the one of this change
+        # reloaded changes are already in the file
+        if change.persisted or change.path != [self.key]:
+            return
+        with self._changes_lock:
+            self._unsaved_changes.append(
+                (self._controller.version, None if change.type == dt.ChangeType.RESET else change)
+            )
+
+    @staticmethod
+    def _superseded_by(change: Optional[dt.Change]) -> int:
+        if change is None or change.type == dt.ChangeType.ADD:
+            return 0
+        # an update supersedes the previous line of the item, a delete also its own tombstone
+        return 1 if change.type == dt.ChangeType.UPDATE else 2
+
+    def _encode_change(self, change: dt.Change) -> str:
+        assert change.item is not None
+        if change.type == dt.ChangeType.DELETE:
+            return self.codec.dumps({TOMBSTONE_KEY: change.item.get(self._id_name)}).decode()
+        return self.codec.dumps(change.item).decode()
+
+    def _append_changes(self, changes: List[dt.Change]) -> None:
+        if not changes:
+            return
+        ends_with_newline = self._ends_with_newline(self.resource)
+        with open(self.resource, 'r+', encoding='utf-8') as output_file:
+            output_file.seek(0, os.SEEK_END)
+            if not ends_with_newline:
+                output_file.write('\n')
+            output_file.writelines(self._encode_change(change) + '\n' for change in changes)
+            if self.fsync_saves:
+                output_file.flush()
+                os.fsync(output_file.fileno())
+
+    def _write_items(self, items: dt.JSONItems) -> None:
+        with atomic_write(
+            self.resource, fsync=self.fsync_saves, encoding='utf-8', compression_level=self.compression_level
+        ) as output_file:
+            output_file.writelines(self.codec.dumps(item).decode() + '\n' for item in items)
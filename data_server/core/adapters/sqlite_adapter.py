@@ -0,0 +1,292 @@
+import os
+import sqlite3
+import threading
+import uuid
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+import data_server.data_server_types as dt
+from data_server.core.codec import JSONCodec, get_codec
+from data_server.errors import DataControllerError, DuplicateIDFoundError, ItemNotFoundError, SQLiteAdapterError
+
+from .adapter import DataAdapter
+
+COLUMNS = ['row_id', 'id', 'item']
+
+
+class SQLiteAdapter(DataAdapter):
+    """
+    extends DataAdapter, serves the tables of a sqlite database as list collections
+    :args resource("path to a sqlite database")
+
+    Every collection is a table with a `row_id` primary key that keeps the order items were added in, an indexed `id`
+    column and an `item` column with the item encoded as json. Tables with other columns are left out. Filters,
+    sorting and paging are run by sqlite. Writes change one row and are committed right away, so `save_data` has
+    nothing left to save and write-ahead logging is not needed. Opening a database reads nothing but its schema, so
+    there is nothing to keep in a startup cache either, and changes made by other processes are seen by the next query
+    without watching the file.
+
+    When sorting by id, items without an id are ordered before the others.
+
+    Both options below change the database file for every program that opens it, so they are off by default. With
+    `wal_mode`, the database is switched to sqlite's write-ahead journal, which lets reads run while a write commits
+    and only syncs the journal on commits unless `fsync_saves` is set. With `auto_index`, a field is indexed the
+    first time it is filtered on, which adds the index to the schema of the database.
+    """
+
+    def __init__(
+        self,
+        resource: str,
+        *,
+        write_ahead_log: bool = False,
+        startup_cache: bool = False,
+        watch_interval: float = 0,
+        wal_mode: bool = False,
+        auto_index: bool = False,
+        **kwargs: Any,
+    ):
+        if not os.path.exists(resource):
+            raise SQLiteAdapterError(f'{resource} does not exist')
+        self.wal_mode = wal_mode
+        self.auto_index = auto_index
+        self.tables: List[str] = []
+        self._indexes: Set[str] = set()
+        self._lock = threading.Lock()
+        super().__init__(resource, **kwargs)
+        self._controller.id_type = self._get_stored_id_type()
+
+    @classmethod
+    def create_database(cls, path: str, data: dt.JSONItem, id_name: str = 'id') -> None:
+        """
+        Creates a sqlite database at `path` with a table for every list in `data`, e.g to serve a json file from sqlite.
+        """
+        connection = sqlite3.connect(path)
+        with connection:
+            _write_tables(connection, data, id_name, get_codec())
+        connection.close()
+
+    def read_data(self) -> Dict[str, Any]:
+        self._connection = sqlite3.connect(self.resource, isolation_level=None, check_same_thread=False)
+        if self.wal_mode:
+            self._connection.execute('PRAGMA journal_mode=WAL')
+            # a commit in wal mode that was not synced can be lost, but it cannot corrupt the database
+            self._connection.execute(f'PRAGMA synchronous={"FULL" if self.fsync_saves else "NORMAL"}')
+        self._read_schema()
+        # the controller only knows the names of the collections, their items stay in the database
+        return {table: [] for table in self.tables}
+
+    def save_data(self, data: Optional[dt.JSONItem] = None) -> None:
+        """
+        Replaces the collections with the lists in `data`. Without `data` nothing is written, since every change was
+        committed when it was made.
+        """
+        if data is None:
+            return
+        with self._lock:
+            with self._connection:
+                self._connection.execute('BEGIN')
+                for table in self.tables:
+                    self._connection.execute(f'DROP TABLE {_quote(table)}')
+                _write_tables(self._connection, data, self._controller.id_name, self.codec)
+            self._read_schema()
+        self._controller.data = {table: [] for table in self.tables}
+        self._url_data = self._get_url_data()
+
+    def close(self) -> None:
+        super().close()
+        self._connection.close()
+
+    def get_data(self) -> dt.JSONItem:
+        return {
+            table: [
+                self.codec.loads(item) for (item,) in self._query(f'SELECT item FROM {_quote(table)} ORDER BY row_id')
+            ]
+            for table in self.tables
+        }
+
+    def execute_get_item_request(self, path: str, id: dt.IdType) -> dt.JSONItem:
+        table = self._get_table(path)
+        row = self._find_row(table, id)
+        if row is None:
+            raise ItemNotFoundError(f'No item with id {id} exists')
+        return row[1]
+
+    def execute_get_request(self, path: str, **filters: str) -> dt.JSONItems:
+        table = self._get_table(path)
+        try:
+            query = self._controller.parse_items_query(filters)
+        except ValueError as error:
+            raise DataControllerError(description=error.args[0], code=400) from error
+        conditions, parameters = [], []
+        for key, value in query.filters.items():
+            if key == self._controller.id_name:
+                conditions.append('id = ?')
+            else:
+                if self.auto_index:
+                    self._create_index(table, key)
+                conditions.append(f'{_extract(key)} = ?')
+            parameters.append(value)
+        where = f' WHERE {" AND ".join(conditions)}' if conditions else ''
+        order = 'DESC' if query.reverse else 'ASC'
+        if query.sort_key == self._controller.id_name:
+            sort_value = 'id'
+            ordering = f'id {order}'
+        else:
+            # like the controller, items without the sort key are sorted by `sort_default` and null values come last
+            path = _json_path(query.sort_key)
+            sort_value = f"CASE WHEN json_type(item, '{path}') IS NULL THEN ? ELSE json_extract(item, '{path}') END"
+            ordering = f'sort_value IS NULL {order}, sort_value {order}'
+            parameters.insert(0, query.sort_default)
+        statement = (
+            f'SELECT item, {sort_value} AS sort_value FROM {_quote(table)}{where} '
+            f'ORDER BY {ordering}, row_id LIMIT ? OFFSET ?'
+        )
+        parameters.extend([query.end_index - query.start_index, query.start_index])
+        return [self.codec.loads(item) for item, _ in self._query(statement, parameters)]
+
+    def execute_post_request(self, path: str, data: Any) -> dt.JSONItem:
+        table = self._get_table(path)
+        controller = self._controller
+        with self._lock:
+            item: dt.JSONItem = data.copy()
+            if not controller.auto_generate_id and controller.id_name in item:
+                if self._find_row(table, item[controller.id_name], locked=True) is not None:
+                    raise DuplicateIDFoundError(f'an item exists with same id {item[controller.id_name]}', code=409)
+            if controller.auto_generate_id and controller.id_name not in item:
+                item[controller.id_name] = self._generate_id(table)
+            item = controller.add_timestamps(item)
+            self._connection.execute(
+                f'INSERT INTO {_quote(table)} (id, item) VALUES (?, ?)',
+                (item.get(controller.id_name), self._encode(item)),
+            )
+        return item
+
+    def execute_patch_request(self, path: str, id: dt.IdType, data: Any) -> dt.JSONItem:
+        if self._controller.id_name in data:
+            raise ValueError('id cannot be patched')
+        return self._update_item(path, id, lambda item: {**item, **data})
+
+    def execute_put_request(self, path: str, id: dt.IdType, data: Any) -> dt.JSONItem:
+        if self._controller.id_name in data and data[self._controller.id_name] != id:
+            raise ValueError('id cannot be replaced')
+        return self._update_item(path, id, lambda item: {**data, self._controller.id_name: id})
+
+    def execute_delete_request(self, path: str, id: dt.IdType) -> None:
+        table = self._get_table(path)
+        with self._lock:
+            row = self._find_row(table, id, locked=True)
+            if row is None:
+                raise ItemNotFoundError(
+                    f'item with id {id} could not be resolved from path {self._split_paths(path)!r}'
+                )
+            self._connection.execute(f'DELETE FROM {_quote(table)} WHERE row_id = ?', (row[0],))
+
+    def create_snapshot(self, name: str) -> int:
+        raise SQLiteAdapterError('snapshots are not supported for sqlite databases', 501)
+
+    def restore_snapshot(self, name: str) -> int:
+        raise SQLiteAdapterError('snapshots are not supported for sqlite databases', 501)
+
+    def delete_snapshot(self, name: str) -> None:
+        raise SQLiteAdapterError('snapshots are not supported for sqlite databases', 501)
+
+    def _get_url_data(self) -> List[Tuple[str, type]]:
+        return [(f'/{table}', list) for table in self.tables]
+
+    def _read_schema(self) -> None:
+        tables = self._connection.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'table' AND name NOT LIKE 'sqlite_%' ORDER BY rowid"
+        ).fetchall()
+        self.tables = [
+            name
+            for (name,) in tables
+            if [column[1] for column in self._connection.execute(f'PRAGMA table_info({_quote(name)})')] == COLUMNS
+        ]
+        indexes = self._connection.execute("SELECT name FROM sqlite_master WHERE type = 'index'").fetchall()
+        self._indexes = {name for (name,) in indexes}
+
+    def _get_stored_id_type(self) -> Optional[type]:
+        for table in self.tables:
+            rows = self._query(f'SELECT id FROM {_quote(table)} WHERE id IS NOT NULL ORDER BY row_id LIMIT 1')
+            if rows:
+                return type(rows[0][0])
+        return None
+
+    def _get_table(self, path: str) -> str:
+        path_as_list = self._split_paths(path)
+        if len(path_as_list) != 1 or path_as_list[0] not in self.tables:
+            raise ItemNotFoundError(f'{path_as_list} could not be resolved in data')
+        return path_as_list[0]
+
+    def _query(self, statement: str, parameters: Iterable[Any] = ()) -> List[Tuple[Any, ...]]:
+        with self._lock:
+            return self._connection.execute(statement, tuple(parameters)).fetchall()
+
+    def _find_row(self, table: str, id: Any, locked: bool = False) -> Optional[Tuple[int, dt.JSONItem]]:
+        statement = f'SELECT row_id, item FROM {_quote(table)} WHERE id = ? ORDER BY row_id LIMIT 1'
+        rows = self._connection.execute(statement, (id,)).fetchall() if locked else self._query(statement, (id,))
+        return (rows[0][0], self.codec.loads(rows[0][1])) if rows else None
+
+    def _update_item(self, path: str, id: dt.IdType, update: Callable[[dt.JSONItem], dt.JSONItem]) -> dt.JSONItem:
+        table = self._get_table(path)
+        with self._lock:
+            row = self._find_row(table, id, locked=True)
+            if row is None:
+                raise ItemNotFoundError(
+                    f'item with id {id} could not be resolved from path {self._split_paths(path)!r}'
+                )
+            item: dt.JSONItem = self._controller.update_timestamps(update(row[1]))
+            self._connection.execute(
+                f'UPDATE {_quote(table)} SET item = ? WHERE row_id = ?', (self._encode(item), row[0])
+            )
+        return item
+
+    def _encode(self, item: dt.JSONItem) -> str:
+        return self.codec.dumps(item).decode()
+
+    def _generate_id(self, table: str) -> dt.IdType:
+        if self._controller.id_type is int:
+            (largest,) = self._connection.execute(
+                f"SELECT MAX(id) FROM {_quote(table)} WHERE typeof(id) = 'integer'"
+            ).fetchone()
+            return (largest or 0) + 1
+        string_id = str(uuid.uuid4())
+        while self._find_row(table, string_id, locked=True) is not None:
+            string_id = str(uuid.uuid4())
+        return string_id
+
+    def _create_index(self, table: str, key: str) -> None:
+        name = f'{table}.{key}'
+        if name in self._indexes:
+            return
+        with self._lock:
+            self._connection.execute(f'CREATE INDEX IF NOT EXISTS {_quote(name)} ON {_quote(table)} ({_extract(key)})')
+            self._indexes.add(name)
+
+
+def _write_tables(connection: sqlite3.Connection, data: dt.JSONItem, id_name: str, codec: JSONCodec) -> None:
+    for key, value in data.items():
+        if not isinstance(value, list):
+            raise SQLiteAdapterError(f'{key!r} is not a list, only lists can be stored in a sqlite database')
+    for key, items in data.items():
+        connection.execute(f'DROP TABLE IF EXISTS {_quote(key)}')
+        connection.execute(f'CREATE TABLE {_quote(key)} (row_id INTEGER PRIMARY KEY, id, item TEXT NOT NULL)')
+        connection.execute(f'CREATE INDEX {_quote(key + ".id")} ON {_quote(key)} (id)')
+        connection.executemany(
+            f'INSERT INTO {_quote(key)} (id, item) VALUES (?, ?)',
+            ((item.get(id_name), codec.dumps(item).decode()) for item in items),
+        )
+
+
+def _quote(name: str) -> str:
+    return '"' + name.replace('"', '""') + '"'
+
+
+def _json_path(key: str) -> str:
+    # the path is written into the statement instead of being a parameter, so that indexes on it can be used
+    if '"' in key:
+        raise DataControllerError(f'{key!r} cannot be queried, keys of sqlite collections cannot contain quotes', 400)
+    return '$."' + key.replace("'", "''") + '"'
+
+
+def _extract(key: str) -> str:
+    return f"json_extract(item, '{_json_path(key)}')"
@@ -0,0 +1,116 @@
+import importlib
+import json
+import typing as t
+
+from data_server.core.records import json_default
+from data_server.errors import DataServerError
+
+# spaces per level of indented data files
+INDENT = 4
+
+
+class JSONCodec:
+    """
+    Encodes and decodes json with the standard library. The codecs of faster libraries extend it and produce json
+    that decodes to the same values, though numbers may be written differently, e.g 1e20 instead of 1e+20. A value
+    they cannot handle themselves, e.g an integer that does not fit into 64 bits, is passed on to this codec.
+    Invalid documents raise `json.JSONDecodeError` with every codec.
+
+    NaN and infinity are not part of json. This codec writes them like `json.dumps` does, orjson writes them as null.
+    Finding them to write them like this codec would mean walking every encoded value in Python, which made encoding
+    with orjson slower than with this codec, so data that holds them should be served with the json codec.
+    """
+
+    name = 'json'
+
+    def dumps(self, value: t.Any) -> bytes:
+        """
+        Encodes `value` as utf-8 json without indentation or spaces, e.g for a response. NaN and infinity are written
+        like `json.dumps` does.
+        """
+        try:
+            return json.dumps(value, ensure_ascii=False, separators=(',', ':'), default=json_default).encode()
+        except UnicodeEncodeError:
+            # a lone surrogate, which json.loads accepts, cannot be encoded as utf-8 but can be escaped
+            return json.dumps(value, separators=(',', ':'), default=json_default).encode()
+
+    def loads(self, document: t.Union[str, bytes]) -> t.Any:
+        return json.loads(document)
+
+    def dump(self, value: t.Any, json_file: t.TextIO, *, compact: bool = False) -> None:
+        """
+        Writes `value` to a data file, indented with sorted keys unless `compact`. Indented files look the same with
+        every codec, so they are always written by the standard library.
+        """
+        if compact:
+            # unlike json.dump, json.dumps uses the c encoder
+            json_file.write(self.dumps(value).decode())
+        else:
+            # json.dump writes the encoded chunks as they are produced instead of building the whole document first
+            json.dump(value, json_file, indent=INDENT, sort_keys=True, default=json_default)
+
+
+class OrjsonCodec(JSONCodec):
+    name = 'orjson'
+
+    def __init__(self) -> None:
+        self._orjson = importlib.import_module('orjson')
+
+    def dumps(self, value: t.Any) -> bytes:
+        try:
+            encoded = t.cast(bytes, self._orjson.dumps(value, default=json_default))
+        except TypeError:
+            # orjson.JSONEncodeError, e.g for large integers, keys that are not strings or lone surrogates
+            return super().dumps(value)
+        return encoded
+
+    def loads(self, document: t.Union[str, bytes]) -> t.Any:
+        try:
+            return self._orjson.loads(document)
+        except ValueError:
+            # also raises the error of an invalid document, with the same message as without orjson
+            return super().loads(document)
+
+
+class UjsonCodec(JSONCodec):
+    name = 'ujson'
+
+    def __init__(self) -> None:
+        self._ujson = importlib.import_module('ujson')
+
+    def dumps(self, value: t.Any) -> bytes:
+        try:
+            encoded: str = self._ujson.dumps(
+                value, default=json_default, ensure_ascii=False, escape_forward_slashes=False
+            )
+        except (TypeError, OverflowError, UnicodeEncodeError):
+            return super().dumps(value)
+        return encoded.encode()
+
+    def loads(self, document: t.Union[str, bytes]) -> t.Any:
+        try:
+            return self._ujson.loads(document)
+        except ValueError:
+            return super().loads(document)
+
+
+# in order of preference
+CODECS: t.Dict[str, t.Type[JSONCodec]] = {'orjson': OrjsonCodec, 'ujson': UjsonCodec, 'json': JSONCodec}
+
+
+def get_codec(name: t.Optional[str] = None) -> JSONCodec:
+    """
+    Returns the codec called `name`, or the fastest installed one when no name or 'auto' is given.
+    """
+    if name is None or name == 'auto':
+        for codec_class in CODECS.values():
+            try:
+                return codec_class()
+            except ImportError:
+                continue
+    if name not in CODECS:
+        raise DataServerError(f'{name!r} is not a json codec, choose one of {", ".join(CODECS)}')
+    try:
+        return CODECS[name]()
+    except ImportError as error:
+        raise DataServerError(f'the {name} json codec needs {name} to be installed') from error
@@ -0,0 +1,211 @@
+import copy
+import typing as t
+from array import array
+
+import data_server.data_server_types as dt
+
+
+class RowCollection(t.Sequence[dt.JSONItem]):
+    """
+    A list collection that reads its items by row id from storage shared with the collections derived from it, plus
+    a vector of the row ids in the collection.
+
+    Like every published collection it is never mutated. Slicing, concatenating and `copy` return new collections that
+    share the storage, and rows that are added or replaced are kept as dictionaries in an override map keyed by row
+    id, so a write only copies the row id vector.
+    """
+
+    def __init__(
+        self,
+        row_ids: 'array[int]',
+        overrides: t.Optional[t.Dict[int, dt.JSONItem]] = None,
+        next_row_id: t.Optional[int] = None,
+    ):
+        self.row_ids = row_ids
+        self.overrides: t.Dict[int, dt.JSONItem] = overrides if overrides is not None else {}
+        self.next_row_id = next_row_id if next_row_id is not None else len(row_ids)
+
+    def __len__(self) -> int:
+        return len(self.row_ids)
+
+    @t.overload
+    def __getitem__(self, index: int) -> dt.JSONItem: ...
+
+    @t.overload
+    def __getitem__(self, index: slice) -> 'RowCollection': ...
+
+    def __getitem__(self, index: t.Union[int, slice]) -> t.Union[dt.JSONItem, 'RowCollection']:
+        if isinstance(index, slice):
+            return self._derive(self.row_ids[index])
+        return self._get_row(self.row_ids[index])
+
+    def __iter__(self) -> t.Iterator[dt.JSONItem]:
+        for row_id in self.row_ids:
+            yield self._get_row(row_id)
+
+    def __add__(self, other: t.Sequence[dt.JSONItem]) -> 'RowCollection':
+        if isinstance(other, RowCollection) and self._shares_storage(other):
+            return self._derive(
+                self.row_ids + other.row_ids,
+                {**self.overrides, **other.overrides},
+                max(self.next_row_id, other.next_row_id),
+            )
+        new_row_ids = array('q', range(self.next_row_id, self.next_row_id + len(other)))
+        overrides = {**self.overrides, **dict(zip(new_row_ids, other))}
+        return self._derive(self.row_ids + new_row_ids, overrides, self.next_row_id + len(other))
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, (list, RowCollection)):
+            return NotImplemented
+        return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+
+    def __repr__(self) -> str:
+        return f'{type(self).__name__}({list(self)!r})'
+
+    def copy(self) -> 'RowCollection':
+        return self._derive(self.row_ids[:])
+
+    def __setitem__(self, index: int, item: dt.JSONItem) -> None:
+        # only used on a fresh copy that has not been published yet
+        self.overrides = {**self.overrides, self.row_ids[index]: item}
+
+    def column_values(self, key: str, default: t.Any = None) -> t.List[t.Any]:
+        return [item.get(key, default) for item in self]
+
+    def filter(self, **filters: t.Any) -> dt.JSONItems:
+        if not filters:
+            return list(self)
+        matches = [True] * len(self.row_ids)
+        for key, value in filters.items():
+            for position, column_value in enumerate(self.column_values(key)):
+                if matches[position] and column_value != value:
+                    matches[position] = False
+        return [self._get_row(row_id) for row_id, matched in zip(self.row_ids, matches) if matched]
+
+    def index_of(self, key: str, value: t.Any) -> t.Optional[int]:
+        for position, column_value in enumerate(self.column_values(key)):
+            if column_value == value:
+                return position
+        return None
+
+    def _get_row(self, row_id: int) -> dt.JSONItem:
+        raise NotImplementedError
+
+    def _indexed_position(self, key: str, value: t.Any, stored_row_id: t.Optional[int]) -> t.Optional[int]:
+        """
+        Returns the position of the first row whose `key` is `value`, given the row id of the only stored row with
+        that value from an index of the storage. Rows in the override map are checked instead of the storage.
+        """
+        row_ids = [row_id for row_id, item in self.overrides.items() if item.get(key) == value]
+        if stored_row_id is not None and stored_row_id not in self.overrides:
+            row_ids.append(stored_row_id)
+        positions = []
+        for row_id in row_ids:
+            if row_id < len(self.row_ids) and self.row_ids[row_id] == row_id:
+                # rows keep their position until a row before them is deleted
+                positions.append(row_id)
+            elif row_id in self.row_ids:
+                positions.append(self.row_ids.index(row_id))
+        return min(positions, default=None)
+
+    def _shares_storage(self, other: 'RowCollection') -> bool:
+        raise NotImplementedError
+
+    def _derive(
+        self,
+        row_ids: 'array[int]',
+        overrides: t.Optional[t.Dict[int, dt.JSONItem]] = None,
+        next_row_id: t.Optional[int] = None,
+    ) -> 'RowCollection':
+        collection = copy.copy(self)
+        collection.row_ids = row_ids
+        collection.overrides = self.overrides if overrides is None else overrides
+        collection.next_row_id = self.next_row_id if next_row_id is None else next_row_id
+        return collection
+
+
+class ColumnarCollection(RowCollection):
+    """
+    A list collection stored as one list per column plus a vector of row ids. Items are only built as dictionaries
+    when they are returned, scans over a field read its column directly.
+    """
+
+    def __init__(
+        self,
+        fieldnames: t.Sequence[str],
+        columns: t.Sequence[t.Sequence[t.Any]],
+        row_ids: t.Optional['array[int]'] = None,
+        overrides: t.Optional[t.Dict[int, dt.JSONItem]] = None,
+        next_row_id: t.Optional[int] = None,
+    ):
+        self.fieldnames = list(fieldnames)
+        self.columns = list(columns)
+        self._column_index = {name: index for index, name in enumerate(self.fieldnames)}
+        row_count = len(self.columns[0]) if self.columns else 0
+        super().__init__(
+            row_ids if row_ids is not None else array('q', range(row_count)),
+            overrides,
+            next_row_id if next_row_id is not None else row_count,
+        )
+
+    @classmethod
+    def from_rows(cls, fieldnames: t.Sequence[str], rows: t.Iterable[t.Sequence[t.Any]]) -> 'ColumnarCollection':
+        """
+        Builds a collection from rows of values ordered like `fieldnames`. Like `csv.DictReader`, empty rows are
+        skipped and missing trailing values are stored as None, extra values are dropped.
+        """
+        columns: t.List[t.List[t.Any]] = [[] for _ in fieldnames]
+        appends = [column.append for column in columns]
+        width = len(fieldnames)
+        for row in rows:
+            if not row:
+                continue
+            if len(row) < width:
+                row = [*row, *[None] * (width - len(row))]
+            for append, value in zip(appends, row):
+                append(value)
+        return cls(fieldnames, columns)
+
+    def column_values(self, key: str, default: t.Any = None) -> t.List[t.Any]:
+        column_index = self._column_index.get(key)
+        if column_index is None and not self.overrides:
+            return [default] * len(self.row_ids)
+        column = self.columns[column_index] if column_index is not None else None
+        values = []
+        for row_id in self.row_ids:
+            override = self.overrides.get(row_id)
+            if override is not None:
+                values.append(override.get(key, default))
+            elif column is not None:
+                values.append(column[row_id])
+            else:
+                values.append(default)
+        return values
+
+    def _get_row(self, row_id: int) -> dt.JSONItem:
+        override = self.overrides.get(row_id)
+        if override is not None:
+            return override
+        return {name: column[row_id] for name, column in zip(self.fieldnames, self.columns)}
+
+    def _shares_storage(self, other: RowCollection) -> bool:
+        return isinstance(other, ColumnarCollection) and other.columns is self.columns
+
+
+def column_values(items: t.Sequence[dt.JSONItem], key: str, default: t.Any = None) -> t.List[t.Any]:
+    """
+    Returns `item.get(key, default)` for every item, reading the column directly for columnar collections.
+    """
+    if isinstance(items, RowCollection):
+        return items.column_values(key, default)
+    return [item.get(key, default) for item in items]
+
+
+def sort_value(value: t.Any) -> t.Tuple[bool, t.Any]:
+    """
+    A sort key that orders None after every other value, so fields with missing values can still be sorted.
+    """
+    return (value is None, value)
+
+
+COLLECTION_TYPES = (list, RowCollection)
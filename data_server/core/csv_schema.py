@@ -0,0 +1,218 @@
+import itertools
+import json
+import math
+import typing as t
+
+NULL_CELL = ''
+
+
+class ColumnType(t.NamedTuple):
+    """
+    How the cells of a csv column are parsed into values and formatted back. Empty cells are None in every type
+    except `str`.
+    """
+
+    name: str
+    value_types: t.Tuple[type, ...]
+    parse: t.Callable[[str], t.Any]
+    format: t.Callable[[t.Any], str]
+
+    def __reduce__(self) -> t.Tuple[t.Any, ...]:
+        # the functions of a type cannot be pickled, so the types defined here are pickled as their position
+        return (_known_type, (next(index for index, known in enumerate(KNOWN_TYPES) if known is self),))
+
+
+def _parse_float(cell: str) -> float:
+    value = float(cell)
+    if not math.isfinite(value):
+        raise ValueError(f'{cell!r} is not a finite number')
+    return value
+
+
+def _bool_type(true_cell: str, false_cell: str) -> ColumnType:
+    def parse(cell: str) -> bool:
+        if cell == true_cell:
+            return True
+        if cell == false_cell:
+            return False
+        raise ValueError(f'{cell!r} is not {true_cell!r} or {false_cell!r}')
+
+    return ColumnType('bool', (bool,), parse, lambda value: true_cell if value else false_cell)
+
+
+def _parse_number(cell: str) -> t.Union[int, float]:
+    try:
+        return int(cell)
+    except ValueError:
+        return _parse_float(cell)
+
+
+def _format_number(value: t.Union[int, float]) -> str:
+    return repr(value) if type(value) is float else str(value)
+
+
+def _parse_any_bool(cell: str) -> bool:
+    if cell.lower() in ('true', '1', 'yes'):
+        return True
+    if cell.lower() in ('false', '0', 'no'):
+        return False
+    raise ValueError(f'{cell!r} is not a boolean')
+
+
+STR = ColumnType('str', (str,), str, str)
+INT = ColumnType('int', (int,), int, str)
+FLOAT = ColumnType('float', (float,), _parse_float, repr)
+# integers and decimals mixed in one column, e.g `1` and `1.5`, each cell keeps the type it was written with
+NUMBER = ColumnType('number', (int, float), _parse_number, _format_number)
+NULL = ColumnType('null', (type(None),), lambda cell: None, lambda value: NULL_CELL)
+BOOL = ColumnType('bool', (bool,), _parse_any_bool, lambda value: 'true' if value else 'false')
+
+# tried in order during inference, a column gets the first type that reproduces every one of its cells exactly
+INFERRED_TYPES = [
+    INT,
+    FLOAT,
+    NUMBER,
+    _bool_type('true', 'false'),
+    _bool_type('True', 'False'),
+    _bool_type('TRUE', 'FALSE'),
+]
+SCHEMA_TYPES = {column_type.name: column_type for column_type in [STR, INT, FLOAT, NUMBER, NULL, BOOL]}
+KNOWN_TYPES = INFERRED_TYPES + list(SCHEMA_TYPES.values())
+
+
+def _known_type(index: int) -> ColumnType:
+    return KNOWN_TYPES[index]
+
+
+class CsvSchema:
+    """
+    The types of the columns of a csv file. Columns listed in a schema file keep their type, the other columns are
+    inferred from their cells when `infer` is set and are read as strings otherwise.
+
+    Inference only picks a type that formats every cell back to exactly the same text, so saving the collection
+    writes the file it was loaded from. Formatting values written through the API uses the same rules, e.g floats
+    are written with `repr`.
+    """
+
+    def __init__(self, types: t.Optional[t.Dict[str, ColumnType]] = None, *, infer: bool = True):
+        self.types: t.Dict[str, ColumnType] = dict(types or {})
+        self.infer = infer
+
+    @classmethod
+    def from_file(cls, path: str, *, infer: bool = True) -> 'CsvSchema':
+        """
+        Loads a json object that maps column names to one of `str`, `int`, `float`, `number`, `bool` or `null`.
+        """
+        with open(path) as schema_file:
+            type_names = json.load(schema_file)
+        if not isinstance(type_names, dict):
+            raise ValueError(f'csv schema {path!r} should be an object mapping column names to types')
+        types = {}
+        for column, type_name in type_names.items():
+            if type_name not in SCHEMA_TYPES:
+                raise ValueError(f'unknown type {type_name!r} for column {column!r}, use one of {list(SCHEMA_TYPES)}')
+            types[column] = SCHEMA_TYPES[type_name]
+        return cls(types, infer=infer)
+
+    def read_columns(
+        self,
+        fieldnames: t.Sequence[str],
+        rows: t.Iterable[t.Sequence[t.Optional[str]]],
+        sample_size: t.Optional[int] = None,
+    ) -> t.List[t.List[t.Any]]:
+        """
+        Splits `rows` into typed columns. Like `csv.DictReader`, empty rows are skipped and missing trailing cells are
+        None. Types are inferred from the first `sample_size` rows, or from every row when it is None, a column whose
+        later cells do not fit the inferred type is read as strings.
+        """
+        columns: t.List[t.List[t.Any]] = [[] for _ in fieldnames]
+        appends = [column.append for column in columns]
+        for row in rows:
+            if row:
+                for append, cell in itertools.zip_longest(appends, row[: len(fieldnames)]):
+                    append(cell)
+        return self.parse_columns(fieldnames, columns, sample_size)
+
+    def parse_columns(
+        self,
+        fieldnames: t.Sequence[str],
+        columns: t.List[t.List[t.Any]],
+        sample_size: t.Optional[int] = None,
+    ) -> t.List[t.List[t.Any]]:
+        """
+        Replaces the cells of typed columns with their values, like `read_columns` does for columns that were already
+        split, e.g by `read_csv_columns`.
+        """
+        sample_end = len(columns[0]) if columns and sample_size is None else sample_size
+        for index, name in enumerate(fieldnames):
+            cells = columns[index]
+            column_type = self.types.get(name)
+            if column_type is not None:
+                columns[index] = self._parse_cells(name, column_type, cells)
+            elif self.infer:
+                column_type = self._infer_type(cells[:sample_end])
+                checked_cells = cells[sample_end:]
+                if column_type is not STR and all(self._is_lossless(column_type, cell) for cell in checked_cells):
+                    self.types[name] = column_type
+                    columns[index] = self._parse_cells(name, column_type, cells)
+        return columns
+
+    def format_row(self, row: t.Mapping[str, t.Any]) -> t.Dict[str, t.Any]:
+        """
+        Formats the values of typed columns, values of another type (e.g written through the API) are left to the
+        csv writer.
+        """
+        formatted = dict(row)
+        for key, value in formatted.items():
+            column_type = self.types.get(key)
+            if column_type is not None and type(value) in column_type.value_types:
+                formatted[key] = column_type.format(value)
+        return formatted
+
+    def parse_value(self, column: str, value: t.Any) -> t.Any:
+        """
+        Converts a query value to the type of `column`, values that cannot be converted are returned unchanged.
+        """
+        column_type = self.types.get(column)
+        if column_type is None or type(value) is not str:
+            return value
+        if value == NULL_CELL:
+            return None
+        try:
+            return column_type.parse(value)
+        except ValueError:
+            return value
+
+    @staticmethod
+    def _parse_cells(name: str, column_type: ColumnType, cells: t.List[t.Optional[str]]) -> t.List[t.Any]:
+        if column_type is STR:
+            return cells
+        parse = column_type.parse
+        try:
+            return [None if cell is None or cell == NULL_CELL else parse(cell) for cell in cells]
+        except ValueError as error:
+            raise ValueError(f'column {name!r} is not {column_type.name}: {error}') from error
+
+    @classmethod
+    def _infer_type(cls, cells: t.List[t.Optional[str]]) -> ColumnType:
+        candidates = list(INFERRED_TYPES)
+        has_values = False
+        for cell in cells:
+            if cell is None or cell == NULL_CELL:
+                continue
+            has_values = True
+            candidates = [column_type for column_type in candidates if cls._is_lossless(column_type, cell)]
+            if not candidates:
+                return STR
+        if not has_values:
+            return NULL if cells else STR
+        return candidates[0]
+
+    @staticmethod
+    def _is_lossless(column_type: ColumnType, cell: t.Optional[str]) -> bool:
+        if cell is None or cell == NULL_CELL:
+            return True
+        try:
+            return column_type.format(column_type.parse(cell)) == cell
+        except ValueError:
+            return False
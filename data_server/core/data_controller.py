@@ -1,13 +1,31 @@
 import random
+import threading
 import typing as t
 from datetime import datetime
 from functools import reduce
 from uuid import uuid4
 
 import data_server.data_server_types as dt
+from data_server.core.columnar import COLLECTION_TYPES, RowCollection, column_values, sort_value
+from data_server.core.parallel_scan import ParallelScanner
+from data_server.core.vectorized_query import VectorizedQueryEngine
 from data_server.errors import DataControllerError, DuplicateIDFoundError, ItemNotFoundError
 
 
+class DataSnapshot(t.NamedTuple):
+    version: int
+    data: dt.JSONItem
+
+
+class ItemsQuery(t.NamedTuple):
+    filters: dt.FilterParams
+    sort_key: str
+    sort_default: t.Any
+    reverse: bool
+    start_index: int
+    end_index: int
+
+
 class DataController:
     def __init__(
         self,
@@ -24,10 +42,24 @@ class DataController:
         use_timestamps: bool = False,
         created_at_key_name: str = 'created_at',
         updated_at_key_name: str = 'updated_at',
+        parallel_scan_threshold: int = 0,
+        parallel_scan_workers: t.Optional[int] = None,
+        vectorized_query_threshold: int = 50_000,
     ):
         """
         Initializes a data controller class. DataController is an abstraction that allows querying and modifying data
         which is loaded as a dictionary.
+
+        Writes never mutate a published list or item in place. A single writer builds the next version of the
+        changed collection, sharing every untouched item with the previous one, and swaps it into the data in one
+        assignment, so readers can traverse the data without locking. The list of a collection is copied on every
+        write, which makes writes slower on large collections: besides finding the item by id, a write to a list of a
+        million items spends about 15ms copying it (see benchmarks/write_cost.py). Columnar and lazy collections only
+        copy their vector of row ids.
+
+        Queries on collections with at least `vectorized_query_threshold` items use NumPy when it is installed and
+        collections with at least `parallel_scan_threshold` items are scanned by a process pool. A threshold of 0
+        disables either path.
         """
         assert isinstance(data, dict), f'data must be of type dict not {type(data)}'
         self.data = data
@@ -43,12 +75,22 @@ class DataController:
         self.updated_at_key_name = updated_at_key_name
         self.id_type = self._get_id_type(data)
         self.fix = fix
+        self.version = 0
+        self._write_lock = threading.Lock()
+        self._snapshots: t.Dict[str, DataSnapshot] = {}
+        self._change_listeners: t.List[dt.ChangeListener] = []
+        # the version of the last write to every top level value, changes read from the resource are not writes
+        self._changed_versions: t.Dict[str, int] = {}
+        self._parallel_scanner = ParallelScanner(parallel_scan_threshold, parallel_scan_workers)
+        self._vectorized_engine = VectorizedQueryEngine(vectorized_query_threshold)
+        self.add_change_listener(self._vectorized_engine.on_change)
+        self.add_change_listener(self._parallel_scanner.on_change)
         if self.fix:
             self._fix_data(self.data)
 
     def get_items(self, path: dt.ItemPath, **filters: t.Any) -> dt.JSONItems:
         items = self._get_item_by_path_only(path)
-        assert isinstance(items, list), f'Expected value for {path!r} to be a list, got {items} instead'
+        assert isinstance(items, COLLECTION_TYPES), f'Expected value for {path!r} to be a list, got {items} instead'
         try:
             return self._get_items(items, **filters)
         except ValueError as error:
@@ -58,41 +100,210 @@ class DataController:
         return self._get_item_by_path_and_id(path, id)
 
     def delete_item(self, path: dt.ItemPath, id: dt.IdType) -> None:
-        parent, index = self._get_item_parent_and_index(path, id)
-        del parent[index]
+        with self._write_lock:
+            items, index = self._get_item_parent_and_index(path, id)
+            self._publish(path, items[:index] + items[index + 1 :], dt.ChangeType.DELETE, items[index])
 
     def patch_item(self, path: dt.ItemPath, id: dt.IdType, new_data: dt.JSONItem) -> dt.JSONItem:
         if self.id_name in new_data:
             raise ValueError('id cannot be patched')
-        parent, index = self._get_item_parent_and_index(path, id)
-        parent[index].update(new_data)
-        return self._update_timestamps(parent[index])
+        with self._write_lock:
+            items, index = self._get_item_parent_and_index(path, id)
+            item = self.update_timestamps({**items[index], **new_data})
+            self._publish(path, self._replace_at(items, index, item), dt.ChangeType.UPDATE, item)
+        return item
 
     def replace_item(self, path: dt.ItemPath, id: dt.IdType, new_data: dt.JSONItem) -> dt.JSONItem:
         if self.id_name in new_data and new_data[self.id_name] != id:
             raise ValueError('id cannot be replaced')
-        parent, index = self._get_item_parent_and_index(path, id)
-        parent[index] = {**new_data, self.id_name: id}
-        return self._update_timestamps(parent[index])
+        with self._write_lock:
+            items, index = self._get_item_parent_and_index(path, id)
+            item = self.update_timestamps({**new_data, self.id_name: id})
+            self._publish(path, self._replace_at(items, index, item), dt.ChangeType.UPDATE, item)
+        return item
 
     def add_item(self, path: dt.ItemPath, new_data: dt.JSONItem) -> dt.JSONItem:
-        items = self._get_item_by_path_only(path)
-        assert isinstance(items, list), f'Expected value for {path!r} to be a list, got {items} instead'
-        data = new_data.copy()
-        if not self.auto_generate_id and self.id_name in data:
-            if any(item[self.id_name] == data[self.id_name] for item in items):
-                raise DuplicateIDFoundError(f'an item exists with same id {data[self.id_name]}', code=409)
-        if self.auto_generate_id and self.id_name not in data:
-            data[self.id_name] = self._autogenerate_id(items)
-        data = self._add_timestamps(data)
-        items.append(data)
+        with self._write_lock:
+            items = self._get_item_by_path_only(path)
+            assert isinstance(items, COLLECTION_TYPES), f'Expected value for {path!r} to be a list, got {items} instead'
+            data = new_data.copy()
+            if not self.auto_generate_id and self.id_name in data:
+                if self._find_index(items, data[self.id_name]) is not None:
+                    raise DuplicateIDFoundError(f'an item exists with same id {data[self.id_name]}', code=409)
+            if self.auto_generate_id and self.id_name not in data:
+                data[self.id_name] = self._autogenerate_id(items)
+            data = self.add_timestamps(data)
+            self._publish(path, items + [data], dt.ChangeType.ADD, data)
         return data
 
+    def snapshot(self) -> DataSnapshot:
+        """
+        Returns the current version of the data. The returned dictionary is a shallow copy of the top level, every
+        value below it is shared with the live data and is never changed by later writes.
+        """
+        with self._write_lock:
+            return DataSnapshot(self.version, dict(self.data))
+
+    def create_snapshot(self, name: str) -> DataSnapshot:
+        snapshot = self.snapshot()
+        self._snapshots[name] = snapshot
+        return snapshot
+
+    def restore_snapshot(self, name: str) -> DataSnapshot:
+        """
+        Restores the data to a snapshot created with `create_snapshot`. Since published values are never mutated,
+        restoring only puts back the top level values that changed since the snapshot was taken.
+        """
+        if name not in self._snapshots:
+            raise ItemNotFoundError(f'snapshot {name!r} does not exist')
+        snapshot = self._snapshots[name]
+        with self._write_lock:
+            self.version += 1
+            for key in [key for key in self.data if key not in snapshot.data]:
+                self._notify(dt.Change(dt.ChangeType.RESET, [key], self.data.pop(key), None))
+            for key, value in snapshot.data.items():
+                if self.data.get(key) is not value:
+                    previous, self.data[key] = self.data.get(key), value
+                    self._notify(dt.Change(dt.ChangeType.RESET, [key], previous, value))
+        return DataSnapshot(self.version, snapshot.data)
+
+    def apply_change(self, change: dt.Change) -> None:
+        """
+        Applies a change that was recorded by a change listener, e.g when it is read back from a log. Ids and
+        timestamps are not generated, the recorded item is stored as it is. Added and updated items replace an item
+        with the same id and deleting a missing item does nothing, so applying a change twice has no further effect.
+        Listeners are notified of a change that is `persisted` with a persisted change as well.
+        """
+        with self._write_lock:
+            if change.type == dt.ChangeType.RESET:
+                self.version += 1
+                key = change.path[0]
+                previous = self.data.pop(key) if change.current is None else self.data.get(key)
+                if change.current is not None:
+                    self.data[key] = change.current
+                self._notify(
+                    dt.Change(dt.ChangeType.RESET, [key], previous, change.current, persisted=change.persisted)
+                )
+                return
+            assert change.item is not None
+            items = self._get_item_by_path_only(change.path)
+            assert isinstance(items, COLLECTION_TYPES), f'Expected value for {change.path!r} to be a list'
+            id = change.item.get(self.id_name)
+            index = self._find_index(items, id) if id is not None else None
+            if change.type == dt.ChangeType.DELETE:
+                if index is not None:
+                    self._publish(
+                        change.path, items[:index] + items[index + 1 :], change.type, items[index], change.persisted
+                    )
+            elif index is None:
+                self._publish(change.path, items + [change.item], change.type, change.item, change.persisted)
+            else:
+                self._publish(
+                    change.path,
+                    self._replace_at(items, index, change.item),
+                    change.type,
+                    change.item,
+                    change.persisted,
+                )
+
+    def apply_changes(self, path: dt.ItemPath, changes: t.Sequence[dt.Change]) -> None:
+        """
+        Applies changes of items in the collection at `path` like `apply_change` does, but builds the new collection
+        in a single pass and publishes it once, so listeners are notified of one reset of the collection. Items that
+        did not change stay shared with the previous collection. The items need ids that can be hashed.
+        """
+        with self._write_lock:
+            items = self._get_item_by_path_only(path)
+            assert isinstance(items, COLLECTION_TYPES), f'Expected value for {path!r} to be a list'
+            new_items = list(items)
+            index_by_id: t.Dict[t.Any, int] = {}
+            for position, item in enumerate(new_items):
+                # the first item with an id is the one that is found by id
+                index_by_id.setdefault(item.get(self.id_name), position)
+            deleted: t.Set[int] = set()
+            for change in changes:
+                assert change.item is not None and change.path == path
+                id = change.item.get(self.id_name)
+                index = index_by_id.get(id) if id is not None else None
+                if change.type == dt.ChangeType.DELETE:
+                    if index is not None:
+                        deleted.add(index)
+                        del index_by_id[id]
+                elif index is None:
+                    if id is not None:
+                        index_by_id[id] = len(new_items)
+                    new_items.append(change.item)
+                else:
+                    new_items[index] = change.item
+            if deleted:
+                new_items = [item for position, item in enumerate(new_items) if position not in deleted]
+            self._publish(path, new_items, dt.ChangeType.RESET, None, all(change.persisted for change in changes))
+
+    def delete_snapshot(self, name: str) -> None:
+        if self._snapshots.pop(name, None) is None:
+            raise ItemNotFoundError(f'snapshot {name!r} does not exist')
+
+    def get_snapshots(self) -> t.Dict[str, DataSnapshot]:
+        return dict(self._snapshots)
+
+    def add_change_listener(self, listener: dt.ChangeListener) -> None:
+        """
+        Registers a callable that is called with a `Change` after every write, while the write lock is still held.
+        """
+        self._change_listeners.append(listener)
+
+    def remove_change_listener(self, listener: dt.ChangeListener) -> None:
+        with self._write_lock:
+            self._change_listeners.remove(listener)
+
+    def close(self) -> None:
+        """
+        Stops the process pool that parallel scans started.
+        """
+        self._parallel_scanner.close()
+
+    def changed_collections(self, version: int) -> t.Set[str]:
+        """
+        Returns the keys of the top level values that were written after `version`, including removed ones, so a
+        save only has to write the values changed since the version of the data it saved last.
+        """
+        with self._write_lock:
+            return {key for key, changed_version in self._changed_versions.items() if changed_version > version}
+
+    def _notify(self, change: dt.Change) -> None:
+        if not change.persisted:
+            self._changed_versions[change.path[0]] = self.version
+        for listener in self._change_listeners:
+            listener(change)
+
+    def _publish(
+        self,
+        path: dt.ItemPath,
+        value: dt.JSONItems,
+        change_type: dt.ChangeType,
+        item: t.Optional[dt.JSONItem],
+        persisted: bool = False,
+    ) -> None:
+        previous = self._get_item_by_path_only(path)
+        node: t.Any = value
+        for depth in range(len(path) - 1, 0, -1):
+            parent = t.cast(dt.JSONItem, self._get_item_by_path_only(path[:depth]))
+            node = {**parent, path[depth]: node}
+        self.data[path[0]] = node
+        self.version += 1
+        self._notify(dt.Change(change_type, path, previous, value, item, persisted))
+
+    @staticmethod
+    def _replace_at(items: dt.JSONItems, index: int, item: dt.JSONItem) -> dt.JSONItems:
+        new_items = items.copy()
+        new_items[index] = item
+        return new_items
+
     def _get_id_type(self, data: dt.JSONItem) -> t.Optional[type]:
         for key, value in data.items():
             if key == self.id_name:
                 return type(value)
-            if isinstance(value, list):
+            if isinstance(value, COLLECTION_TYPES):
                 for item in value:
                     return self._get_id_type(item)
             if isinstance(value, dict):
@@ -101,30 +312,39 @@ class DataController:
 
     @staticmethod
     def _filter_items(data: dt.JSONItems, **filters: t.Any) -> dt.JSONItems:
+        if isinstance(data, RowCollection):
+            return data.filter(**filters)
         return [item for item in data if all(item.get(key) == value for key, value in filters.items())]
 
     def _fix_data_item(self, data: dt.JSONItem, list_data: dt.JSONItems) -> dt.JSONItem:
         data[self.id_name] = self._autogenerate_id(list_data=list_data)
-        self._add_timestamps(data, remove_stamps=True)
+        self.add_timestamps(data, remove_stamps=True)
         return data
 
     def _fix_data(self, data: dt.JSONItem) -> None:
-        for value in data.values():
+        for key, value in data.items():
             if isinstance(value, list):
                 for item in value:
                     self._fix_data_item(item, value)
+            elif isinstance(value, RowCollection):
+                # rows stored as columns or in a mapped file cannot be changed in place
+                raise DataControllerError(f'{key!r} is a columnar or lazy collection, which cannot be fixed', 500)
             elif isinstance(value, dict):
                 self._fix_data(value)
 
     def _get_item_parent_and_index(self, path: dt.ItemPath, id: dt.IdType) -> t.Tuple[dt.JSONItems, int]:
         items = self._get_item_by_path_only(path)
-        assert isinstance(items, list), f'Expected value for {path!r} to be a list, got {items} instead'
-        try:
-            item_index = next(i for i, v in enumerate(items) if v[self.id_name] == id)
-        except StopIteration as error:
-            raise ItemNotFoundError(f'item with id {id} could not be resolved from path {path!r}') from error
+        assert isinstance(items, COLLECTION_TYPES), f'Expected value for {path!r} to be a list, got {items} instead'
+        item_index = self._find_index(items, id)
+        if item_index is None:
+            raise ItemNotFoundError(f'item with id {id} could not be resolved from path {path!r}')
         return items, item_index
 
+    def _find_index(self, items: dt.JSONItems, id: dt.IdType) -> t.Optional[int]:
+        if isinstance(items, RowCollection):
+            return items.index_of(self.id_name, id)
+        return next((index for index, item in enumerate(items) if item[self.id_name] == id), None)
+
     def _get_item_by_path_only(self, path: dt.ItemPath) -> dt.JSONResult:
         try:
             return reduce(lambda prev, cur: t.cast(dt.JSONItem, prev[cur]), path, self.data)
@@ -133,20 +353,27 @@ class DataController:
 
     def _get_item_by_path_and_id(self, path: dt.ItemPath, id: dt.IdType) -> dt.JSONItem:
         items = self._get_item_by_path_only(path)
-        assert isinstance(items, list), f'Expected value for {path!r} to be a list, got {items} instead'
-        filtered = [x for x in items if x[self.id_name] == id]
-        if not filtered:
+        assert isinstance(items, COLLECTION_TYPES), f'Expected value for {path!r} to be a list, got {items} instead'
+        index = self._find_index(items, id)
+        if index is None:
             raise ItemNotFoundError(f'No item with id {id} exists')
-        return filtered[0]
+        return items[index]
 
-    def _update_timestamps(self, item: dt.JSONItem) -> dt.JSONItem:
+    def update_timestamps(self, item: dt.JSONItem) -> dt.JSONItem:
+        """
+        Sets the updated at timestamp of an item that is written, when timestamps are used.
+        """
         if self.use_timestamps:
             item[self.updated_at_key_name] = datetime.now().isoformat()
         return item
 
-    def _add_timestamps(
+    def add_timestamps(
         self, item: dt.JSONItem, update_updated_at: bool = False, remove_stamps: bool = False
     ) -> dt.JSONItem:
+        """
+        Sets the timestamps of an item that is added and has none yet, or removes them with `remove_stamps` when
+        timestamps are not used.
+        """
         if not self.use_timestamps and remove_stamps:
             item.pop(self.created_at_key_name, None)
             item.pop(self.updated_at_key_name, None)
@@ -157,7 +384,11 @@ class DataController:
             item[self.updated_at_key_name] = None if update_updated_at else datetime.now().isoformat()
         return item
 
-    def _get_items(self, data: dt.JSONItems, **filters: t.Any) -> dt.JSONItems:
+    def parse_items_query(self, filters: dt.FilterParams) -> ItemsQuery:
+        """
+        Separates the sorting and paging parameters of a request for a collection from its filters.
+        """
+        filters = dict(filters)
         sort_key = filters.pop(self.sort_key_param_name, self.id_name)
         order = filters.pop(self.order_param_name, dt.SortOrder.ASC.value)
         order_enum = dt.SortOrder.ASC if order.lower() == dt.SortOrder.ASC.value else dt.SortOrder.DESC
@@ -167,17 +398,28 @@ class DataController:
         size = int(filters.pop(self.size_param_name, self.default_page_size))
         if size < 0:
             raise DataControllerError(f'{self.size_param_name!r} should be a non negative integer, got {size}', 400)
-        filtered = self._filter_items(data, **filters)
-        filtered.sort(
-            key=lambda item: item.get(sort_key, list(self.data.keys())[0]),
-            reverse=order_enum == dt.SortOrder.DESC,
-        )
         start_index = page * size
-        end_index = start_index + size
+        sort_default = list(self.data.keys())[0]
+        reverse = order_enum == dt.SortOrder.DESC
+        return ItemsQuery(filters, sort_key, sort_default, reverse, start_index, start_index + size)
+
+    def _get_items(self, data: dt.JSONItems, **filters: t.Any) -> dt.JSONItems:
+        query = self.parse_items_query(filters)
+        filters, sort_key, sort_default, reverse, start_index, end_index = query
+        if self._vectorized_engine.can_query(data):
+            result = self._vectorized_engine.query(data, filters, sort_key, sort_default, reverse, limit=end_index)
+            if result is not None:
+                return result[start_index:]
+        if self._parallel_scanner.can_scan(data):
+            result = self._parallel_scanner.scan(data, filters, sort_key, sort_default, reverse, limit=end_index)
+            if result is not None:
+                return result[start_index:]
+        filtered = self._filter_items(data, **filters)
+        filtered.sort(key=lambda item: sort_value(item.get(sort_key, sort_default)), reverse=reverse)
         return filtered[start_index:end_index]
 
     def _autogenerate_id(self, list_data: dt.JSONItems, *, use_random: bool = False) -> t.Union[str, int]:
-        exclude = [x.get(self.id_name) for x in list_data if x.get(self.id_name) is not None]
+        exclude = {value for value in column_values(list_data, self.id_name) if value is not None}
         data_length = len(list_data)
         if self.id_type is int:
             if use_random:
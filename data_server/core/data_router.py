@@ -1,38 +1,88 @@
+import os
 import typing as t
 from pathlib import Path
 
 import data_server.data_server_types as dt
 from data_server.core.adapters.adapter import DataAdapter
 from data_server.core.adapters.csv_adapter import CsvAdapter
+from data_server.core.adapters.directory_adapter import DirectoryAdapter
 from data_server.core.adapters.json_adapter import JSONAdapter
+from data_server.core.adapters.json_lines_adapter import JSONLinesAdapter
+from data_server.core.adapters.sqlite_adapter import SQLiteAdapter
+from data_server.core.files import strip_compression
+from data_server.core.persistence import WriteBehindFlusher
 from data_server.errors import ItemNotFoundError
 
 URL_SEPARATOR = '/'
+ADMIN_SNAPSHOTS_URL = '/__admin/snapshots'
 
 
 class DataRouter:
-    def __init__(self, resource: t.Union[str, dt.JSONItem], **kwargs: t.Any) -> None:
+    def __init__(
+        self,
+        resource: t.Union[str, dt.JSONItem],
+        *,
+        resource_type: t.Optional[dt.ResourceType] = None,
+        csv_options: t.Optional[t.Dict[str, t.Any]] = None,
+        json_options: t.Optional[t.Dict[str, t.Any]] = None,
+        sqlite_options: t.Optional[t.Dict[str, t.Any]] = None,
+        flush_interval: float = 0,
+        flush_after_changes: int = 100,
+        **kwargs: t.Any,
+    ) -> None:
+        """
+        Creates the data adapter for `resource`, a file whose type is detected from its extension unless a
+        `resource_type` is given, or a directory of files. `kwargs` are passed to every adapter, `csv_options`,
+        `json_options` and `sqlite_options` only to the adapter of a csv, json or sqlite resource, and `csv_options` to
+        the csv files of a directory. With a `flush_interval`, changes are saved in the background at most once per
+        interval or once `flush_after_changes` changes are pending, instead of after every request.
+        """
         self.resource = resource
+        # with a write-ahead log the adapter persists every change itself
+        self.write_ahead_log = bool(kwargs.get('write_ahead_log'))
         if isinstance(resource, dict):
             self.resource_type = dt.ResourceType.PLAIN_DICT
             self.data_adapter = DataAdapter(resource, **kwargs)
         else:
-            self.resource_type = self._detect_resource_type(resource)
+            self.resource_type = resource_type or self._detect_resource_type(resource)
+            if self.resource_type == dt.ResourceType.CSV_FILE:
+                kwargs.update(csv_options or {})
+            elif self.resource_type == dt.ResourceType.JSON_FILE:
+                kwargs.update(json_options or {})
+            elif self.resource_type == dt.ResourceType.SQLITE_FILE:
+                kwargs.update(sqlite_options or {})
+            elif self.resource_type == dt.ResourceType.DIRECTORY:
+                kwargs['csv_options'] = csv_options
             self.data_adapter = self._create_data_adapter(self.resource_type, t.cast(str, self.resource), **kwargs)
+        self.flusher: t.Optional[WriteBehindFlusher] = None
+        if flush_interval > 0:
+            self.flusher = WriteBehindFlusher(self.data_adapter.save_data, flush_interval, flush_after_changes)
 
     @staticmethod
     def _detect_resource_type(resource: str) -> dt.ResourceType:
-        extension = Path(resource).suffix
+        if os.path.isdir(resource):
+            return dt.ResourceType.DIRECTORY
+        extension = Path(strip_compression(resource)).suffix
         if extension == '.json':
             return dt.ResourceType.JSON_FILE
         if extension == '.csv':
             return dt.ResourceType.CSV_FILE
+        if extension in ('.jsonl', '.ndjson'):
+            return dt.ResourceType.JSON_LINES_FILE
+        if extension in ('.sqlite', '.sqlite3', '.db'):
+            return dt.ResourceType.SQLITE_FILE
         return dt.ResourceType.JSON_FILE
 
     @staticmethod
     def _create_data_adapter(resource_type: dt.ResourceType, resource: str, **kwargs: t.Any) -> DataAdapter:
         if resource_type == dt.ResourceType.CSV_FILE:
             return CsvAdapter(resource, **kwargs)
+        if resource_type == dt.ResourceType.DIRECTORY:
+            return DirectoryAdapter(resource, **kwargs)
+        if resource_type == dt.ResourceType.JSON_LINES_FILE:
+            return JSONLinesAdapter(resource, **kwargs)
+        if resource_type == dt.ResourceType.SQLITE_FILE:
+            return SQLiteAdapter(resource, **kwargs)
         # default to json adapter
         return JSONAdapter(resource, **kwargs)
 
@@ -69,6 +119,41 @@ class DataRouter:
         }[method]
         return request_handler(base_url, resource_id, data)
 
+    def _persist(self) -> None:
+        if self.write_ahead_log:
+            return
+        if self.flusher is not None:
+            self.flusher.mark_dirty()
+        else:
+            self.data_adapter.save_data()
+
+    def close(self) -> None:
+        """
+        Saves changes that are still pending and stops the background flusher.
+        """
+        if self.flusher is not None:
+            self.flusher.close()
+        self.data_adapter.close()
+
+    def _handle_admin_snapshot_request(self, method: str, url: str) -> dt.RouterResponse:
+        name = url[len(ADMIN_SNAPSHOTS_URL) :].strip(URL_SEPARATOR)
+        if not name:
+            if method == dt.HTTPMethod.GET:
+                return [
+                    {'name': name, 'version': version} for name, version in self.data_adapter.get_snapshots().items()
+                ]
+            raise ValueError(f'cannot handle request for method {method!r}')
+        if method == dt.HTTPMethod.POST:
+            return {'name': name, 'version': self.data_adapter.create_snapshot(name)}
+        if method == dt.HTTPMethod.PUT:
+            version = self.data_adapter.restore_snapshot(name)
+            self._persist()
+            return {'name': name, 'version': version}
+        if method == dt.HTTPMethod.DELETE:
+            self.data_adapter.delete_snapshot(name)
+            return {}
+        raise ValueError(f'cannot handle request for method {method!r}')
+
     def _handle_http_request(
         self,
         method: str,
@@ -87,6 +172,9 @@ class DataRouter:
             ]
             return index_data
 
+        if url == ADMIN_SNAPSHOTS_URL or url.startswith(ADMIN_SNAPSHOTS_URL + URL_SEPARATOR):
+            return self._handle_admin_snapshot_request(method, url)
+
         query_parameters = query_parameters or {}
         data = data or {}
         base_url, resource_id = self._parse_url(url)
@@ -94,17 +182,17 @@ class DataRouter:
             return self._handle_http_get_request(base_url, resource_id, **query_parameters)
         if method == dt.HTTPMethod.POST:
             result: dt.RouterResponse = self.data_adapter.execute_post_request(base_url, data)
-            self.data_adapter.save_data()
+            self._persist()
             return result
         if method == dt.HTTPMethod.PATCH or method == dt.HTTPMethod.PUT:
             assert resource_id is not None
             result = self._handle_http_update_request(method, base_url, resource_id, data)
-            self.data_adapter.save_data()
+            self._persist()
             return result
         if method == dt.HTTPMethod.DELETE:
             assert resource_id is not None
             self.data_adapter.execute_delete_request(base_url, resource_id)
-            self.data_adapter.save_data()
+            self._persist()
             return {}
         raise ValueError(f'cannot handle request for method {method!r}')
 
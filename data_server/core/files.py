@@ -0,0 +1,121 @@
+import bz2
+import contextlib
+import gzip
+import lzma
+import os
+import shutil
+import tempfile
+import typing as t
+
+# the function that opens a file of each compressed format and the name of its compression level argument
+COMPRESSIONS: t.Dict[str, t.Tuple[t.Callable[..., t.IO[t.Any]], str]] = {
+    '.gz': (gzip.open, 'compresslevel'),
+    '.bz2': (bz2.open, 'compresslevel'),
+    '.xz': (lzma.open, 'preset'),
+}
+
+# the modification time, size and inode of a file, None when it does not exist
+FileState = t.Optional[t.Tuple[int, int, int]]
+
+
+def is_compressed(path: str) -> bool:
+    return os.path.splitext(path)[1] in COMPRESSIONS
+
+
+def strip_compression(path: str) -> str:
+    """
+    Returns `path` without the extension of its compressed format, e.g `data.json` for `data.json.gz`.
+    """
+    return os.path.splitext(path)[0] if is_compressed(path) else path
+
+
+def open_text(path: str, *, encoding: t.Optional[str] = None, newline: t.Optional[str] = None) -> t.TextIO:
+    """
+    Opens a text file for reading, a file ending in .gz, .bz2 or .xz is decompressed while it is read.
+    """
+    compression = COMPRESSIONS.get(os.path.splitext(path)[1])
+    if compression is None:
+        return open(path, encoding=encoding, newline=newline)
+    return t.cast(t.TextIO, compression[0](path, 'rt', encoding=encoding, newline=newline))
+
+
+def file_state(path: str) -> FileState:
+    """
+    Returns what changes when a file is written or replaced, without reading it.
+    """
+    try:
+        status = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return (status.st_mtime_ns, status.st_size, status.st_ino)
+
+
+@contextlib.contextmanager
+def atomic_write(
+    path: str,
+    *,
+    fsync: bool = False,
+    newline: t.Optional[str] = None,
+    encoding: t.Optional[str] = None,
+    compression_level: t.Optional[int] = None,
+) -> t.Iterator[t.TextIO]:
+    """
+    Opens a temporary file next to `path` for writing and renames it to `path` once the block finishes, so readers
+    and a crash mid-write only ever see the previous or the complete new content. The temporary file is removed
+    when the block raises. With `fsync`, the file and the rename are synced to disk before returning.
+
+    A path ending in .gz, .bz2 or .xz is compressed with `compression_level`, the default level of its format when
+    it is None.
+    """
+    compression = COMPRESSIONS.get(os.path.splitext(path)[1])
+    with _atomic_replace(path, fsync) as descriptor:
+        if compression is None:
+            with os.fdopen(descriptor, 'w', newline=newline, encoding=encoding) as temporary_file:
+                yield temporary_file
+                temporary_file.flush()
+                if fsync:
+                    os.fsync(temporary_file.fileno())
+            return
+        open_compressed, level_name = compression
+        level = {} if compression_level is None else {level_name: compression_level}
+        with os.fdopen(descriptor, 'wb') as raw_file:
+            with open_compressed(raw_file, 'wt', newline=newline, encoding=encoding, **level) as compressed_file:
+                yield t.cast(t.TextIO, compressed_file)
+            raw_file.flush()
+            if fsync:
+                os.fsync(raw_file.fileno())
+
+
+@contextlib.contextmanager
+def atomic_write_bytes(path: str, *, fsync: bool = False) -> t.Iterator[t.BinaryIO]:
+    """
+    Like `atomic_write`, for binary content.
+    """
+    with _atomic_replace(path, fsync) as descriptor:
+        with os.fdopen(descriptor, 'wb') as temporary_file:
+            yield temporary_file
+            temporary_file.flush()
+            if fsync:
+                os.fsync(temporary_file.fileno())
+
+
+@contextlib.contextmanager
+def _atomic_replace(path: str, fsync: bool) -> t.Iterator[int]:
+    directory = os.path.dirname(os.path.abspath(path))
+    descriptor, temporary_path = tempfile.mkstemp(dir=directory, prefix=f'.{os.path.basename(path)}.', suffix='.tmp')
+    try:
+        yield descriptor
+        with contextlib.suppress(FileNotFoundError):
+            # keep the permissions of the file that is replaced, temporary files are only readable by their owner
+            shutil.copymode(path, temporary_path)
+        os.replace(temporary_path, path)
+    except BaseException:
+        with contextlib.suppress(FileNotFoundError):
+            os.unlink(temporary_path)
+        raise
+    if fsync and os.name == 'posix':
+        directory_descriptor = os.open(directory, os.O_RDONLY)
+        try:
+            os.fsync(directory_descriptor)
+        finally:
+            os.close(directory_descriptor)
@@ -0,0 +1,120 @@
+import logging
+import threading
+import typing as t
+
+import data_server.data_server_types as dt
+from data_server.core.columnar import COLLECTION_TYPES
+from data_server.core.files import file_state
+
+logger = logging.getLogger('data_server')
+
+# a reloaded collection replaces the current one as a whole once more than this share of its items was added or changed
+RESET_SHARE = 0.5
+
+
+class FileWatcher:
+    """
+    Calls `poll` every `interval` seconds in a background thread. `poll` uses `changed_paths` to find the files of
+    `paths` whose modification time, size or inode changed since they were last seen, files written by the process
+    itself are marked as seen with `mark_current`. Polling only needs `os.stat`, so it works on every platform.
+    """
+
+    def __init__(self, paths: t.Sequence[str], poll: t.Callable[[], None], interval: float = 1.0):
+        self.paths = list(paths)
+        self.poll = poll
+        self.interval = interval
+        self._states = {path: file_state(path) for path in self.paths}
+        self._closed = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='data-server-watcher', daemon=True)
+        self._thread.start()
+
+    def changed_paths(self) -> t.List[str]:
+        """
+        Returns the paths that changed since the previous call and marks them as seen. A file that is missing, e.g
+        while an editor replaces it, is reported once it exists again.
+        """
+        changed = []
+        for path in self.paths:
+            state = file_state(path)
+            if state is not None and state != self._states[path]:
+                self._states[path] = state
+                changed.append(path)
+        return changed
+
+    def mark_current(self) -> None:
+        for path in self.paths:
+            self._states[path] = file_state(path)
+
+    def close(self) -> None:
+        self._closed.set()
+        if self._thread is not threading.current_thread():
+            self._thread.join()
+
+    def _run(self) -> None:
+        while not self._closed.wait(self.interval):
+            try:
+                self.poll()
+            except Exception:
+                logger.exception('Failed to reload %s', ', '.join(self.paths))
+
+
+def diff_data(current: dt.JSONItem, new: dt.JSONItem, id_name: str) -> t.List[dt.Change]:
+    """
+    Returns the changes that turn `current` into `new`, marked as persisted since `new` was read from the resource.
+    Collections are compared item by item, so only the items that were added, changed or deleted become changes,
+    any other value that differs is replaced as a whole. A collection with items that have no id or share one is
+    replaced as well.
+    """
+    changes = [
+        dt.Change(dt.ChangeType.RESET, [key], value, None, persisted=True)
+        for key, value in current.items()
+        if key not in new
+    ]
+    for key, value in new.items():
+        previous = current.get(key)
+        if key in current and isinstance(previous, COLLECTION_TYPES) and isinstance(value, COLLECTION_TYPES):
+            item_changes = _diff_items(key, previous, value, id_name)
+            if item_changes is not None:
+                changes.extend(item_changes)
+                continue
+        if key not in current or previous != value:
+            changes.append(dt.Change(dt.ChangeType.RESET, [key], previous, value, persisted=True))
+    return changes
+
+
+def _diff_items(
+    key: str, previous: t.Sequence[dt.JSONItem], items: t.Sequence[dt.JSONItem], id_name: str
+) -> t.Optional[t.List[dt.Change]]:
+    previous_by_id = _index_by_id(previous, id_name)
+    items_by_id = _index_by_id(items, id_name)
+    if previous_by_id is None or items_by_id is None:
+        return None
+    changes = [
+        dt.Change(dt.ChangeType.DELETE, [key], None, None, item, persisted=True)
+        for id, item in previous_by_id.items()
+        if id not in items_by_id
+    ]
+    for id, item in items_by_id.items():
+        previous_item = previous_by_id.get(id)
+        if previous_item is None:
+            changes.append(dt.Change(dt.ChangeType.ADD, [key], None, None, item, persisted=True))
+        elif previous_item != item:
+            changes.append(dt.Change(dt.ChangeType.UPDATE, [key], None, None, item, persisted=True))
+    return changes
+
+
+def _index_by_id(items: t.Sequence[dt.JSONItem], id_name: str) -> t.Optional[t.Dict[t.Any, dt.JSONItem]]:
+    items_by_id: t.Dict[t.Any, dt.JSONItem] = {}
+    for item in items:
+        # checking the exact type first avoids the slow isinstance check against Mapping for most items
+        if (type(item) is not dict and not isinstance(item, t.Mapping)) or item.get(id_name) is None:
+            return None
+        id = item[id_name]
+        try:
+            if id in items_by_id:
+                return None
+        except TypeError:
+            # an id that cannot be hashed, e.g a list
+            return None
+        items_by_id[id] = item
+    return items_by_id
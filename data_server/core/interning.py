@@ -0,0 +1,58 @@
+import logging
+import sys
+import typing as t
+
+logger = logging.getLogger('data_server')
+
+
+class StringInterner:
+    """
+    Deduplicates the keys and short string values of loaded items so equal strings share one object. Strings longer
+    than `max_length` are left alone since they are rarely repeated, and once `max_strings` distinct strings have
+    been pooled new ones are no longer added, which keeps the pool small for high-cardinality columns while repeated
+    values that were seen first keep being shared.
+    """
+
+    def __init__(self, max_length: int = 64, max_strings: int = 100_000):
+        self.max_length = max_length
+        self.max_strings = max_strings
+        self.interned_count = 0
+        self.saved_bytes = 0
+        self._pool: t.Dict[str, str] = {}
+
+    def intern(self, value: t.Any) -> t.Any:
+        if type(value) is not str or len(value) > self.max_length:
+            return value
+        pooled = self._pool.get(value)
+        if pooled is None:
+            if len(self._pool) < self.max_strings:
+                self._pool[value] = value
+            return value
+        if pooled is not value:
+            self.interned_count += 1
+            self.saved_bytes += sys.getsizeof(value)
+        return pooled
+
+    def intern_pairs(self, pairs: t.List[t.Tuple[str, t.Any]]) -> t.Dict[str, t.Any]:
+        """
+        An `object_pairs_hook` for json decoders.
+        """
+        intern = self.intern
+        return {intern(key): intern(value) for key, value in pairs}
+
+    def intern_rows(self, rows: t.Iterable[t.List[str]]) -> t.Iterator[t.List[str]]:
+        intern = self.intern
+        for row in rows:
+            yield [intern(value) for value in row]
+
+    def report(self, resource: str) -> None:
+        """
+        Logs how much memory interning saved and drops the pool, the loaded items keep the shared strings alive.
+        """
+        logger.info(
+            'Interned %d repeated strings while loading %s, saving %.1f MB',
+            self.interned_count,
+            resource,
+            self.saved_bytes / 1024 / 1024,
+        )
+        self._pool.clear()
@@ -0,0 +1,87 @@
+import codecs
+import contextlib
+import json
+import locale
+import typing as t
+
+from data_server.core.codec import INDENT, JSONCodec
+from data_server.core.files import FileState, atomic_write_bytes, file_state
+from data_server.core.records import json_default
+
+COPY_BLOCK_SIZE = 1 << 20
+
+
+def segments_supported() -> bool:
+    # segments are written as utf-8, data files are read with the default encoding
+    return codecs.lookup(locale.getpreferredencoding(False)).name == 'utf-8'
+
+
+class SegmentedJSONWriter:
+    """
+    Writes a dictionary to a json file like `JSONCodec.dump` and remembers where the value of every key starts and
+    ends in it. The next write only encodes the values of the keys it is told changed and copies the others from the
+    previous file, so saving a change to a small value of a file that also holds large ones mostly costs a copy of
+    bytes. Every value is encoded again when the file was changed by anything else in between.
+    """
+
+    def __init__(self, path: str, codec: JSONCodec, *, compact: bool = False, fsync: bool = False):
+        self.path = path
+        self.codec = codec
+        self.compact = compact
+        self.fsync = fsync
+        self._ranges: t.Dict[str, t.Tuple[int, int]] = {}
+        self._state: FileState = None
+
+    def write(self, data: t.Dict[str, t.Any], changed: t.Optional[t.AbstractSet[str]] = None) -> int:
+        """
+        Writes `data`, encoding only the values of the keys in `changed` and every value when it is None. Returns the
+        number of values that were encoded.
+        """
+        reusable = changed is not None and self._state is not None and file_state(self.path) == self._state
+        copied = self._ranges.keys() - t.cast(t.AbstractSet[str], changed) if reusable else set()
+        keys = list(data) if self.compact else sorted(data)
+        ranges: t.Dict[str, t.Tuple[int, int]] = {}
+        encoded = 0
+        with contextlib.ExitStack() as stack:
+            # the previous file stays readable after it was replaced
+            previous = stack.enter_context(open(self.path, 'rb')) if copied else None
+            output = stack.enter_context(atomic_write_bytes(self.path, fsync=self.fsync))
+            output.write(b'{')
+            for index, key in enumerate(keys):
+                if self.compact:
+                    output.write(b',' if index else b'')
+                    output.write(self.codec.dumps(key) + b':')
+                else:
+                    output.write(b',\n' if index else b'\n')
+                    output.write(f'{" " * INDENT}{json.dumps(key)}: '.encode())
+                start = output.tell()
+                if previous is not None and key in copied:
+                    self._copy(previous, output, *self._ranges[key])
+                else:
+                    self._write_value(output, data[key])
+                    encoded += 1
+                ranges[key] = (start, output.tell())
+            output.write(b'}' if self.compact or not keys else b'\n}')
+        self._ranges = ranges
+        self._state = file_state(self.path)
+        return encoded
+
+    def _write_value(self, output: t.BinaryIO, value: t.Any) -> None:
+        if self.compact:
+            output.write(self.codec.dumps(value))
+            return
+        # indented like a value at the top level of the document, written in chunks like `json.dump` does
+        encoder = json.JSONEncoder(indent=INDENT, sort_keys=True, default=json_default)
+        indent = '\n' + ' ' * INDENT
+        for chunk in encoder.iterencode(value):
+            output.write(chunk.replace('\n', indent).encode())
+
+    @staticmethod
+    def _copy(source: t.BinaryIO, output: t.BinaryIO, start: int, end: int) -> None:
+        source.seek(start)
+        while start < end:
+            block = source.read(min(COPY_BLOCK_SIZE, end - start))
+            if not block:
+                raise ValueError(f'{source.name} ended before the value that was written at {start}')
+            output.write(block)
+            start += len(block)
@@ -0,0 +1,149 @@
+import json
+import re
+import typing as t
+
+WHITESPACE = re.compile(r'[ \t\n\r]*')
+
+
+class StreamingJSONLoader:
+    """
+    Loads a json document from a file in chunks of `chunk_size` characters. Objects are parsed key by key and arrays
+    item by item, so only the decoded values and one chunk of text are held in memory instead of the whole text and
+    the decoded document at once. Each array item is decoded with the standard decoder and passed through
+    `item_hook`, e.g to turn it into a compact record, before it is stored.
+
+    Produces the same values as `json.load`, invalid documents raise `json.JSONDecodeError`. Keys are shared between
+    objects like `json.load` does within one document, unless `object_pairs_hook` builds the objects.
+    """
+
+    def __init__(
+        self,
+        file: t.TextIO,
+        chunk_size: int = 1 << 20,
+        object_pairs_hook: t.Optional[t.Callable[[t.List[t.Tuple[str, t.Any]]], t.Any]] = None,
+        item_hook: t.Optional[t.Callable[[t.Any], t.Any]] = None,
+    ):
+        self.file = file
+        self.chunk_size = chunk_size
+        if object_pairs_hook is None:
+            object_pairs_hook = self._share_keys
+        self.object_pairs_hook = object_pairs_hook
+        self.item_hook = item_hook
+        self._keys: t.Dict[str, str] = {}
+        decoder = json.JSONDecoder(object_pairs_hook=object_pairs_hook)
+        self._scan_once: t.Callable[[str, int], t.Tuple[t.Any, int]] = decoder.scan_once  # type: ignore[attr-defined]
+        self._buffer = ''
+        self._position = 0
+        self._eof = False
+
+    def load(self) -> t.Any:
+        value = self._parse_value()
+        if self._peek() != '':
+            self._error('Extra data')
+        return value
+
+    def _parse_value(self) -> t.Any:
+        character = self._peek()
+        if character == '{':
+            return self._parse_object()
+        if character == '[':
+            return self._parse_array()
+        return self._decode_value()
+
+    def _parse_object(self) -> t.Any:
+        self._position += 1
+        pairs: t.List[t.Tuple[str, t.Any]] = []
+        if self._peek() == '}':
+            self._position += 1
+        else:
+            while True:
+                if self._peek() != '"':
+                    self._error('Expecting property name enclosed in double quotes')
+                key = self._decode_value()
+                self._expect(':')
+                pairs.append((key, self._parse_value()))
+                if self._expect(',}') == '}':
+                    break
+        return self.object_pairs_hook(pairs)
+
+    def _parse_array(self) -> t.List[t.Any]:
+        self._position += 1
+        items: t.List[t.Any] = []
+        if self._peek() == ']':
+            self._position += 1
+            return items
+        append, item_hook = items.append, self.item_hook
+        scan_once, match_whitespace = self._scan_once, WHITESPACE.match
+        while True:
+            buffer, position = self._buffer, self._position
+            try:
+                # the item and the delimiter after it are usually in the buffer already
+                item, end = scan_once(buffer, position)
+                position = match_whitespace(buffer, end).end()  # type: ignore[union-attr]
+                delimiter = buffer[position]
+            except (json.JSONDecodeError, StopIteration, IndexError):
+                delimiter = ''
+            if delimiter == ',' or delimiter == ']':
+                self._position = match_whitespace(buffer, position + 1).end()  # type: ignore[union-attr]
+            else:
+                # the item continues in the next chunk or the document is invalid
+                self._peek()
+                item = self._decode_value()
+                delimiter = self._expect(',]')
+            append(item_hook(item) if item_hook is not None else item)
+            if delimiter == ']':
+                return items
+
+    def _decode_value(self) -> t.Any:
+        while True:
+            try:
+                value, end = self._scan_once(self._buffer, self._position)
+            except (json.JSONDecodeError, StopIteration) as error:
+                if self._fill():
+                    continue
+                if isinstance(error, StopIteration):
+                    self._error('Expecting value')
+                raise
+            # a number near the end of the buffer may continue in the next chunk, like `1.` and `5` or `1e` and `+5`
+            if len(self._buffer) - end < 3 and self._fill():
+                continue
+            self._position = end
+            return value
+
+    def _expect(self, characters: str) -> str:
+        character = self._peek()
+        if not character or character not in characters:
+            self._error(f'Expecting {" or ".join(repr(character) for character in characters)} delimiter')
+        self._position += 1
+        return character
+
+    def _peek(self) -> str:
+        """
+        Skips whitespace and returns the next character, an empty string at the end of the file.
+        """
+        while True:
+            self._position = position = WHITESPACE.match(self._buffer, self._position).end()  # type: ignore[union-attr]
+            if position < len(self._buffer):
+                return self._buffer[position]
+            if not self._fill():
+                return ''
+
+    def _fill(self) -> bool:
+        if self._eof:
+            return False
+        # a value larger than a chunk doubles the read size, so it is not scanned again for every chunk
+        chunk = self.file.read(max(self.chunk_size, len(self._buffer) - self._position))
+        if not chunk:
+            self._eof = True
+            return False
+        # drop the text that was already parsed before growing the buffer
+        self._buffer = self._buffer[self._position :] + chunk
+        self._position = 0
+        return True
+
+    def _share_keys(self, pairs: t.List[t.Tuple[str, t.Any]]) -> t.Dict[str, t.Any]:
+        keys = self._keys
+        return {keys.setdefault(key, key): value for key, value in pairs}
+
+    def _error(self, message: str) -> t.NoReturn:
+        raise json.JSONDecodeError(message, self._buffer, self._position)
@@ -0,0 +1,209 @@
+import csv
+import itertools
+import mmap
+import operator
+import typing as t
+from array import array
+
+import data_server.data_server_types as dt
+from data_server.core.columnar import RowCollection
+from data_server.core.csv_schema import CsvSchema
+
+CHUNK_SIZE = 1 << 24
+ODD = (1).__and__
+
+
+class LazyCsvFile:
+    """
+    A csv file that is mapped into memory instead of being read. `load` records where every row starts and the row
+    of every id, rows are only parsed when they are accessed. Cells of typed columns are parsed with `schema`, types
+    are inferred from the first `sample_size` rows.
+    """
+
+    def __init__(self, path: str, id_name: str = 'id', schema: t.Optional[CsvSchema] = None, sample_size: int = 1000):
+        self.path = path
+        self.id_name = id_name
+        self.schema = schema
+        self.sample_size = sample_size
+        self.fieldnames: t.List[str] = []
+        with open(path, 'rb') as csv_file:
+            self._mmap = mmap.mmap(csv_file.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def load(self) -> 'LazyCsvCollection':
+        self._mmap.seek(0)
+        header = self._read_record()
+        self.fieldnames = self._parse_cells(header) if header else []
+        id_position = self.fieldnames.index(self.id_name) if self.id_name in self.fieldnames else None
+        starts: array[int] = array('q')
+        ids: t.List[t.Optional[str]] = []
+        position, size = len(header), len(self._mmap)
+        while position < size:
+            end = self._mmap.find(b'\n', min(position + CHUNK_SIZE, size) - 1)
+            end = size if end == -1 else end + 1
+            lines = self._mmap[position:end].split(b'\n')
+            if not lines[-1]:
+                lines.pop()
+            if any(map(ODD, map(bytes.count, lines, itertools.repeat(b'"')))):
+                # a quoted cell contains a newline, so lines are not rows
+                self._index_records(position, id_position, starts, ids)
+                break
+            self._index_lines(lines, position, id_position, starts, ids)
+            position = end
+        starts.append(size)
+        # the first row of every id, rows without an id are left out
+        rows_by_id = dict(zip(reversed(ids), range(len(ids) - 1, -1, -1)))
+        rows_by_id.pop(None, None)
+        if self.schema is not None and self.schema.infer:
+            sample_size = min(self.sample_size, len(starts) - 1)
+            sample = [self._parse_cells(self._record(starts[row], starts[row + 1])) for row in range(sample_size)]
+            self.schema.read_columns(self.fieldnames, sample)
+        if self.schema is not None and self.id_name in self.schema.types:
+            rows_by_id = {self.schema.parse_value(self.id_name, id): row for id, row in rows_by_id.items()}
+        return LazyCsvCollection(self, starts, rows_by_id)
+
+    def read_row(self, start: int, end: int) -> dt.JSONItem:
+        cells = self._parse_cells(self._record(start, end))
+        row = dict(itertools.zip_longest(self.fieldnames, cells[: len(self.fieldnames)]))
+        if self.schema is not None:
+            for name in self.schema.types.keys() & row.keys():
+                row[name] = self.schema.parse_value(name, row[name])
+        return row
+
+    def read_text(self, start: int, end: int) -> str:
+        """
+        Returns the text of a row without its line terminator.
+        """
+        return self._record(start, end).decode('utf-8').rstrip('\r\n')
+
+    def close(self) -> None:
+        self._mmap.close()
+
+    def _read_record(self) -> bytes:
+        """
+        Reads the next record, which spans several lines while a quoted cell is open.
+        """
+        record = self._mmap.readline()
+        if record.count(b'"') % 2:
+            quotes = record.count(b'"')
+            while quotes % 2:
+                line = self._mmap.readline()
+                if not line:
+                    break
+                record += line
+                quotes += line.count(b'"')
+        return record
+
+    def _record(self, start: int, end: int) -> bytes:
+        return self._mmap[start:end]
+
+    def _index_lines(
+        self,
+        lines: t.List[bytes],
+        offset: int,
+        id_position: t.Optional[int],
+        starts: 'array[int]',
+        ids: t.List[t.Optional[str]],
+    ) -> None:
+        # the lines are processed with map and accumulate so that the work per line is done in C
+        line_starts = list(
+            itertools.accumulate(map(operator.add, map(len, lines), itertools.repeat(1)), initial=offset)
+        )
+        if b'' in lines or b'\r' in lines:
+            # like csv.DictReader, empty rows are skipped
+            kept = [index for index, line in enumerate(lines) if line and line != b'\r']
+            lines = [lines[index] for index in kept]
+            line_starts = [line_starts[index] for index in kept]
+        else:
+            line_starts.pop()
+        starts.extend(line_starts)
+        if id_position is None or not lines:
+            # a chunk may only hold empty rows
+            return
+        if id_position == 0:
+            cells = list(map(operator.itemgetter(0), map(bytes.partition, lines, itertools.repeat(b','))))
+            unquoted = b'"' not in b''.join(cells)
+        else:
+            split_lines = list(map(bytes.split, lines, itertools.repeat(b','), itertools.repeat(id_position + 1)))
+            unquoted = min(map(len, split_lines)) > id_position and b'"' not in b''.join(lines)
+            cells = list(map(operator.itemgetter(id_position), split_lines)) if unquoted else []
+        if unquoted:
+            ids.extend(map(bytes.decode, map(bytes.rstrip, cells, itertools.repeat(b'\r'))))
+        else:
+            ids.extend(self._read_cell(line, id_position) for line in lines)
+
+    def _index_records(
+        self, offset: int, id_position: t.Optional[int], starts: 'array[int]', ids: t.List[t.Optional[str]]
+    ) -> None:
+        self._mmap.seek(offset)
+        while True:
+            record = self._read_record()
+            if not record:
+                return
+            if record not in (b'\n', b'\r\n'):
+                starts.append(offset)
+                if id_position is not None:
+                    ids.append(self._read_cell(record, id_position))
+            offset += len(record)
+
+    def _read_cell(self, record: bytes, position: int) -> t.Optional[str]:
+        cells = record.split(b',', position + 1)
+        if len(cells) <= position:
+            return None
+        quote = record.find(b'"')
+        # a quoted cell may contain commas, so a record with a quote in the cells up to the one that is read is parsed
+        if quote != -1 and (len(cells) == position + 1 or quote < len(record) - len(cells[-1]) - 1):
+            cells = [cell.encode('utf-8') for cell in self._parse_cells(record)]
+            if len(cells) <= position:
+                return None
+        return cells[position].rstrip(b'\r\n').decode('utf-8')
+
+    @staticmethod
+    def _parse_cells(record: bytes) -> t.List[str]:
+        return next(csv.reader([record.decode('utf-8')]), [])
+
+
+class LazyCsvCollection(RowCollection):
+    """
+    A list collection whose rows stay unparsed in a `LazyCsvFile`. Looking a row up by id uses an index built when the
+    file was scanned, the other queries parse every row.
+    """
+
+    def __init__(
+        self,
+        source: LazyCsvFile,
+        starts: 'array[int]',
+        rows_by_id: t.Dict[t.Any, int],
+        row_ids: t.Optional['array[int]'] = None,
+        overrides: t.Optional[t.Dict[int, dt.JSONItem]] = None,
+        next_row_id: t.Optional[int] = None,
+    ):
+        self.source = source
+        # the offset of every row followed by the end of the file
+        self.starts = starts
+        self.rows_by_id = rows_by_id
+        super().__init__(row_ids if row_ids is not None else array('q', range(len(starts) - 1)), overrides, next_row_id)
+
+    def filter(self, **filters: t.Any) -> dt.JSONItems:
+        return [item for item in self if all(item.get(key) == value for key, value in filters.items())]
+
+    def index_of(self, key: str, value: t.Any) -> t.Optional[int]:
+        if key != self.source.id_name:
+            return super().index_of(key, value)
+        return self._indexed_position(key, value, self.rows_by_id.get(value))
+
+    def encoded_items(self) -> t.Iterator[t.Union[str, dt.JSONItem]]:
+        """
+        Yields the text of the rows that are unchanged since the file was scanned and the other rows as they are.
+        """
+        for row_id in self.row_ids:
+            override = self.overrides.get(row_id)
+            yield override if override is not None else self.source.read_text(*self.starts[row_id : row_id + 2])
+
+    def _get_row(self, row_id: int) -> dt.JSONItem:
+        override = self.overrides.get(row_id)
+        if override is not None:
+            return override
+        return self.source.read_row(*self.starts[row_id : row_id + 2])
+
+    def _shares_storage(self, other: RowCollection) -> bool:
+        return isinstance(other, LazyCsvCollection) and other.starts is self.starts
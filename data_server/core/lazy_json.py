@@ -0,0 +1,316 @@
+import json
+import mmap
+import re
+import threading
+import typing as t
+from array import array
+from collections import OrderedDict
+
+import data_server.data_server_types as dt
+from data_server.core.columnar import RowCollection
+from data_server.core.json_stream import StreamingJSONLoader
+from data_server.core.records import json_default
+
+# an id that could not be found without decoding the object
+MISSING = object()
+# the delimiter after an item and the whitespace around it
+DELIMITER = re.compile(r'[ \t\n\r]*([,\]])[ \t\n\r]*')
+COLON = re.compile(r'[ \t\n\r]*:[ \t\n\r]*')
+# an object without nested objects, which may hold arrays and strings with braces
+FLAT_OBJECT = re.compile(r'\{[^{}"]*(?:"[^"\\]*(?:\\.[^"\\]*)*"[^{}"]*)*\}', re.DOTALL)
+
+
+class LazyJSONFile:
+    """
+    A json file that is mapped into memory instead of being read. `load` scans it once and returns its data with every
+    list of objects replaced by a `LazyJSONCollection`, which only stores where each item starts and ends in the file.
+    Items are decoded when they are accessed, the last `cache_size` items that were looked up are kept decoded.
+    """
+
+    def __init__(self, path: str, id_name: str = 'id', cache_size: int = 10_000):
+        self.path = path
+        self.id_name = id_name
+        self.cache_size = cache_size
+        self._cache: t.OrderedDict[int, dt.JSONItem] = OrderedDict()
+        self._cache_lock = threading.Lock()
+        with open(path, 'rb') as data_file:
+            self._mmap = mmap.mmap(data_file.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def load(self) -> t.Any:
+        with open(self.path, encoding='utf-8', newline='') as data_file:
+            return _IndexingLoader(self, data_file).load()
+
+    def read_item(self, start: int, end: int, cache: bool = True) -> dt.JSONItem:
+        if not cache:
+            return t.cast(dt.JSONItem, json.loads(self._mmap[start:end]))
+        with self._cache_lock:
+            item = self._cache.get(start)
+            if item is not None:
+                self._cache.move_to_end(start)
+                return item
+        item = json.loads(self._mmap[start:end])
+        with self._cache_lock:
+            self._cache[start] = item
+            if len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return t.cast(dt.JSONItem, item)
+
+    def read_text(self, start: int, end: int) -> str:
+        return self._mmap[start:end].decode('utf-8')
+
+    def close(self) -> None:
+        self._mmap.close()
+
+
+class LazyJSONCollection(RowCollection):
+    """
+    A list collection whose items stay encoded in a `LazyJSONFile`. Looking an item up by id uses an index built when
+    the file was scanned, scans over every item decode them without adding them to the cache.
+    """
+
+    def __init__(
+        self,
+        source: LazyJSONFile,
+        starts: 'array[int]',
+        ends: 'array[int]',
+        rows_by_id: t.Dict[t.Any, int],
+        row_ids: t.Optional['array[int]'] = None,
+        overrides: t.Optional[t.Dict[int, dt.JSONItem]] = None,
+        next_row_id: t.Optional[int] = None,
+    ):
+        self.source = source
+        self.starts = starts
+        self.ends = ends
+        self.rows_by_id = rows_by_id
+        super().__init__(row_ids if row_ids is not None else array('q', range(len(starts))), overrides, next_row_id)
+
+    def __iter__(self) -> t.Iterator[dt.JSONItem]:
+        for row_id in self.row_ids:
+            yield self._get_row(row_id, cache=False)
+
+    def filter(self, **filters: t.Any) -> dt.JSONItems:
+        return [item for item in self if all(item.get(key) == value for key, value in filters.items())]
+
+    def index_of(self, key: str, value: t.Any) -> t.Optional[int]:
+        if key != self.source.id_name:
+            return super().index_of(key, value)
+        return self._indexed_position(key, value, self.rows_by_id.get(value))
+
+    def encoded_items(self) -> t.Iterator[t.Union[str, dt.JSONItem]]:
+        """
+        Yields the text of the items that are unchanged since the file was scanned and the other items as they are.
+        """
+        for row_id in self.row_ids:
+            override = self.overrides.get(row_id)
+            yield override if override is not None else self.source.read_text(self.starts[row_id], self.ends[row_id])
+
+    def _get_row(self, row_id: int, cache: bool = True) -> dt.JSONItem:
+        override = self.overrides.get(row_id)
+        if override is not None:
+            return override
+        return self.source.read_item(self.starts[row_id], self.ends[row_id], cache)
+
+    def _shares_storage(self, other: RowCollection) -> bool:
+        return isinstance(other, LazyJSONCollection) and other.starts is self.starts
+
+
+def dump(value: t.Any, json_file: t.TextIO, indent: t.Optional[int] = 4, level: int = 0) -> None:
+    """
+    Writes `value` like `json.dump(value, json_file, indent=indent, sort_keys=True)`, except that the unchanged items
+    of lazy collections are copied from their file as they are instead of being decoded and encoded again. With
+    `indent` None, the other values are written without whitespace and with their keys in order, like compact saves.
+    """
+    if indent is None:
+        _dump_compact(value, json_file)
+        return
+    newline = '\n' + ' ' * indent * level
+    if isinstance(value, LazyJSONCollection) and value:
+        json_file.write('[')
+        for position, item in enumerate(value.encoded_items()):
+            json_file.write(',' + newline + ' ' * indent if position else newline + ' ' * indent)
+            if not isinstance(item, str):
+                item = json.dumps(item, indent=indent, sort_keys=True, default=json_default)
+                item = item.replace('\n', newline + ' ' * indent)
+            json_file.write(item)
+        json_file.write(newline + ']')
+    elif isinstance(value, dict) and value:
+        json_file.write('{')
+        for position, key in enumerate(sorted(value)):
+            json_file.write(',' + newline + ' ' * indent if position else newline + ' ' * indent)
+            json_file.write(json.dumps(key) + ': ')
+            dump(value[key], json_file, indent, level + 1)
+        json_file.write(newline + '}')
+    else:
+        json_file.write(json.dumps(value, indent=indent, sort_keys=True, default=json_default).replace('\n', newline))
+
+
+def _dump_compact(value: t.Any, json_file: t.TextIO) -> None:
+    if isinstance(value, LazyJSONCollection):
+        json_file.write('[')
+        for position, item in enumerate(value.encoded_items()):
+            if position:
+                json_file.write(',')
+            json_file.write(item if isinstance(item, str) else _encode_compact(item))
+        json_file.write(']')
+    elif isinstance(value, dict):
+        json_file.write('{')
+        for position, key in enumerate(value):
+            json_file.write(',' if position else '')
+            json_file.write(json.dumps(key) + ':')
+            _dump_compact(value[key], json_file)
+        json_file.write('}')
+    else:
+        json_file.write(_encode_compact(value))
+
+
+def _encode_compact(value: t.Any) -> str:
+    return json.dumps(value, separators=(',', ':'), default=json_default)
+
+
+class _IndexingLoader(StreamingJSONLoader):
+    """
+    Loads a json file like `StreamingJSONLoader`, but records the byte range and id of the items of every list of
+    objects instead of keeping the items. Items are not decoded, so an invalid item only raises an error when it is
+    read.
+    """
+
+    def __init__(self, source: LazyJSONFile, data_file: t.TextIO):
+        super().__init__(data_file)
+        self.source = source
+        # the offset in the file of the byte at buffer position `_mark`, which only moves forward
+        self._mark = 0
+        self._mark_offset = 0
+        self._ascii = True
+        self._id_key = json.dumps(source.id_name)
+
+    def _parse_array(self) -> t.Any:
+        array_start = self._byte_offset(self._position)
+        self._position += 1
+        starts: array[int] = array('q')
+        ends: array[int] = array('q')
+        rows_by_id: t.Dict[t.Any, int] = {}
+        only_objects = True
+        if self._peek() != ']':
+            while True:
+                if only_objects and self._peek() == '{':
+                    delimiter = self._index_objects(starts, ends, rows_by_id)
+                else:
+                    only_objects = False
+                    self._peek()
+                    self._decode_value()
+                    delimiter = self._expect(',]')
+                if delimiter == ']':
+                    break
+        else:
+            self._position += 1
+        if not starts or not only_objects:
+            # empty lists and lists of other values are small enough to be decoded
+            return json.loads(self.source.read_text(array_start, self._byte_offset(self._position)))
+        rows_by_id.pop(None, None)
+        return LazyJSONCollection(self.source, starts, ends, rows_by_id)
+
+    def _index_objects(self, starts: 'array[int]', ends: 'array[int]', rows_by_id: t.Dict[t.Any, int]) -> str:
+        """
+        Records the objects from the current position until one that is not in the buffer yet, has nested objects or
+        is followed by another value, and returns the delimiter after the last one. The end of these objects is the
+        first closing brace outside a string, which is found without decoding them, and only their id is decoded.
+        """
+        match_delimiter, match_colon, scan_once = DELIMITER.match, COLON.match, self._scan_once
+        key, key_length = self._id_key, len(self._id_key)
+        buffer, position = self._buffer, self._position
+        # byte offsets of an ascii buffer are positions in it
+        base = self._mark_offset - self._mark if self._ascii else None
+        while True:
+            end = buffer.find('}', position) + 1
+            if not end:
+                break
+            item = buffer[position:end]
+            # the brace is outside a string when the quotes before it are balanced, unless a quote is escaped
+            if item.count('"') % 2 or '\\"' in item or item.count('{') != 1:
+                match = FLAT_OBJECT.match(buffer, position)
+                if match is None:
+                    break
+                end = match.end()
+                item = match.group()
+            # in an object without nested objects, the id key is the only "id" string that is followed by a colon
+            key_position = item.find(key)
+            colon = match_colon(item, key_position + key_length) if key_position > 0 else None
+            if colon is not None and item[key_position - 1] != '\\':
+                try:
+                    item_id = scan_once(item, colon.end())[0]
+                except (json.JSONDecodeError, StopIteration):
+                    break
+            else:
+                item_id = self._find_id(item)
+                if item_id is MISSING:
+                    break
+            delimiter = match_delimiter(buffer, end)
+            if delimiter is None:
+                break
+            rows_by_id.setdefault(item_id, len(starts))
+            if base is not None:
+                starts.append(base + position)
+                ends.append(base + end)
+            else:
+                starts.append(self._byte_offset(position))
+                ends.append(self._byte_offset(end))
+            position = delimiter.end()
+            if delimiter.group(1) == ']' or buffer[position : position + 1] != '{':
+                self._position = position
+                return delimiter.group(1)
+        self._position = position
+        start = self._byte_offset(position)
+        rows_by_id.setdefault(self._skip_object(), len(starts))
+        starts.append(start)
+        ends.append(self._byte_offset(self._position))
+        return self._expect(',]')
+
+    def _find_id(self, item: str) -> t.Any:
+        """
+        Decodes the id of an object without nested objects, None when it has none and `MISSING` when the object has
+        to be decoded to find it.
+        """
+        position = item.find(self._id_key)
+        while position != -1:
+            if item[position - 1] == '\\':
+                # the end of a key or value that contains the id key
+                return MISSING
+            colon = COLON.match(item, position + len(self._id_key))
+            if colon is not None:
+                try:
+                    return self._scan_once(item, colon.end())[0]
+                except (json.JSONDecodeError, StopIteration):
+                    return MISSING
+            position = item.find(self._id_key, position + 1)
+        return MISSING if '\\' in item else None
+
+    def _skip_object(self) -> t.Any:
+        """
+        Moves past the object at the current position and returns its id, decoding it when it has nested objects.
+        """
+        while True:
+            match = FLAT_OBJECT.match(self._buffer, self._position)
+            if match is not None:
+                break
+            # an object that continues in the next chunk has no closing brace yet, other ones have nested objects
+            if self._buffer.find('}', self._position) != -1 or not self._fill():
+                item = self._decode_value()
+                return item.get(self.source.id_name) if isinstance(item, dict) else None
+        self._position = match.end()
+        # decoding the object raises the error of an invalid one, ids are rarely missing or have an escaped key
+        return json.loads(match.group()).get(self.source.id_name)
+
+    def _byte_offset(self, position: int) -> int:
+        if position > self._mark:
+            text = self._buffer[self._mark : position]
+            self._mark_offset += len(text) if text.isascii() else len(text.encode('utf-8'))
+            self._mark = position
+        return self._mark_offset
+
+    def _fill(self) -> bool:
+        self._byte_offset(self._position)
+        if not super()._fill():
+            return False
+        self._mark = 0
+        self._ascii = self._buffer.isascii()
+        return True
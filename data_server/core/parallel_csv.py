@@ -0,0 +1,128 @@
+import csv
+import io
+import itertools
+import mmap
+import multiprocessing
+import typing as t
+from concurrent.futures import ProcessPoolExecutor
+
+from data_server.core.parallel_scan import POOL_START_METHOD, available_cpu_count
+
+# smallest part of a file that is worth a worker
+MIN_CHUNK_SIZE = 1 << 22
+COUNT_BLOCK_SIZE = 1 << 24
+# joins the cells of a packed column, columns with a cell that contains it are returned as lists
+SEPARATOR = '\0'
+
+# a column as returned by a worker, the joined cells of columns without None cells and a list otherwise
+PackedColumn = t.Union[str, t.List[t.Optional[str]]]
+
+
+def read_csv_columns(
+    path: str, workers: t.Optional[int] = None, min_chunk_size: int = MIN_CHUNK_SIZE
+) -> t.Tuple[t.List[str], t.List[t.List[t.Optional[str]]]]:
+    """
+    Reads the header of a csv file and the rows below it as one list of cells per column. The file is split into
+    ranges of whole records that are parsed by a process pool, so it has to be uncompressed, in an encoding that is
+    compatible with ascii, and quotes may only appear in quoted cells, which makes an odd number of quotes before a
+    newline mean that the newline is part of a cell.
+    """
+    with open(path, 'rb') as csv_file:
+        header = _read_header(csv_file)
+        size = csv_file.seek(0, io.SEEK_END)
+        fieldnames = next(csv.reader(io.TextIOWrapper(io.BytesIO(header))), [])
+        if size == len(header):
+            return fieldnames, [[] for _ in fieldnames]
+        with mmap.mmap(csv_file.fileno(), 0, access=mmap.ACCESS_READ) as source:
+            chunk_count = max(1, min(workers or available_cpu_count(), (size - len(header)) // min_chunk_size))
+            ranges = _split_records(source, len(header), chunk_count)
+    if len(ranges) == 1:
+        parts = [_parse_range(path, *ranges[0], len(fieldnames))]
+    else:
+        # forking a server that runs threads is unsafe
+        with ProcessPoolExecutor(len(ranges), mp_context=multiprocessing.get_context(POOL_START_METHOD)) as pool:
+            futures = [pool.submit(_parse_range, path, start, end, len(fieldnames)) for start, end in ranges]
+            parts = [future.result() for future in futures]
+    columns: t.List[t.List[t.Optional[str]]] = [[] for _ in fieldnames]
+    for row_count, packed_columns in parts:
+        for column, packed in zip(columns, packed_columns):
+            column.extend(_unpack(packed, row_count))
+    return fieldnames, columns
+
+
+def _read_header(csv_file: t.BinaryIO) -> bytes:
+    header = csv_file.readline()
+    while header.count(b'"') % 2:
+        line = csv_file.readline()
+        if not line:
+            break
+        header += line
+    return header
+
+
+def _split_records(source: mmap.mmap, start: int, chunk_count: int) -> t.List[t.Tuple[int, int]]:
+    """
+    Splits `source` from `start` into about `chunk_count` ranges that start at a record, by moving every split to the
+    first newline after it that has an even number of quotes before it.
+    """
+    size = len(source)
+    boundaries = [start]
+    position, quotes = start, 0
+    for chunk in range(1, chunk_count):
+        target = start + (size - start) * chunk // chunk_count
+        if target <= position:
+            continue
+        quotes += _count_quotes(source, position, target)
+        position = target
+        while position < size:
+            newline = source.find(b'\n', position)
+            end = size if newline == -1 else newline + 1
+            quotes += _count_quotes(source, position, end)
+            position = end
+            if quotes % 2 == 0:
+                break
+        if position >= size:
+            break
+        boundaries.append(position)
+    boundaries.append(size)
+    return list(zip(boundaries, boundaries[1:]))
+
+
+def _count_quotes(source: mmap.mmap, start: int, end: int) -> int:
+    return sum(
+        source[block : min(block + COUNT_BLOCK_SIZE, end)].count(b'"') for block in range(start, end, COUNT_BLOCK_SIZE)
+    )
+
+
+def _parse_range(path: str, start: int, end: int, width: int) -> t.Tuple[int, t.List[PackedColumn]]:
+    with open(path, 'rb') as csv_file:
+        csv_file.seek(start)
+        text = csv_file.read(end - start)
+    # decoded like the file is opened by the adapter, with the default encoding and universal newlines
+    rows = csv.reader(io.TextIOWrapper(io.BytesIO(text)))
+    columns: t.List[t.List[t.Optional[str]]] = [[] for _ in range(width)]
+    appends = [column.append for column in columns]
+    row_count = 0
+    for row in rows:
+        # like csv.DictReader, empty rows are skipped, missing trailing cells are None and extra cells are dropped
+        if row:
+            row_count += 1
+            for append, cell in itertools.zip_longest(appends, row[:width]):
+                append(cell)
+    return row_count, [_pack(column) for column in columns]
+
+
+def _pack(column: t.List[t.Optional[str]]) -> PackedColumn:
+    # one joined string is pickled and split again much faster than a list of as many strings
+    if None in column:
+        return column
+    joined = SEPARATOR.join(t.cast(t.List[str], column))
+    if joined.count(SEPARATOR) != max(len(column) - 1, 0):
+        return column
+    return joined
+
+
+def _unpack(packed: PackedColumn, row_count: int) -> t.List[t.Optional[str]]:
+    if not isinstance(packed, str):
+        return packed
+    return t.cast(t.List[t.Optional[str]], packed.split(SEPARATOR)) if row_count else []
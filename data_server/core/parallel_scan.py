@@ -0,0 +1,282 @@
+import array
+import contextlib
+import heapq
+import itertools
+import multiprocessing
+import os
+import threading
+import typing as t
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import data_server.data_server_types as dt
+from data_server.core.columnar import column_values, sort_value
+
+Column = t.Sequence[t.Any]
+ColumnKey = t.Tuple[str, ...]
+# the name of the shared memory block of a column and the type code of its values
+ColumnReference = t.Tuple[str, str]
+
+# workers are started from a clean server process instead of forking the threads of the data server
+POOL_START_METHOD = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+INT64_RANGE = range(-(2**63), 2**63)
+
+
+def available_cpu_count() -> int:
+    if hasattr(os, 'sched_getaffinity'):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+def pack_column(
+    values: t.List[t.Any], ordered: bool = True
+) -> t.Optional[t.Tuple['array.array[t.Any]', t.Optional[t.List[t.Any]]]]:
+    """
+    Packs `values` into an array of 64 bit integers or floats when they all are one of these. Other values are
+    replaced by integer codes, returned with the list of distinct values the codes are positions in. When `ordered`,
+    the distinct values are ordered like `sort_value` orders them, so codes sort like the values they stand for.
+    Returns None when the values cannot be hashed, or compared when they are ordered.
+    """
+    types = set(map(type, values))
+    if types == {int} and min(values) in INT64_RANGE and max(values) in INT64_RANGE:
+        return array.array('q', values), None
+    if types == {float}:
+        return array.array('d', values), None
+    try:
+        distinct = list(dict.fromkeys(values))
+        if ordered:
+            distinct.sort(key=sort_value)
+    except TypeError:
+        return None
+    codes = {value: code for code, value in enumerate(distinct)}
+    return array.array('q', [codes[value] for value in values]), distinct
+
+
+class SharedColumn:
+    """
+    A packed column in a block of shared memory. Scan workers attach to the block by its name instead of receiving a
+    copy of the column with every task.
+    """
+
+    def __init__(self, values: 'array.array[t.Any]', distinct: t.Optional[t.List[t.Any]] = None):
+        self.typecode = values.typecode
+        self._codes = {value: code for code, value in enumerate(distinct)} if distinct is not None else None
+        size = len(values) * values.itemsize
+        # a block cannot be empty
+        self._block = shared_memory.SharedMemory(create=True, size=max(size, 1))
+        assert self._block.buf is not None
+        self._block.buf[:size] = memoryview(values).cast('B')
+
+    @property
+    def reference(self) -> ColumnReference:
+        return self._block.name, self.typecode
+
+    def encode(self, value: t.Any) -> t.Any:
+        """
+        Returns what the packed values are compared with to find `value`, None when no value equals it.
+        """
+        if self._codes is None:
+            return value
+        try:
+            return self._codes.get(value)
+        except TypeError:
+            return None
+
+    def close(self) -> None:
+        self._block.close()
+        self._block.unlink()
+
+
+def _scan_partition(
+    start: int, filters: t.List[t.Tuple[Column, t.Any]], sort_column: Column, reverse: bool
+) -> t.List[int]:
+    matched = [index for index in range(len(sort_column)) if all(column[index] == value for column, value in filters)]
+    matched.sort(key=lambda index: sort_value(sort_column[index]), reverse=reverse)
+    return [start + index for index in matched]
+
+
+def _scan_shared_partition(
+    start: int, stop: int, filters: t.List[t.Tuple[ColumnReference, t.Any]], sort_column: ColumnReference, reverse: bool
+) -> t.List[int]:
+    with contextlib.ExitStack() as stack:
+
+        def attach(reference: ColumnReference) -> Column:
+            name, typecode = reference
+            block = shared_memory.SharedMemory(name)
+            stack.callback(block.close)
+            assert block.buf is not None
+            itemsize = array.array(typecode).itemsize
+            # the views are released before the block is closed
+            partition = stack.enter_context(block.buf[start * itemsize : stop * itemsize])
+            return stack.enter_context(partition.cast(typecode))  # type: ignore[call-overload]
+
+        return _scan_partition(
+            start, [(attach(reference), value) for reference, value in filters], attach(sort_column), reverse
+        )
+
+
+class _ColumnSet:
+    def __init__(self, items: dt.JSONItems) -> None:
+        self.items = items
+        self.size = len(items)
+        self.columns: t.Dict[ColumnKey, t.Optional[SharedColumn]] = {}
+        # the blocks are freed once the set is evicted and no scan reads them anymore
+        self.scans = 0
+        self.evicted = False
+
+    def close(self) -> None:
+        for column in self.columns.values():
+            if column is not None:
+                column.close()
+        self.columns = {}
+
+
+class ParallelScanner:
+    """
+    Filters and sorts large collections by splitting them into partitions that are scanned in a process pool. The
+    filter and sort columns are packed into blocks of shared memory once per collection, string and other values as
+    codes of their distinct values, so a task only carries the names of the blocks and its partition bounds. Each
+    worker returns the sorted indexes of the matches in its partition, and the partial results are combined with a
+    k-way merge, which gives exactly the order a single stable sort of the whole collection would. The pool is
+    started by the first scan and kept until `close`.
+
+    Items appended after the columns were packed are scanned in this process and merged in, the columns are packed
+    again once more than `rebuild_after` items were appended or when an item is updated or deleted. Fields whose
+    values cannot be hashed or compared are not scanned in parallel, `scan` returns None for them.
+    """
+
+    def __init__(
+        self,
+        threshold: int = 0,
+        workers: t.Optional[int] = None,
+        rebuild_after: int = 1024,
+        max_cached_collections: int = 4,
+    ):
+        self.threshold = threshold
+        self.workers = workers or available_cpu_count()
+        self.rebuild_after = rebuild_after
+        self.max_cached_collections = max_cached_collections
+        self._column_sets: t.Dict[int, _ColumnSet] = {}
+        self._lock = threading.Lock()
+        self._pool: t.Optional[ProcessPoolExecutor] = None
+
+    def can_scan(self, items: dt.JSONItems) -> bool:
+        return self.workers > 1 and 0 < self.threshold <= len(items)
+
+    def on_change(self, change: dt.Change) -> None:
+        with self._lock:
+            column_set = self._column_sets.pop(id(change.previous), None)
+            if column_set is None:
+                return
+            if (
+                column_set.items is change.previous
+                and change.type == dt.ChangeType.ADD
+                and len(change.current) - column_set.size < self.rebuild_after
+            ):
+                column_set.items = change.current
+                self._column_sets[id(change.current)] = column_set
+            else:
+                self._evict(column_set)
+
+    def scan(
+        self,
+        items: dt.JSONItems,
+        filters: t.Dict[str, t.Any],
+        sort_key: str,
+        sort_default: t.Any,
+        reverse: bool = False,
+        limit: t.Optional[int] = None,
+    ) -> t.Optional[dt.JSONItems]:
+        with self._lock:
+            column_set = self._get_column_set(items)
+            sort_column = self._get_column(column_set, ('sort', sort_key, repr(sort_default)), sort_key, sort_default)
+            shared_filters = []
+            for key, value in filters.items():
+                column = self._get_column(column_set, ('filter', key), key, None)
+                if column is None:
+                    return None
+                shared_filters.append((column.reference, column.encode(value)))
+            if sort_column is None:
+                return None
+            column_set.scans += 1
+            pool = self._get_pool()
+        try:
+            partial_results = self._scan_partitions(
+                pool, column_set.size, shared_filters, sort_column.reference, reverse
+            )
+        finally:
+            with self._lock:
+                column_set.scans -= 1
+                if column_set.evicted and not column_set.scans:
+                    column_set.close()
+
+        appended = [
+            index
+            for index in range(column_set.size, len(items))
+            if all(items[index].get(key) == value for key, value in filters.items())
+        ]
+        appended.sort(key=lambda index: sort_value(items[index].get(sort_key, sort_default)), reverse=reverse)
+        merged = heapq.merge(
+            *partial_results,
+            appended,
+            key=lambda index: sort_value(items[index].get(sort_key, sort_default)),
+            reverse=reverse,
+        )
+        return [items[index] for index in itertools.islice(merged, limit)]
+
+    def close(self) -> None:
+        with self._lock:
+            for column_set in self._column_sets.values():
+                self._evict(column_set)
+            self._column_sets = {}
+            if self._pool is not None:
+                self._pool.shutdown()
+                self._pool = None
+
+    def _scan_partitions(
+        self,
+        pool: ProcessPoolExecutor,
+        size: int,
+        filters: t.List[t.Tuple[ColumnReference, t.Any]],
+        sort_column: ColumnReference,
+        reverse: bool,
+    ) -> t.List[t.List[int]]:
+        if any(value is None for _, value in filters):
+            # no packed value equals a filter value that is encoded as None
+            return []
+        partition_size = -(-size // self.workers)
+        futures = [
+            pool.submit(_scan_shared_partition, start, min(start + partition_size, size), filters, sort_column, reverse)
+            for start in range(0, size, partition_size)
+        ]
+        return [future.result() for future in futures]
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(self.workers, mp_context=multiprocessing.get_context(POOL_START_METHOD))
+        return self._pool
+
+    def _get_column_set(self, items: dt.JSONItems) -> _ColumnSet:
+        # published collections are never mutated, so columns stay valid for as long as the same list is scanned
+        column_set = self._column_sets.get(id(items))
+        if column_set is not None and column_set.items is items:
+            return column_set
+        if len(self._column_sets) >= self.max_cached_collections:
+            self._evict(self._column_sets.pop(next(iter(self._column_sets))))
+        column_set = _ColumnSet(items)
+        self._column_sets[id(items)] = column_set
+        return column_set
+
+    @staticmethod
+    def _get_column(column_set: _ColumnSet, key: ColumnKey, field: str, default: t.Any) -> t.Optional[SharedColumn]:
+        if key not in column_set.columns:
+            # only the codes of the sort column need to follow the order of their values
+            packed = pack_column(column_values(column_set.items, field, default)[: column_set.size], key[0] == 'sort')
+            column_set.columns[key] = SharedColumn(*packed) if packed is not None else None
+        return column_set.columns[key]
+
+    @staticmethod
+    def _evict(column_set: _ColumnSet) -> None:
+        column_set.evicted = True
+        if not column_set.scans:
+            column_set.close()
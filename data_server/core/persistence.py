@@ -0,0 +1,116 @@
+import atexit
+import logging
+import signal
+import threading
+import time
+import typing as t
+
+logger = logging.getLogger('data_server')
+
+
+class WriteBehindFlusher:
+    """
+    Coalesces saves of a data adapter. Writes call `mark_dirty` instead of saving, and a background thread calls
+    `save` at most once every `interval` seconds, or as soon as `max_pending_changes` changes are pending. Every
+    change made before a save started is included in it, since saves write the whole current state.
+
+    `close` stops the thread and saves any pending change, it is also registered with `atexit` so the last changes
+    are written when the process exits without closing the flusher. A flusher created in the main thread also
+    closes on SIGTERM, which does not run `atexit` handlers, before passing the signal on to the previous handler.
+    """
+
+    def __init__(self, save: t.Callable[[], None], interval: float = 1.0, max_pending_changes: int = 100):
+        self.save = save
+        self.interval = interval
+        self.max_pending_changes = max_pending_changes
+        self.pending_changes = 0
+        self.flush_count = 0
+        self._dirty_since = 0.0
+        self._closed = False
+        self._condition = threading.Condition()
+        self._save_lock = threading.Lock()
+        self._thread = threading.Thread(target=self._run, name='data-server-flusher', daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+        self._previous_sigterm_handler: t.Any = None
+        if threading.current_thread() is threading.main_thread():
+            self._previous_sigterm_handler = signal.signal(signal.SIGTERM, self._handle_sigterm)
+
+    def mark_dirty(self) -> None:
+        with self._condition:
+            if self._closed:
+                raise RuntimeError('cannot mark a closed flusher dirty')
+            if not self.pending_changes:
+                self._dirty_since = time.monotonic()
+            self.pending_changes += 1
+            if self.pending_changes == 1 or self.pending_changes >= self.max_pending_changes:
+                self._condition.notify()
+
+    def flush(self) -> None:
+        """
+        Saves the pending changes now, if there are any.
+        """
+        with self._save_lock:
+            with self._condition:
+                pending_changes, self.pending_changes = self.pending_changes, 0
+            if not pending_changes:
+                return
+            try:
+                self.save()
+            except Exception:
+                # keep the changes pending so the next flush retries them
+                with self._condition:
+                    if not self.pending_changes:
+                        self._dirty_since = time.monotonic()
+                    self.pending_changes += pending_changes
+                raise
+            self.flush_count += 1
+
+    def close(self) -> None:
+        with self._condition:
+            if self._closed:
+                return
+            self._closed = True
+            self._condition.notify()
+        self._thread.join()
+        atexit.unregister(self.close)
+        if (
+            self._previous_sigterm_handler is not None
+            and threading.current_thread() is threading.main_thread()
+            and signal.getsignal(signal.SIGTERM) == self._handle_sigterm
+        ):
+            signal.signal(signal.SIGTERM, self._previous_sigterm_handler)
+        self.flush()
+
+    def _handle_sigterm(self, signum: int, frame: t.Any) -> None:
+        previous_handler = self._previous_sigterm_handler
+        self.close()
+        if callable(previous_handler):
+            previous_handler(signum, frame)
+        elif previous_handler != signal.SIG_IGN:
+            # the default handler ends the process
+            raise SystemExit(128 + signum)
+
+    def _run(self) -> None:
+        while True:
+            with self._condition:
+                while not self._closed and not self._is_due():
+                    timeout = None
+                    if self.pending_changes:
+                        timeout = max(self._dirty_since + self.interval - time.monotonic(), 0)
+                    self._condition.wait(timeout)
+                if self._closed:
+                    return
+            try:
+                self.flush()
+            except Exception:
+                logger.exception('Failed to save changes, retrying in %s seconds', self.interval)
+                with self._condition:
+                    self._condition.wait(self.interval)
+
+    def _is_due(self) -> bool:
+        if not self.pending_changes:
+            return False
+        if self.pending_changes >= self.max_pending_changes:
+            return True
+        return time.monotonic() - self._dirty_since >= self.interval
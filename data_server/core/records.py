@@ -0,0 +1,101 @@
+import typing as t
+
+import data_server.data_server_types as dt
+
+
+class RecordSchema:
+    """
+    The ordered keys of a group of records, shared by every record that has exactly these keys.
+    """
+
+    __slots__ = ('keys', 'positions')
+
+    def __init__(self, keys: t.Tuple[str, ...]):
+        self.keys = keys
+        self.positions = {key: position for position, key in enumerate(keys)}
+
+
+class CompactRecord(t.Mapping[str, t.Any]):
+    """
+    A read-only item that stores its values in a tuple and looks keys up in a shared schema, which takes a fraction
+    of the memory of a dictionary. Writes in DataController always build a new dictionary from the item, so a record
+    is replaced by a plain dictionary the first time it is changed.
+    """
+
+    __slots__ = ('_schema', '_values')
+
+    def __init__(self, schema: RecordSchema, values: t.Tuple[t.Any, ...]):
+        self._schema = schema
+        self._values = values
+
+    def __getitem__(self, key: str) -> t.Any:
+        return self._values[self._schema.positions[key]]
+
+    def get(self, key: str, default: t.Any = None) -> t.Any:
+        position = self._schema.positions.get(key)
+        return default if position is None else self._values[position]
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._schema.positions
+
+    def __iter__(self) -> t.Iterator[str]:
+        return iter(self._schema.keys)
+
+    def __len__(self) -> int:
+        return len(self._schema.keys)
+
+    def __repr__(self) -> str:
+        return f'{type(self).__name__}({self.to_dict()!r})'
+
+    def __reduce__(self) -> t.Tuple[t.Any, ...]:
+        return (CompactRecord, (self._schema, self._values))
+
+    def to_dict(self) -> dt.JSONItem:
+        return dict(zip(self._schema.keys, self._values))
+
+    copy = to_dict
+
+
+class RecordCompactor:
+    """
+    Turns dictionaries into compact records, reusing one schema for every dictionary with the same keys.
+    """
+
+    def __init__(self) -> None:
+        self._schemas: t.Dict[t.Tuple[str, ...], RecordSchema] = {}
+
+    def compact(self, item: t.Any) -> t.Any:
+        if type(item) is not dict:
+            return item
+        keys = tuple(item)
+        schema = self._schemas.get(keys)
+        if schema is None:
+            schema = self._schemas[keys] = RecordSchema(keys)
+        return CompactRecord(schema, tuple(item.values()))
+
+    def compact_items(self, items: dt.JSONItems) -> dt.JSONItems:
+        return [self.compact(item) for item in items]
+
+
+def compact_collections(data: dt.JSONItem) -> None:
+    """
+    Replaces the items of every list collection in `data` with compact records.
+    """
+    compactor = RecordCompactor()
+    for key, value in data.items():
+        if isinstance(value, list):
+            data[key] = compactor.compact_items(value)
+        elif isinstance(value, dict):
+            compact_collections(value)
+
+
+def json_default(value: t.Any) -> t.Any:
+    """
+    A `default` for json encoders that serializes compact records and other mappings or sequences that are not
+    plain dictionaries and lists.
+    """
+    if isinstance(value, t.Mapping):
+        return dict(value)
+    if isinstance(value, t.Sequence) and not isinstance(value, (str, bytes)):
+        return list(value)
+    raise TypeError(f'Object of type {type(value).__name__} is not JSON serializable')
@@ -1,4 +1,3 @@
-import json
 import logging
 import multiprocessing
 import sys
@@ -11,6 +10,7 @@ from werkzeug.serving import run_simple
 from werkzeug.wrappers import Request, Response
 
 import data_server.data_server_types as dt
+from data_server.core.codec import get_codec
 from data_server.errors import DataServerError, ItemNotFoundError
 
 URL_SEPARATOR = '/'
@@ -32,6 +32,7 @@ class Server:
         static_url_prefix: str = 'static',
         sleep_before_request: int = 0,
         extra_files: t.Optional[t.List[str]] = None,
+        json_codec: t.Optional[str] = None,
     ) -> None:
         self.request_handler = request_handler
         self._werkzeug_logger = logging.getLogger('werkzeug')
@@ -42,6 +43,8 @@ class Server:
         self.static_folder = static_folder
         self.static_url_folder = static_url_prefix
         self.extra_files = extra_files or []
+        # responses are encoded to bytes, which werkzeug sends as they are
+        self.codec = get_codec(json_codec)
         self.stdin_handle: t.Optional[t.TextIO] = sys.stdin
         self.server_process: t.Optional[multiprocessing.Process] = None
         self._initial_log_level = self._werkzeug_logger.level
@@ -80,17 +83,17 @@ class Server:
         traceback.print_exception(type(exception), exception, exception.__traceback__)
         return construct_error_response(', '.join(map(str, exception.args)), 500, None), 500, {}
 
-    def _handle_options_request(self) -> t.Tuple[str, int, dt.RequestHeaders]:
+    def _handle_options_request(self) -> t.Tuple[bytes, int, dt.RequestHeaders]:
         headers = self._update_headers(
             {
                 'Access-Control-Allow-Methods': 'GET, POST, PUT, PATCH, DELETE, OPTIONS',
                 'Access-Control-Allow-Origin': '*',
             }
         )
-        return '', 200, headers
+        return b'', 200, headers
 
-    def _encode_response_content(self, content: t.Any) -> str:
-        return json.dumps(content)
+    def _encode_response_content(self, content: t.Any) -> bytes:
+        return self.codec.dumps(content)
 
     @staticmethod
     def strip_url_path_prefix(path: str, prefix: str) -> str:
@@ -102,7 +105,7 @@ class Server:
             raise ItemNotFoundError('url cannot be resolved, check if prefix was added correctly')
         return path[len(prefix) :]
 
-    def _handle_request(self, request: Request) -> t.Tuple[str, int, dt.RequestHeaders]:
+    def _handle_request(self, request: Request) -> t.Tuple[bytes, int, dt.RequestHeaders]:
         if request.method.upper() == dt.HTTPMethod.OPTIONS:
             return self._handle_options_request()
 
@@ -173,3 +176,7 @@ class Server:
         #     raise RuntimeError('Server is not started') from None
         # self.server_process.terminate()
         self._werkzeug_logger.setLevel(self._initial_log_level)
+        # request handlers that save changes in the background write what is still pending
+        close = getattr(self.request_handler, 'close', None)
+        if close is not None:
+            close()
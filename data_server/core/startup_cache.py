@@ -0,0 +1,83 @@
+import contextlib
+import gc
+import hashlib
+import logging
+import os
+import pickle
+import typing as t
+
+from data_server.core.files import atomic_write_bytes
+
+logger = logging.getLogger('data_server')
+
+# bumped whenever the classes stored in a cache change, so caches written by another version are not used
+CACHE_FORMAT_VERSION = 1
+HASH_CHUNK_SIZE = 1 << 20
+
+
+class StartupCache:
+    """
+    A pickle of what an adapter read from `source`, stored next to it in `<source>.cache`. The cache is only used while
+    the source has the size, modification time and content hash it had when the cache was written and is read with
+    the same `options`, any other cache is replaced by the next `save`.
+
+    Loading a pickle can run arbitrary code, so the cache must be as trusted as the source itself.
+    """
+
+    def __init__(self, source: str, options: t.Tuple[t.Any, ...]):
+        self.source = source
+        self.path = source + '.cache'
+        self.options = options
+        self._key: t.Optional[t.Tuple[t.Any, ...]] = None
+
+    def load(self) -> t.Optional[t.Tuple[t.Any, t.Any]]:
+        """
+        Returns the data and adapter state that were saved for the current source, None when there are none.
+        """
+        self._key = self._source_key()
+        if not os.path.exists(self.path):
+            return None
+        try:
+            with open(self.path, 'rb') as cache_file:
+                if pickle.load(cache_file) != self._key:
+                    return None
+                with _collector_paused():
+                    return t.cast(t.Tuple[t.Any, t.Any], pickle.load(cache_file))
+        except Exception as error:
+            logger.warning('Ignoring the startup cache %s, it cannot be read: %s', self.path, error)
+            return None
+
+    def save(self, data: t.Any, state: t.Any) -> bool:
+        """
+        Saves the data read from the source when `load` was called. Returns whether it could be pickled.
+        """
+        key = self._key if self._key is not None else self._source_key()
+        try:
+            with atomic_write_bytes(self.path) as cache_file:
+                pickle.dump(key, cache_file, protocol=pickle.HIGHEST_PROTOCOL)
+                pickle.dump((data, state), cache_file, protocol=pickle.HIGHEST_PROTOCOL)
+        except Exception as error:
+            # e.g lazy collections, which keep the source mapped into memory
+            logger.warning('The data of %s cannot be cached: %s', self.source, error)
+            return False
+        return True
+
+    def _source_key(self) -> t.Tuple[t.Any, ...]:
+        status = os.stat(self.source)
+        digest = hashlib.blake2b(digest_size=16)
+        with open(self.source, 'rb') as source_file:
+            for chunk in iter(lambda: source_file.read(HASH_CHUNK_SIZE), b''):
+                digest.update(chunk)
+        return (CACHE_FORMAT_VERSION, self.options, status.st_size, status.st_mtime_ns, digest.hexdigest())
+
+
+@contextlib.contextmanager
+def _collector_paused() -> t.Iterator[None]:
+    # unpickling creates millions of containers, which would trigger many collections that find no cycles in them
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
@@ -0,0 +1,177 @@
+import heapq
+import importlib
+import itertools
+import math
+import threading
+import typing as t
+
+import data_server.data_server_types as dt
+from data_server.core.columnar import column_values, sort_value
+
+
+def _import_numpy() -> t.Any:
+    try:
+        return importlib.import_module('numpy')
+    except ImportError:
+        return None
+
+
+np = _import_numpy()
+
+INT64_MIN = -(2**63)
+INT64_MAX = 2**63 - 1
+
+
+class _Column(t.NamedTuple):
+    kind: type
+    values: t.Any
+    categories: t.Optional[t.Dict[str, int]] = None
+
+
+class _ColumnSet:
+    def __init__(self, items: dt.JSONItems) -> None:
+        self.items = items
+        self.size = len(items)
+        self.columns: t.Dict[str, t.Optional[_Column]] = {}
+
+
+class VectorizedQueryEngine:
+    """
+    Answers equality filters and sorts on large collections with NumPy. Numeric fields are mirrored into int64 or
+    float64 arrays and string fields into categorical codes whose order matches string order, so filters become
+    boolean masks and sorts become stable argsorts. A field is only mirrored when every item has it with the same
+    type, anything else falls back to the pure Python path so results are always identical.
+
+    Items appended after the arrays were built are kept in a buffer that is queried in Python and merged in, the
+    arrays are rebuilt once the buffer grows past `rebuild_after` items or when an item is updated or deleted.
+    """
+
+    def __init__(self, threshold: int = 50_000, rebuild_after: int = 1024, max_cached_collections: int = 4):
+        self.threshold = threshold
+        self.rebuild_after = rebuild_after
+        self.max_cached_collections = max_cached_collections
+        self._column_sets: t.Dict[int, _ColumnSet] = {}
+        # guards the cached column sets and their columns, which requests build while other requests read them
+        self._lock = threading.Lock()
+
+    def can_query(self, items: dt.JSONItems) -> bool:
+        return np is not None and 0 < self.threshold <= len(items)
+
+    def on_change(self, change: dt.Change) -> None:
+        with self._lock:
+            column_set = self._column_sets.pop(id(change.previous), None)
+            if column_set is None or column_set.items is not change.previous:
+                return
+            if change.type == dt.ChangeType.ADD and len(change.current) - column_set.size < self.rebuild_after:
+                column_set.items = change.current
+                self._column_sets[id(change.current)] = column_set
+
+    def query(
+        self,
+        items: dt.JSONItems,
+        filters: t.Dict[str, t.Any],
+        sort_key: str,
+        sort_default: t.Any,
+        reverse: bool = False,
+        limit: t.Optional[int] = None,
+    ) -> t.Optional[dt.JSONItems]:
+        with self._lock:
+            column_set = self._get_column_set(items)
+            sort_column = self._get_column(column_set, sort_key)
+            filter_columns = [(self._get_column(column_set, key), value) for key, value in filters.items()]
+        if sort_column is None:
+            return None
+        mask = np.ones(column_set.size, dtype=bool)
+        for column, value in filter_columns:
+            if column is None:
+                return None
+            column_mask = self._equals(column, value)
+            if column_mask is None:
+                return None
+            mask &= column_mask
+
+        indexes = self._sort(np.flatnonzero(mask), sort_column.values, reverse, limit)
+        buffered = [
+            index
+            for index in range(column_set.size, len(items))
+            if all(items[index].get(key) == value for key, value in filters.items())
+        ]
+        if not buffered:
+            return [items[index] for index in indexes.tolist()]
+        buffered.sort(key=lambda index: sort_value(items[index].get(sort_key, sort_default)), reverse=reverse)
+        merged = heapq.merge(
+            indexes.tolist(),
+            buffered,
+            key=lambda index: sort_value(items[index].get(sort_key, sort_default)),
+            reverse=reverse,
+        )
+        return [items[index] for index in itertools.islice(merged, limit)]
+
+    @staticmethod
+    def _sort(indexes: t.Any, values: t.Any, reverse: bool, limit: t.Optional[int]) -> t.Any:
+        keys = values[indexes]
+        if limit is not None and 0 < limit < len(keys) // 8:
+            # only keep the items that can end up in the first `limit` results, ties with the boundary value are
+            # kept too so the stable sort below still orders them exactly like a full sort would
+            if reverse:
+                boundary = np.partition(keys, len(keys) - limit)[len(keys) - limit]
+                candidates = keys >= boundary
+            else:
+                boundary = np.partition(keys, limit - 1)[limit - 1]
+                candidates = keys <= boundary
+            indexes, keys = indexes[candidates], keys[candidates]
+        if not reverse:
+            return indexes[np.argsort(keys, kind='stable')][:limit]
+        # a stable descending sort keeps equal keys in their original order, which a reversed ascending sort doesn't
+        order = np.argsort(keys[::-1], kind='stable')[::-1]
+        return indexes[len(keys) - 1 - order][:limit]
+
+    @staticmethod
+    def _equals(column: _Column, value: t.Any) -> t.Any:
+        if column.kind is str:
+            if type(value) is not str:
+                return None
+            assert column.categories is not None
+            code = column.categories.get(value)
+            return column.values == code if code is not None else np.zeros(len(column.values), dtype=bool)
+        if type(value) is str:
+            return np.zeros(len(column.values), dtype=bool)
+        if type(value) is not column.kind:
+            return None
+        return column.values == value
+
+    def _get_column_set(self, items: dt.JSONItems) -> _ColumnSet:
+        column_set = self._column_sets.get(id(items))
+        if column_set is not None and column_set.items is items:
+            return column_set
+        if len(self._column_sets) >= self.max_cached_collections:
+            del self._column_sets[next(iter(self._column_sets))]
+        column_set = _ColumnSet(items)
+        self._column_sets[id(items)] = column_set
+        return column_set
+
+    def _get_column(self, column_set: _ColumnSet, key: str) -> t.Optional[_Column]:
+        if key not in column_set.columns:
+            values = column_values(column_set.items, key)[: column_set.size]
+            column_set.columns[key] = self._build_column(values)
+        return column_set.columns[key]
+
+    @staticmethod
+    def _build_column(values: t.List[t.Any]) -> t.Optional[_Column]:
+        kind = type(values[0]) if values else None
+        if kind not in (int, float, str) or any(type(value) is not kind for value in values):
+            return None
+        if kind is int:
+            if min(values) < INT64_MIN or max(values) > INT64_MAX:
+                return None
+            return _Column(int, np.array(values, dtype=np.int64))
+        if kind is float:
+            if any(math.isnan(value) for value in values):
+                return None
+            return _Column(float, np.array(values, dtype=np.float64))
+        categories, codes = np.unique(np.array(values, dtype=object), return_inverse=True)
+        return _Column(
+            str,
+            codes.astype(np.int32),
+            {category: code for code, category in enumerate(categories.tolist())},
+        )
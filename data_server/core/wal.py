@@ -0,0 +1,157 @@
+import json
+import logging
+import os
+import threading
+import time
+import typing as t
+from enum import Enum
+
+import data_server.data_server_types as dt
+from data_server.core.files import atomic_write
+from data_server.core.records import json_default
+
+logger = logging.getLogger('data_server')
+
+
+class FsyncPolicy(str, Enum):
+    ALWAYS = 'always'
+    INTERVAL = 'interval'
+    NEVER = 'never'
+
+
+class WriteAheadLog:
+    """
+    An append-only log of the changes made to the data, one json line per change. Every record is written to the
+    operating system before the request that made the change returns, so a crash of the server loses nothing. How
+    often the log is synced to disk depends on `fsync`: after every change, at most once every `fsync_interval`
+    seconds so changes are committed in groups, or never, which leaves it to the operating system. With the interval
+    policy, a background thread syncs the records that are still pending once the interval ends, so the last change
+    before the server goes idle is not left unsynced.
+
+    Records store the data version after their change, `truncate` drops the records a saved snapshot already holds.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        id_name: str = 'id',
+        fsync: t.Union[str, FsyncPolicy] = FsyncPolicy.INTERVAL,
+        fsync_interval: float = 0.1,
+    ):
+        self.path = path
+        self.id_name = id_name
+        self.fsync = FsyncPolicy(fsync)
+        self.fsync_interval = fsync_interval
+        self._last_fsync = time.monotonic()
+        self._lock = threading.Lock()
+        self._condition = threading.Condition(self._lock)
+        self._pending = False
+        self._closed = False
+        self._file = open(self.path, 'a', encoding='utf-8')
+        self._sync_thread: t.Optional[threading.Thread] = None
+        if self.fsync == FsyncPolicy.INTERVAL:
+            self._sync_thread = threading.Thread(target=self._run_sync, name='data-server-wal-sync', daemon=True)
+            self._sync_thread.start()
+
+    def append(self, change: dt.Change, version: int) -> None:
+        record: t.Dict[str, t.Any] = {'version': version, 'type': change.type.value, 'path': change.path}
+        if change.type == dt.ChangeType.RESET:
+            if change.current is not None:
+                record['value'] = change.current
+        elif change.type == dt.ChangeType.DELETE:
+            assert change.item is not None
+            record['id'] = change.item.get(self.id_name)
+        else:
+            record['item'] = change.item
+        line = json.dumps(record, separators=(',', ':'), default=json_default) + '\n'
+        with self._lock:
+            self._file.write(line)
+            self._file.flush()
+            if self.fsync == FsyncPolicy.ALWAYS or (
+                self.fsync == FsyncPolicy.INTERVAL and time.monotonic() - self._last_fsync >= self.fsync_interval
+            ):
+                self._sync()
+            elif self.fsync == FsyncPolicy.INTERVAL and not self._pending:
+                self._pending = True
+                self._condition.notify()
+
+    def read(self) -> t.Iterator[dt.Change]:
+        """
+        Yields the logged changes. A last record that was only partly written when the server stopped is skipped.
+        """
+        for record in self._read_records():
+            change_type = dt.ChangeType(record['type'])
+            path = record['path']
+            if change_type == dt.ChangeType.RESET:
+                yield dt.Change(change_type, path, None, record.get('value'))
+            elif change_type == dt.ChangeType.DELETE:
+                yield dt.Change(change_type, path, None, None, {self.id_name: record['id']})
+            else:
+                yield dt.Change(change_type, path, None, None, record['item'])
+
+    def truncate(self, version: t.Optional[int] = None) -> None:
+        """
+        Drops the records of changes up to `version`, or every record when it is None. The log is replaced
+        atomically, so a crash while truncating leaves the old log in place.
+        """
+        with self._lock:
+            self._file.flush()
+            kept = []
+            if version is not None:
+                kept = [record for record in self._read_records() if record['version'] > version]
+            self._file.close()
+            try:
+                with atomic_write(self.path, fsync=True, encoding='utf-8') as log_file:
+                    for record in kept:
+                        log_file.write(json.dumps(record, separators=(',', ':')) + '\n')
+            finally:
+                self._file = open(self.path, 'a', encoding='utf-8')
+            # the kept records were synced with the new log
+            self._pending = False
+
+    def close(self) -> None:
+        with self._condition:
+            if self._closed:
+                return
+            self._closed = True
+            self._condition.notify()
+        if self._sync_thread is not None:
+            self._sync_thread.join()
+        with self._lock:
+            self._sync()
+            self._file.close()
+
+    def _sync(self) -> None:
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._last_fsync = time.monotonic()
+        self._pending = False
+
+    def _run_sync(self) -> None:
+        with self._condition:
+            while not self._closed:
+                if not self._pending:
+                    self._condition.wait()
+                    continue
+                remaining = self._last_fsync + self.fsync_interval - time.monotonic()
+                if remaining > 0:
+                    self._condition.wait(remaining)
+                    continue
+                try:
+                    self._sync()
+                except OSError:
+                    logger.exception('Failed to sync %s, retrying in %s seconds', self.path, self.fsync_interval)
+                    self._condition.wait(self.fsync_interval)
+
+    def _read_records(self) -> t.List[t.Dict[str, t.Any]]:
+        with open(self.path, encoding='utf-8') as log_file:
+            lines = log_file.readlines()
+        records = []
+        for number, line in enumerate(lines, start=1):
+            try:
+                records.append(json.loads(line))
+            except json.JSONDecodeError:
+                if number < len(lines):
+                    raise
+                logger.warning('Skipping a partly written last record in %s', self.path)
+        return records
@@ -25,6 +25,9 @@ RequestHandler = t.Callable[[str, str, t.Optional[RequestHeaders], t.Optional[JS
 class ResourceType(str, Enum):
     JSON_FILE = 'json'
     CSV_FILE = 'csv'
+    JSON_LINES_FILE = 'jsonl'
+    SQLITE_FILE = 'sqlite'
+    DIRECTORY = 'directory'
     PLAIN_DICT = 'dict'
 
 
@@ -43,3 +46,23 @@ class HTTPMethod(str, Enum):
 class SortOrder(str, Enum):
     ASC = 'asc'
     DESC = 'desc'
+
+
+class ChangeType(str, Enum):
+    ADD = 'add'
+    UPDATE = 'update'
+    DELETE = 'delete'
+    RESET = 'reset'
+
+
+class Change(t.NamedTuple):
+    type: ChangeType
+    path: ItemPath
+    previous: t.Any
+    current: t.Any
+    item: t.Optional[JSONItem] = None
+    # the change is already part of the resource, e.g it was reloaded from the file
+    persisted: bool = False
+
+
+ChangeListener = t.Callable[[Change], None]
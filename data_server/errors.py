@@ -30,3 +30,15 @@ class CsvAdapterError(AdapterError):
 
 class JSONAdapterError(AdapterError):
     pass
+
+
+class JSONLinesAdapterError(AdapterError):
+    pass
+
+
+class DirectoryAdapterError(AdapterError):
+    pass
+
+
+class SQLiteAdapterError(AdapterError):
+    pass
@@ -0,0 +1,61 @@
+import json
+import time
+import typing as t
+
+from tests.int import IntegrationTestCase
+from tests.int.utils import Order, TestClient, TestServer, generate_order
+
+
+class SnapshotRequestTestCase(IntegrationTestCase):
+    orders: t.List[Order] = []
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        return super().setUpClass()
+
+    def setUp(self) -> None:
+        self.client: TestClient = self._get_client()
+        self.server: TestServer = self._get_server()
+        return super().setUp()
+
+    @classmethod
+    def create_json_file(cls) -> str:
+        cls.server = cls.server
+        cls.orders = [
+            generate_order(
+                id_name=cls.server.id_name,
+                created_at_key=cls.server.created_at_param_name,
+                updated_at_key=cls.server.updated_at_param_name,
+                add_timestamps=cls.server.use_timestamps,
+            )
+            for _ in [None] * 10
+        ]
+        json_data = {'orders': cls.orders}
+        server_file = f'tests/int/fixtures/{int(time.time() * 1000000)}.json'
+        with open(server_file, 'w') as opened_server_file:
+            json.dump(json_data, opened_server_file)
+        return server_file
+
+
+class TestSnapshotRequest(SnapshotRequestTestCase):
+    def test_restore_snapshot_resets_data_and_saves(self) -> None:
+        response = self.client.post('/api/v3/__admin/snapshots/clean')
+        self.assertEqual(response['status'], 201)
+        self.assertEqual(response['json']['name'], 'clean')
+
+        order_id = self.orders[0][self.server.id_name]
+        self.assertEqual(self.client.delete(f'/api/v3/orders/{order_id}')['status'], 204)
+        self.assertEqual(self.client.post('/api/v3/orders', data={'orderName': 'new'})['status'], 201)
+
+        response = self.client.put('/api/v3/__admin/snapshots/clean')
+        self.assertEqual(response['status'], 200)
+        with open(self.server.server_file) as f:
+            data = json.load(f)
+        self.assertCountEqual(data['orders'], self.orders)
+        response = self.client.get(f'/api/v3/orders/{order_id}')
+        self.assertEqual(response['status'], 200)
+
+    def test_restore_snapshot_that_does_not_exist_returns_error(self) -> None:
+        response = self.client.put('/api/v3/__admin/snapshots/missing')
+        self.assertEqual(response['status'], 404)
+        self.assertIn('error', response['json'])
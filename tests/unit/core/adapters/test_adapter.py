@@ -1,4 +1,5 @@
 import unittest
+from copy import deepcopy
 from typing import Any, Dict
 
 from data_server.core.adapters.adapter import DataAdapter
@@ -80,6 +81,9 @@ class TestDataAdapterMethods(unittest.TestCase):
 
     def test_get_data(self) -> None:
         self.assertDictEqual(self.adapter.get_data(), data_sample)
+        data = self.adapter.get_data()
+        self.adapter.execute_delete_request('/books', 1)
+        self.assertDictEqual(data, data_sample)
 
     def test_get_urls(self) -> None:
         urls = self.adapter.get_urls()
@@ -116,3 +120,28 @@ class TestDataAdapterMethods(unittest.TestCase):
                 ('/index/date', dict),
             ],
         )
+
+
+class TestCopyOnWrite(unittest.TestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.data = {'books': [{'id': 1, 'title': 'Emma'}, {'id': 2, 'title': 'Dracula'}], 'index': {'tags': []}}
+        self.original = deepcopy(self.data)
+
+    def test_items_are_shared_until_they_are_written(self) -> None:
+        adapter = DataAdapter(self.data, copy_on_write=True, use_timestamps=False)
+        self.assertIs(adapter.get_data()['books'], self.data['books'])
+        adapter.execute_patch_request('/books', 1, {'title': 'Persuasion'})
+        adapter.execute_post_request('/index/tags', {'id': 1, 'name': 'novel'})
+        adapter.execute_delete_request('/books', 2)
+        self.assertEqual(self.data, self.original)
+        self.assertEqual(adapter.get_data()['books'], [{'id': 1, 'title': 'Persuasion'}])
+        self.assertEqual(len(adapter.get_data()['index']['tags']), 1)
+
+    def test_data_changed_while_loading_is_copied(self) -> None:
+        adapter = DataAdapter(
+            self.data, copy_on_write=True, fix=True, compact_records=True, autogenerate_id=True, use_timestamps=False
+        )
+        self.assertEqual(self.data, self.original)
+        self.assertEqual([book['title'] for book in adapter.get_data()['books']], ['Emma', 'Dracula'])
+        self.assertIsNot(adapter.get_data()['index'], self.data['index'])
@@ -1,8 +1,14 @@
+import csv
+import os
+import tempfile
+import typing as t
 import unittest
 import unittest.mock as mock
 from io import StringIO
 
 from data_server.core.adapters.csv_adapter import CsvAdapter
+from data_server.core.columnar import ColumnarCollection
+from data_server.core.csv_schema import INT, CsvSchema
 from data_server.errors import CsvAdapterError
 
 
@@ -61,6 +67,44 @@ class TestCSVAdapter(unittest.TestCase):
         os_patch.assert_called_with('csv_file.csv')
         self.assertDictEqual(adapter.get_data(), {'csv_file': [{'id': '1', 'name': 'pius'}]})
 
+    @mock.patch('os.path.exists', return_value=True)
+    @mock.patch('builtins.open', return_value=StringIO('id,name\n1,pius\n2,kobby'))
+    def test_read_data_as_columns(self, open_patch: mock.MagicMock, os_patch: mock.MagicMock) -> None:
+        adapter = CsvAdapter('csv_file.csv', columnar=True)
+        data = adapter.get_data()
+        self.assertIsInstance(data['csv_file'], ColumnarCollection)
+        self.assertListEqual(data['csv_file'].columns, [['1', '2'], ['pius', 'kobby']])
+        self.assertDictEqual(adapter.execute_get_item_request('/csv_file', '2'), {'id': '2', 'name': 'kobby'})
+        self.assertListEqual(adapter.get_url_data(), [('/csv_file', list)])
+
+    @mock.patch('os.path.exists', return_value=True)
+    @mock.patch('builtins.open', return_value=StringIO('id,name,age\n1,pius,30\n2,kobby,\n3,ama,9'))
+    def test_read_data_with_inferred_types(self, open_patch: mock.MagicMock, os_patch: mock.MagicMock) -> None:
+        adapter = CsvAdapter('csv_file.csv', infer_types=True)
+        self.assertDictEqual(adapter.get_data()['csv_file'][1], {'id': 2, 'name': 'kobby', 'age': None})
+        self.assertListEqual(adapter.execute_get_request('/csv_file', age='30'), [{'id': 1, 'name': 'pius', 'age': 30}])
+        items = adapter.execute_get_request('/csv_file', sort_by='age')
+        self.assertListEqual([item['id'] for item in items], [3, 1, 2])
+        self.assertEqual(adapter.execute_get_item_request('/csv_file', 3)['age'], 9)
+
+    @mock.patch('os.path.exists', return_value=True)
+    @mock.patch('builtins.open', return_value=StringIO('id,age\n1,30\n2,old'))
+    def test_read_data_with_invalid_schema_types(self, open_patch: mock.MagicMock, os_patch: mock.MagicMock) -> None:
+        with mock.patch('data_server.core.csv_schema.CsvSchema.from_file') as from_file_patch:
+            from_file_patch.return_value = CsvSchema({'age': INT})
+            with self.assertRaises(CsvAdapterError):
+                CsvAdapter('csv_file.csv', schema_file='schema.json')
+
+    @mock.patch('os.path.exists', return_value=True)
+    @mock.patch('builtins.open', return_value=StringIO('id,status\n1,open\n2,open'))
+    def test_read_data_with_interned_strings(self, open_patch: mock.MagicMock, os_patch: mock.MagicMock) -> None:
+        with self.assertLogs('data_server', 'INFO'):
+            adapter = CsvAdapter('csv_file.csv', intern_strings=True)
+        first, second = adapter.get_data()['csv_file']
+        self.assertIs(first['status'], second['status'])
+        assert adapter.interner is not None
+        self.assertEqual(adapter.interner.interned_count, 1)
+
     @mock.patch('os.path.exists', return_value=True)
     @mock.patch('builtins.open', return_value=StringIO(''))
     def test_save_data(
@@ -69,6 +113,79 @@ class TestCSVAdapter(unittest.TestCase):
         os_patch: mock.MagicMock,
     ) -> None:
         with mock.patch.object(CsvAdapter, 'read_data', return_value={'csv_file': [{'id': '1', 'name': 'pius'}]}):
-            adapter = CsvAdapter('csv_file.csv')
-            adapter.save_data()
+            adapter = CsvAdapter('csv_file.csv', fsync_saves=True)
+            adapter.execute_patch_request('/csv_file', '1', {'name': 'kobby'})
+            with mock.patch('data_server.core.adapters.csv_adapter.atomic_write') as atomic_write_patch:
+                atomic_write_patch.return_value.__enter__.return_value = open_patch.return_value
+                adapter.save_data()
         os_patch.assert_called_with('csv_file.csv')
+        atomic_write_patch.assert_called_with('csv_file.csv', fsync=True, newline='', compression_level=None)
+        self.assertEqual(open_patch.return_value.getvalue(), 'id,name\r\n1,kobby\r\n')
+
+
+class TestCSVAdapterSaves(unittest.TestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, 'books.csv')
+        with open(self.path, 'w', newline='') as csv_file:
+            # added items get timestamps, so the file starts with these columns
+            csv_file.write('id,title,created_at,updated_at\r\n1,Advanced Python,,')
+
+    def read_rows(self) -> t.List[t.List[str]]:
+        with open(self.path, newline='') as csv_file:
+            return [row[:2] if index else row for index, row in enumerate(csv.reader(csv_file))]
+
+    def test_added_items_are_appended(self) -> None:
+        adapter = CsvAdapter(self.path, infer_types=True)
+        adapter.execute_post_request('/books', {'id': 2, 'title': 'Python In 30 Days'})
+        adapter.execute_post_request('/books', {'id': 3})
+        with mock.patch('data_server.core.adapters.csv_adapter.atomic_write') as atomic_write_patch:
+            adapter.save_data()
+            adapter.save_data()
+        self.assertFalse(atomic_write_patch.called)
+        self.assertListEqual(
+            self.read_rows(),
+            [
+                ['id', 'title', 'created_at', 'updated_at'],
+                ['1', 'Advanced Python'],
+                ['2', 'Python In 30 Days'],
+                ['3', ''],
+            ],
+        )
+
+    def test_rows_are_appended_after_a_multibyte_character(self) -> None:
+        with open(self.path, 'w', newline='', encoding='utf-8') as csv_file:
+            csv_file.write('id,title,created_at,updated_at\r\n1,Café,,')
+        adapter = CsvAdapter(self.path)
+        adapter.execute_post_request('/books', {'id': '2', 'title': 'Python In 30 Days'})
+        adapter.save_data()
+        self.assertListEqual(self.read_rows()[1:], [['1', 'Café'], ['2', 'Python In 30 Days']])
+
+    def test_other_changes_rewrite_the_file(self) -> None:
+        adapter = CsvAdapter(self.path)
+        adapter.execute_post_request('/books', {'id': '2', 'title': 'Python In 30 Days'})
+        adapter.execute_delete_request('/books', '1')
+        adapter.save_data()
+        self.assertListEqual(self.read_rows()[1:], [['2', 'Python In 30 Days']])
+
+        adapter.execute_post_request('/books', {'id': '3', 'title': 'Fluent Python', 'author': 'Luciano Ramalho'})
+        adapter.save_data()
+        rows = self.read_rows()
+        self.assertListEqual(rows[0], ['id', 'title', 'created_at', 'updated_at', 'author'])
+        self.assertListEqual(rows[1:], [['2', 'Python In 30 Days'], ['3', 'Fluent Python']])
+
+    def test_lazy_saves_copy_unchanged_rows(self) -> None:
+        with open(self.path, 'a', newline='') as csv_file:
+            csv_file.write('\r\n2,"Python, In 30 Days",,\r\n3,Fluent Python,,\r\n')
+        adapter = CsvAdapter(self.path, lazy=True)
+        self.addCleanup(adapter.close)
+        self.assertEqual(adapter.execute_get_item_request('/books', '2')['title'], 'Python, In 30 Days')
+        adapter.execute_patch_request('/books', '3', {'title': 'Fluent Python 2'})
+        adapter.execute_delete_request('/books', '1')
+        with mock.patch.object(adapter.lazy_file, 'read_row', side_effect=AssertionError('rows were parsed')):
+            adapter.save_data()
+        self.assertListEqual(self.read_rows()[1:], [['2', 'Python, In 30 Days'], ['3', 'Fluent Python 2']])
+        with open(self.path, newline='') as csv_file:
+            self.assertIn('2,"Python, In 30 Days",,\r\n', csv_file.read())
@@ -0,0 +1,102 @@
+import json
+import os
+import tempfile
+import unittest
+
+from data_server.core.adapters.directory_adapter import DirectoryAdapter
+from data_server.errors import DirectoryAdapterError
+
+
+class TestDirectoryAdapter(unittest.TestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+        self.write('authors.json', '[{"id": "1", "name": "Austen"}]')
+        self.write('books.csv', 'id,title\n1,Emma\n')
+        self.write('reviews.jsonl', '{"id": "1", "stars": 5}\n')
+        self.write('settings.json', '{"theme": "dark", "pages": {"home": []}}')
+        self.write('notes.txt', 'not served')
+
+    def write(self, file_name: str, content: str) -> None:
+        with open(os.path.join(self.directory, file_name), 'w') as data_file:
+            data_file.write(content)
+
+    def read(self, file_name: str) -> str:
+        with open(os.path.join(self.directory, file_name)) as data_file:
+            return data_file.read()
+
+    def test_initialization_with_missing_directory(self) -> None:
+        with self.assertRaises(DirectoryAdapterError):
+            DirectoryAdapter(os.path.join(self.directory, 'missing'))
+
+    def test_initialization_with_two_files_for_one_name(self) -> None:
+        self.write('books.json', '[]')
+        with self.assertRaises(DirectoryAdapterError):
+            DirectoryAdapter(self.directory)
+
+    def test_lists_are_loaded_on_first_access(self) -> None:
+        adapter = DirectoryAdapter(self.directory)
+        self.assertEqual(
+            adapter.get_url_data(),
+            [
+                ('/authors', list),
+                ('/books', list),
+                ('/reviews', list),
+                ('/settings', dict),
+                ('/settings/pages', dict),
+                ('/settings/pages/home', list),
+            ],
+        )
+        self.assertEqual(adapter._loaded, {'authors', 'settings'})
+        self.assertEqual(adapter.execute_get_item_request('/books', '1'), {'id': '1', 'title': 'Emma'})
+        self.assertEqual(adapter._loaded, {'authors', 'books', 'settings'})
+        self.assertEqual(adapter.get_data()['reviews'], [{'id': '1', 'stars': 5}])
+
+    def test_saves_write_changed_files(self) -> None:
+        adapter = DirectoryAdapter(self.directory)
+        adapter.execute_post_request('/reviews', {'id': '2', 'stars': 3})
+        adapter.execute_patch_request('/authors', '1', {'name': 'Eliot'})
+        self.write('books.csv', 'changed outside')
+        adapter.save_data()
+        self.assertEqual(json.loads(self.read('authors.json')), [{'id': '1', 'name': 'Eliot'}])
+        self.assertTrue(self.read('reviews.jsonl').splitlines()[-1].startswith('{"id":"2","stars":3'))
+        self.assertEqual(self.read('books.csv'), 'changed outside')
+
+    def test_saves_append_to_csv_and_json_lines_files(self) -> None:
+        self.write('books.csv', 'id,title,created_at,updated_at\n1,Emma,,\n')
+        adapter = DirectoryAdapter(self.directory)
+        adapter.execute_post_request('/books', {'id': '2', 'title': 'Dracula'})
+        adapter.execute_post_request('/reviews', {'id': '2', 'stars': 3})
+        # the adapters of the files save from the data of the directory instead of a copy of their own
+        self.assertIs(adapter._file_adapters['books']._controller, adapter._controller)
+        paths = [os.path.join(self.directory, file_name) for file_name in ('books.csv', 'reviews.jsonl')]
+        inodes = [os.stat(path).st_ino for path in paths]
+        adapter.save_data()
+        self.assertEqual([os.stat(path).st_ino for path in paths], inodes)
+        self.assertEqual(
+            [line.split(',')[:2] for line in self.read('books.csv').splitlines()][1:], [['1', 'Emma'], ['2', 'Dracula']]
+        )
+        self.assertTrue(self.read('reviews.jsonl').splitlines()[-1].startswith('{"id":"2","stars":3'))
+
+    def test_snapshots_load_every_value(self) -> None:
+        adapter = DirectoryAdapter(self.directory)
+        adapter.create_snapshot('start')
+        adapter.execute_delete_request('/books', '1')
+        adapter.restore_snapshot('start')
+        adapter.save_data()
+        self.assertEqual(self.read('books.csv').splitlines(), ['id,title', '1,Emma'])
+
+    def test_reloads_changed_files_that_are_loaded(self) -> None:
+        adapter = DirectoryAdapter(self.directory, watch_interval=60)
+        self.addCleanup(adapter.close)
+        adapter.execute_get_request('/books')
+        self.write('books.csv', 'id,title\n1,Emma\n2,Dracula\n')
+        self.write('reviews.jsonl', '{"id": "1", "stars": 1}\n')
+        self.write('settings.json', '{"theme": "light", "pages": {"home": []}}')
+        adapter._reload_changed_files()
+        self.assertEqual(adapter._loaded, {'authors', 'books', 'settings'})
+        self.assertEqual(len(adapter.get_data()['books']), 2)
+        self.assertEqual(adapter.get_data()['settings']['theme'], 'light')
+        self.assertEqual(adapter.get_data()['reviews'], [{'id': '1', 'stars': 1}])
@@ -3,6 +3,7 @@ import unittest.mock as mock
 from io import StringIO
 
 from data_server.core.adapters.json_adapter import JSONAdapter
+from data_server.core.records import CompactRecord
 from data_server.errors import AdapterError, JSONAdapterError
 
 
@@ -34,6 +35,31 @@ class TestJSONAdapter(unittest.TestCase):
         os_patch.assert_called_with('json_file.json')
         self.assertDictEqual(adapter.get_data(), {})
 
+    @mock.patch('os.path.exists', return_value=True)
+    @mock.patch('builtins.open', return_value=StringIO('{"books": [{"genre": "fiction"}, {"genre": "fiction"}]}'))
+    def test_read_data_with_interned_strings(self, open_patch: mock.MagicMock, os_patch: mock.MagicMock) -> None:
+        with self.assertLogs('data_server', 'INFO'):
+            adapter = JSONAdapter('json_file.json', intern_strings=True)
+        first, second = adapter.get_data()['books']
+        self.assertIs(first['genre'], second['genre'])
+
+    @mock.patch('os.path.exists', return_value=True)
+    @mock.patch('builtins.open', return_value=StringIO('{"books": [{"id": 1}, {"id": 2}], "shelf": {"id": 3}}'))
+    def test_read_data_streaming(self, open_patch: mock.MagicMock, os_patch: mock.MagicMock) -> None:
+        adapter = JSONAdapter('json_file.json', streaming=True, compact_records=True)
+        books = adapter.get_data()['books']
+        self.assertTrue(all(isinstance(book, CompactRecord) for book in books))
+        self.assertListEqual([dict(book) for book in books], [{'id': 1}, {'id': 2}])
+        self.assertDictEqual(adapter.get_data()['shelf'], {'id': 3})
+
+    @mock.patch('os.path.exists', return_value=True)
+    @mock.patch('builtins.open', return_value=StringIO('{"books": [{"id": 1}'))
+    def test_read_data_streaming_with_invalid_json_file(
+        self, open_patch: mock.MagicMock, os_patch: mock.MagicMock
+    ) -> None:
+        with self.assertRaises(JSONAdapterError):
+            JSONAdapter('json_file.json', streaming=True)
+
     @mock.patch('os.path.exists', return_value=True)
     @mock.patch('builtins.open', return_value=StringIO('-'))
     def test_read_data_with_invalid_json_file(self, open_patch: mock.MagicMock, os_patch: mock.MagicMock) -> None:
@@ -43,12 +69,25 @@ class TestJSONAdapter(unittest.TestCase):
         self.assertTrue(os_patch.called)
 
     @mock.patch('os.path.exists', return_value=True)
-    @mock.patch('builtins.open', return_value=StringIO('{}'))
-    @mock.patch('json.dump', return_value=None)
-    def test_save_data(self, json_patch: mock.MagicMock, open_patch: mock.MagicMock, os_patch: mock.MagicMock) -> None:
+    @mock.patch('data_server.core.adapters.json_adapter.SegmentedJSONWriter')
+    def test_save_data(self, writer_patch: mock.MagicMock, os_patch: mock.MagicMock) -> None:
         with mock.patch.object(JSONAdapter, 'read_data', return_value={}):
             adapter = JSONAdapter('json_file.json')
             adapter.save_data()
         os_patch.assert_called_with('json_file.json')
-        open_patch.assert_called_with('json_file.json', 'w')
+        writer_patch.assert_called_with('json_file.json', adapter.codec, compact=False, fsync=False)
+        writer_patch.return_value.write.assert_called_with({}, None)
+
+    @mock.patch('os.path.exists', return_value=True)
+    @mock.patch('builtins.open', return_value=StringIO('{}'))
+    @mock.patch('json.dump', return_value=None)
+    def test_save_compressed_data(
+        self, json_patch: mock.MagicMock, open_patch: mock.MagicMock, os_patch: mock.MagicMock
+    ) -> None:
+        with mock.patch.object(JSONAdapter, 'read_data', return_value={}):
+            adapter = JSONAdapter('json_file.json.gz')
+            with mock.patch('data_server.core.adapters.json_adapter.atomic_write') as atomic_write_patch:
+                adapter.save_data()
+        os_patch.assert_called_with('json_file.json.gz')
+        atomic_write_patch.assert_called_with('json_file.json.gz', fsync=False, compression_level=None)
         self.assertTrue(json_patch.called)
@@ -0,0 +1,95 @@
+import gzip
+import os
+import tempfile
+import unittest
+
+from data_server.core.adapters.json_lines_adapter import JSONLinesAdapter
+from data_server.core.records import CompactRecord
+from data_server.errors import JSONLinesAdapterError
+
+
+class TestJSONLinesAdapter(unittest.TestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.path = os.path.join(self.directory.name, 'books.jsonl')
+        self.write('{"id": 1, "title": "Emma"}\n\n{"id": 2, "title": "Dracula"}\n')
+
+    def write(self, content: str) -> None:
+        with open(self.path, 'w') as lines_file:
+            lines_file.write(content)
+
+    def read(self) -> str:
+        with open(self.path) as lines_file:
+            return lines_file.read()
+
+    def test_initialization_with_file_that_does_not_exist(self) -> None:
+        with self.assertRaises(JSONLinesAdapterError):
+            JSONLinesAdapter(self.path + '.missing')
+
+    def test_read_data(self) -> None:
+        adapter = JSONLinesAdapter(self.path, compact_records=True)
+        self.assertEqual(adapter.get_data(), {'books': [{'id': 1, 'title': 'Emma'}, {'id': 2, 'title': 'Dracula'}]})
+        self.assertIsInstance(adapter.get_data()['books'][0], CompactRecord)
+
+    def test_read_data_replays_replaced_and_deleted_items(self) -> None:
+        self.write(
+            '{"id": 1, "title": "Emma"}\n{"id": 2}\n{"id": 1, "title": "Ulysses"}\n{"__deleted__": 2}\n{"id": 3}'
+        )
+        adapter = JSONLinesAdapter(self.path)
+        self.assertEqual(adapter.get_data(), {'books': [{'id': 1, 'title': 'Ulysses'}, {'id': 3}]})
+        self.assertEqual(adapter._superseded_lines, 3)
+
+    def test_read_data_with_invalid_line(self) -> None:
+        self.write('{"id": 1}\n{"id": 2}, {"id": 3}\n')
+        with self.assertRaisesRegex(JSONLinesAdapterError, 'line 2'):
+            JSONLinesAdapter(self.path)
+        self.write('{"id": 1}\n[1, 2]\n')
+        with self.assertRaises(JSONLinesAdapterError):
+            JSONLinesAdapter(self.path)
+        # lines that only decode as records when they are joined
+        self.write('{"id": 1}\n{"a": 1},{"b": 2\n"c": 3}\n')
+        with self.assertRaisesRegex(JSONLinesAdapterError, 'line 2'):
+            JSONLinesAdapter(self.path)
+
+    def test_saves_append_changes(self) -> None:
+        adapter = JSONLinesAdapter(self.path)
+        adapter.execute_post_request('/books', {'id': 3, 'title': 'Beloved'})
+        adapter.execute_patch_request('/books', 1, {'title': 'Persuasion'})
+        adapter.execute_delete_request('/books', 2)
+        adapter.save_data()
+        lines = self.read().splitlines()
+        self.assertEqual(lines[:3], ['{"id": 1, "title": "Emma"}', '', '{"id": 2, "title": "Dracula"}'])
+        self.assertEqual(lines[-1], '{"__deleted__":2}')
+        self.assertEqual(JSONLinesAdapter(self.path).get_data(), adapter.get_data())
+
+    def test_saves_append_after_a_multibyte_character(self) -> None:
+        self.write('{"id": 1, "title": "Café"}')
+        adapter = JSONLinesAdapter(self.path)
+        adapter.execute_post_request('/books', {'id': 2, 'title': 'Beloved'})
+        adapter.save_data()
+        self.assertEqual(self.read().splitlines()[0], '{"id": 1, "title": "Café"}')
+        self.assertEqual(JSONLinesAdapter(self.path).get_data(), adapter.get_data())
+
+    def test_saves_rewrite_superseded_lines(self) -> None:
+        adapter = JSONLinesAdapter(self.path, compact_after=2)
+        adapter.execute_patch_request('/books', 1, {'title': 'Persuasion'})
+        adapter.save_data()
+        self.assertEqual(len(self.read().splitlines()), 4)
+        adapter.execute_delete_request('/books', 2)
+        adapter.save_data()
+        self.assertEqual(self.read().splitlines(), ['{"id":1,"title":"Persuasion"}'])
+        adapter.save_data({'books': []})
+        self.assertEqual(self.read(), '')
+
+    def test_compressed_file_is_rewritten(self) -> None:
+        path = self.path + '.gz'
+        with gzip.open(path, 'wt') as lines_file:
+            lines_file.write(self.read())
+        adapter = JSONLinesAdapter(path)
+        self.assertEqual(adapter.key, 'books')
+        adapter.execute_delete_request('/books', 1)
+        adapter.save_data()
+        with gzip.open(path, 'rt') as lines_file:
+            self.assertEqual(lines_file.read(), '{"id":2,"title":"Dracula"}\n')
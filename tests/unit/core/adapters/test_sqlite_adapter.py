@@ -0,0 +1,109 @@
+import os
+import tempfile
+import unittest
+
+from data_server.core.adapters.sqlite_adapter import SQLiteAdapter
+from data_server.errors import DataControllerError, DuplicateIDFoundError, ItemNotFoundError, SQLiteAdapterError
+
+
+class TestSQLiteAdapter(unittest.TestCase):
+    def setUp(self) -> None:
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, 'data.db')
+        SQLiteAdapter.create_database(
+            self.path,
+            {
+                'books': [
+                    {'id': 2, 'title': 'Emma', 'year': 1815},
+                    {'id': 1, 'title': 'Dracula', 'year': 1897},
+                    {'id': 3, 'title': 'Ulysses', 'year': None},
+                    {'id': 4, 'title': 'Beloved'},
+                ],
+                'authors': [],
+            },
+        )
+        self.adapter = SQLiteAdapter(self.path, autogenerate_id=True, page_param_name='page', size_param_name='size')
+        self.addCleanup(self.adapter.close)
+
+    def test_initialization_with_file_that_does_not_exist(self) -> None:
+        with self.assertRaises(SQLiteAdapterError):
+            SQLiteAdapter(self.path + '.missing')
+
+    def test_tables_are_collections(self) -> None:
+        self.assertEqual(self.adapter.get_url_data(), [('/books', list), ('/authors', list)])
+        self.assertIs(self.adapter._controller.id_type, int)
+        self.assertEqual(self.adapter.get_data()['books'][0], {'id': 2, 'title': 'Emma', 'year': 1815})
+
+    def test_get_items(self) -> None:
+        items = self.adapter.execute_get_request('/books', sort_by='year', size='3')
+        # items without the sort key are sorted by the default, which is the first collection name
+        self.assertEqual([item['id'] for item in items], [2, 1, 4])
+        items = self.adapter.execute_get_request('/books', order='desc', page='1', size='2')
+        self.assertEqual([item['id'] for item in items], [2, 1])
+        self.assertEqual(
+            self.adapter.execute_get_request('/books', title='Emma'), [self.adapter.get_data()['books'][0]]
+        )
+        self.assertEqual(self.adapter.execute_get_request('/books', id='2'), [])
+        with self.assertRaises(DataControllerError):
+            self.adapter.execute_get_request('/books', page='-1')
+        with self.assertRaises(ItemNotFoundError):
+            self.adapter.execute_get_request('/movies')
+
+    def test_filters_are_indexed(self) -> None:
+        query = """EXPLAIN QUERY PLAN SELECT item FROM books WHERE json_extract(item, '$."title"') = 'Emma'"""
+        self.adapter.execute_get_request('/books', title='Emma')
+        self.assertNotIn('USING INDEX', self.adapter._connection.execute(query).fetchall()[0][3])
+        adapter = SQLiteAdapter(self.path, auto_index=True)
+        self.addCleanup(adapter.close)
+        adapter.execute_get_request('/books', title='Emma')
+        self.assertIn('USING INDEX', adapter._connection.execute(query).fetchall()[0][3])
+
+    def test_wal_mode(self) -> None:
+        self.assertEqual(self.adapter._connection.execute('PRAGMA journal_mode').fetchone(), ('delete',))
+        adapter = SQLiteAdapter(self.path, wal_mode=True)
+        self.addCleanup(adapter.close)
+        self.assertEqual(adapter._connection.execute('PRAGMA journal_mode').fetchone(), ('wal',))
+
+    def test_get_item(self) -> None:
+        self.assertEqual(self.adapter.execute_get_item_request('/books', 1)['title'], 'Dracula')
+        with self.assertRaises(ItemNotFoundError):
+            self.adapter.execute_get_item_request('/books', 10)
+
+    def test_writes(self) -> None:
+        added = self.adapter.execute_post_request('/books', {'title': 'Middlemarch'})
+        self.assertEqual(added['id'], 5)
+        without_ids = SQLiteAdapter(self.path)
+        self.addCleanup(without_ids.close)
+        with self.assertRaises(DuplicateIDFoundError):
+            without_ids.execute_post_request('/books', {'id': 5})
+        self.adapter.execute_patch_request('/books', 5, {'year': 1871})
+        self.adapter.execute_put_request('/books', 1, {'title': 'Carmilla'})
+        self.adapter.execute_delete_request('/books', 2)
+        with self.assertRaises(ItemNotFoundError):
+            self.adapter.execute_delete_request('/books', 2)
+        reopened = SQLiteAdapter(self.path)
+        self.addCleanup(reopened.close)
+        books = reopened.get_data()['books']
+        self.assertIn('created_at', books[3])
+        self.assertEqual(
+            [{key: value for key, value in book.items() if not key.endswith('_at')} for book in books],
+            [
+                {'id': 1, 'title': 'Carmilla'},
+                {'id': 3, 'title': 'Ulysses', 'year': None},
+                {'id': 4, 'title': 'Beloved'},
+                {'id': 5, 'title': 'Middlemarch', 'year': 1871},
+            ],
+        )
+
+    def test_save_data(self) -> None:
+        self.adapter.save_data()
+        self.adapter.save_data({'movies': [{'id': 'a'}]})
+        self.assertEqual(self.adapter.get_urls(), ['/movies'])
+        self.assertEqual(self.adapter.execute_get_item_request('/movies', 'a'), {'id': 'a'})
+        with self.assertRaises(SQLiteAdapterError):
+            self.adapter.save_data({'settings': {}})
+
+    def test_snapshots_are_not_supported(self) -> None:
+        with self.assertRaises(SQLiteAdapterError):
+            self.adapter.create_snapshot('before')
@@ -0,0 +1,110 @@
+import importlib.util
+import io
+import json
+import math
+import typing as t
+import unittest
+from unittest import mock
+
+from data_server.core.codec import CODECS, JSONCodec, get_codec
+from data_server.core.records import RecordCompactor
+from data_server.errors import DataServerError
+
+from tests.unit.fake_data import data_sample, data_sample_with_nested_items
+
+
+def installed(module: str) -> bool:
+    return importlib.util.find_spec(module) is not None
+
+
+class CodecTests:
+    """
+    The tests every codec has to pass, run once for each installed codec.
+    """
+
+    codec_name = 'json'
+    keeps_non_finite_floats = True
+
+    def setUp(self) -> None:
+        self.codec = get_codec(self.codec_name)
+
+    def test_round_trip(self: t.Any) -> None:
+        self.assertEqual(self.codec.name, self.codec_name)
+        for value in [data_sample, data_sample_with_nested_items, [], {}, 'é ✓ / "quoted"', 2**70, -0.5, None]:
+            self.assertEqual(self.codec.loads(self.codec.dumps(value)), value)
+            self.assertEqual(json.loads(self.codec.dumps(value)), value)
+            self.assertEqual(self.codec.loads(json.dumps(value)), value)
+
+    def test_numbers(self: t.Any) -> None:
+        values = [1e20, 1.5e-7, 5e-324, 1.7976931348623157e308, -0.0, 0.1]
+        self.assertEqual(self.codec.loads(self.codec.dumps(values)), values)
+        record = RecordCompactor().compact({'price': float('nan'), 'limits': (float('inf'), -float('inf'))})
+        for value in [{'price': float('nan'), 'tags': None}, [None, [float('inf')]], record]:
+            if self.keeps_non_finite_floats:
+                # written like json.dumps writes them
+                self.assertEqual(self.codec.dumps(value), JSONCodec().dumps(value))
+            else:
+                self.assertEqual(self.codec.dumps(value), JSONCodec().dumps(json.loads(self.codec.dumps(value))))
+        price = self.codec.loads(self.codec.dumps({'price': float('nan')}))['price']
+        self.assertTrue(math.isnan(price) if self.keeps_non_finite_floats else price is None)
+
+    def test_lone_surrogates(self: t.Any) -> None:
+        value = json.loads('{"name": "\\ud800"}')
+        self.assertEqual(self.codec.loads(self.codec.dumps(value)), value)
+        self.assertEqual(json.loads(self.codec.dumps(value)), value)
+
+    def test_encodes_compact_records(self: t.Any) -> None:
+        record = RecordCompactor().compact({'id': 1, 'tags': ('a', 'b')})
+        self.assertEqual(json.loads(self.codec.dumps({'books': [record]})), {'books': [{'id': 1, 'tags': ['a', 'b']}]})
+        with self.assertRaises(TypeError):
+            self.codec.dumps({'id': object()})
+
+    def test_invalid_documents(self: t.Any) -> None:
+        for document in ['{"id": 1', '', '[1,]', b'\xff']:
+            with self.assertRaises(json.JSONDecodeError if document != b'\xff' else ValueError):
+                self.codec.loads(document)
+
+    def test_dump(self: t.Any) -> None:
+        indented, compact = io.StringIO(), io.StringIO()
+        self.codec.dump({'b': [1], 'a': 'é'}, indented)
+        self.codec.dump({'b': [1], 'a': 'é'}, compact, compact=True)
+        # indented files are the same with every codec
+        self.assertEqual(indented.getvalue(), json.dumps({'b': [1], 'a': 'é'}, indent=4, sort_keys=True))
+        self.assertNotIn('\n', compact.getvalue())
+        self.assertEqual(list(json.loads(compact.getvalue())), ['b', 'a'])
+
+
+class TestJSONCodec(CodecTests, unittest.TestCase):
+    codec_name = 'json'
+
+
+@unittest.skipUnless(installed('orjson'), 'orjson is not installed')
+class TestOrjsonCodec(CodecTests, unittest.TestCase):
+    codec_name = 'orjson'
+    keeps_non_finite_floats = False
+
+    def test_values_with_null_are_encoded_by_orjson(self) -> None:
+        items = [{'id': index, 'email': None, 'score': index / 2} for index in range(1000)]
+        with mock.patch.object(JSONCodec, 'dumps', side_effect=AssertionError('encoded by the json codec')):
+            self.assertEqual(json.loads(self.codec.dumps(items)), items)
+
+
+@unittest.skipUnless(installed('ujson'), 'ujson is not installed')
+class TestUjsonCodec(CodecTests, unittest.TestCase):
+    codec_name = 'ujson'
+
+
+class TestGetCodec(unittest.TestCase):
+    def test_prefers_the_fastest_installed_codec(self) -> None:
+        expected = next(name for name in CODECS if name == 'json' or installed(name))
+        self.assertEqual(get_codec().name, expected)
+        self.assertEqual(get_codec('auto').name, expected)
+        self.assertIsInstance(get_codec('json'), JSONCodec)
+
+    def test_unknown_or_missing_codec(self) -> None:
+        with self.assertRaises(DataServerError):
+            get_codec('simdjson')
+        for name in CODECS:
+            if not installed(name):
+                with self.assertRaises(DataServerError):
+                    get_codec(name)
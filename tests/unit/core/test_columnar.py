@@ -0,0 +1,68 @@
+import unittest
+
+from data_server.core.columnar import ColumnarCollection, column_values
+from data_server.core.data_controller import DataController
+
+
+def make_collection() -> ColumnarCollection:
+    return ColumnarCollection.from_rows(
+        ['id', 'author', 'title'],
+        [
+            ['12', 'Mark Mason', 'Professional Python'],
+            ['1', 'Kobby Owen', 'Advanced Python'],
+            [],
+            ['2', 'Pius Lins'],
+            ['15', 'Kobby Owen', 'Everything about Python', 'extra'],
+        ],
+    )
+
+
+class TestColumnarCollection(unittest.TestCase):
+    def test_from_rows(self) -> None:
+        collection = make_collection()
+        self.assertEqual(len(collection), 4)
+        self.assertDictEqual(collection[0], {'id': '12', 'author': 'Mark Mason', 'title': 'Professional Python'})
+        self.assertDictEqual(collection[2], {'id': '2', 'author': 'Pius Lins', 'title': None})
+        self.assertDictEqual(collection[-1], {'id': '15', 'author': 'Kobby Owen', 'title': 'Everything about Python'})
+
+    def test_derived_collections_share_columns(self) -> None:
+        collection = make_collection()
+        appended = collection + [{'id': '20', 'author': 'New Author'}]
+        removed = collection[:1] + collection[2:]
+        replaced = collection.copy()
+        replaced[1] = {'id': '1', 'title': 'Replaced'}
+        for derived in (appended, removed, replaced):
+            self.assertIs(derived.columns, collection.columns)
+        self.assertEqual(len(collection), 4)
+        self.assertEqual(collection[1]['title'], 'Advanced Python')
+        self.assertDictEqual(appended[4], {'id': '20', 'author': 'New Author'})
+        self.assertListEqual([item['id'] for item in removed], ['12', '2', '15'])
+        self.assertDictEqual(replaced[1], {'id': '1', 'title': 'Replaced'})
+        self.assertEqual(appended, list(appended))
+
+    def test_column_values_and_filter(self) -> None:
+        collection = make_collection().copy()
+        collection[0] = {'id': '12', 'author': 'Kobby Owen'}
+        self.assertListEqual(
+            column_values(collection, 'title', 'none'), ['none', 'Advanced Python', None, 'Everything about Python']
+        )
+        self.assertListEqual(column_values(collection, 'missing'), [None] * 4)
+        self.assertListEqual([item['id'] for item in collection.filter(author='Kobby Owen')], ['12', '1', '15'])
+        self.assertEqual(collection.index_of('id', '2'), 2)
+        self.assertIsNone(collection.index_of('id', '3'))
+
+
+class TestColumnarCollectionInController(unittest.TestCase):
+    def test_controller_operations(self) -> None:
+        data = {'books': make_collection()}
+        controller = DataController(data, autogenerate_id=True)
+        self.assertListEqual([item['id'] for item in controller.get_items(['books'])], ['1', '12', '15', '2'])
+        self.assertEqual(controller.get_item(['books'], '15')['title'], 'Everything about Python')
+        controller.patch_item(['books'], '12', {'title': 'Patched'})
+        controller.delete_item(['books'], '1')
+        added = controller.add_item(['books'], {'author': 'Kobby Owen', 'title': 'Added'})
+        self.assertIsInstance(data['books'], ColumnarCollection)
+        self.assertEqual(controller.get_item(['books'], '12')['title'], 'Patched')
+        items = controller.get_items(['books'], author='Kobby Owen', sort_by='title')
+        self.assertListEqual([item['title'] for item in items], ['Added', 'Everything about Python'])
+        self.assertEqual(added['id'], controller.get_item(['books'], added['id'])['id'])
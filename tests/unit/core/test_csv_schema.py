@@ -0,0 +1,81 @@
+import json
+import tempfile
+import unittest
+
+from data_server.core.csv_schema import BOOL, INT, NULL, NUMBER, STR, CsvSchema
+
+FIELDNAMES = ['id', 'price', 'rating', 'active', 'code', 'note']
+ROWS = [
+    ['1', '9.5', '4', 'true', '007', ''],
+    ['2', '10.25', '4.5', 'false', '010', ''],
+    [],
+    ['3', '', '', 'true', '100'],
+]
+
+
+class TestCsvSchema(unittest.TestCase):
+    def test_infers_types_that_write_every_cell_back(self) -> None:
+        schema = CsvSchema()
+        columns = schema.read_columns(FIELDNAMES, ROWS)
+        self.assertEqual(schema.types['id'], INT)
+        self.assertEqual(schema.types['price'].name, 'float')
+        self.assertEqual(schema.types['rating'], NUMBER)
+        self.assertEqual(schema.types['active'].name, 'bool')
+        self.assertEqual(schema.types['note'], NULL)
+        self.assertNotIn('code', schema.types)
+        self.assertListEqual(columns[0], [1, 2, 3])
+        self.assertListEqual(columns[1], [9.5, 10.25, None])
+        self.assertListEqual(columns[2], [4, 4.5, None])
+        self.assertListEqual(columns[3], [True, False, True])
+        self.assertListEqual(columns[4], ['007', '010', '100'])
+        self.assertListEqual(columns[5], [None, None, None])
+        rows = [dict(zip(FIELDNAMES, row)) for row in zip(*columns)]
+        written = [list(schema.format_row(row).values()) for row in rows]
+        self.assertListEqual(written[0], ['1', '9.5', '4', 'true', '007', ''])
+        self.assertListEqual(written[1], ['2', '10.25', '4.5', 'false', '010', ''])
+        self.assertListEqual(written[2], ['3', None, None, 'true', '100', ''])
+
+    def test_rejects_types_that_change_cells(self) -> None:
+        schema = CsvSchema()
+        schema.read_columns(['a', 'b', 'c', 'd'], [['1.50', '1e3', '+1', 'nan'], ['2', '2', '2', '2']])
+        self.assertDictEqual(schema.types, {})
+
+    def test_columns_that_do_not_fit_the_sample_stay_strings(self) -> None:
+        schema = CsvSchema()
+        columns = schema.read_columns(['id', 'size'], [['1', '10'], ['2', 'XL'], ['3', '12']], sample_size=1)
+        self.assertDictEqual(schema.types, {'id': INT})
+        self.assertListEqual(columns[1], ['10', 'XL', '12'])
+
+    def test_schema_file_overrides_inference(self) -> None:
+        with tempfile.NamedTemporaryFile('w', suffix='.json') as schema_file:
+            json.dump({'id': 'str', 'rating': 'float', 'active': 'bool'}, schema_file)
+            schema_file.flush()
+            schema = CsvSchema.from_file(schema_file.name)
+            columns = schema.read_columns(['id', 'rating', 'active'], [['1', '4', 'yes'], ['2', '4.5', 'FALSE']])
+            self.assertListEqual(columns, [['1', '2'], [4.0, 4.5], [True, False]])
+            self.assertEqual(schema.types['id'], STR)
+            self.assertEqual(schema.types['active'], BOOL)
+            self.assertEqual(schema.format_row({'active': True, 'rating': 4.0}), {'active': 'true', 'rating': '4.0'})
+
+            schema = CsvSchema.from_file(schema_file.name, infer=False)
+            with self.assertRaises(ValueError):
+                schema.read_columns(['active'], [['maybe']])
+
+            schema_file.seek(0)
+            schema_file.truncate()
+            json.dump({'id': 'uuid'}, schema_file)
+            schema_file.flush()
+            with self.assertRaises(ValueError):
+                CsvSchema.from_file(schema_file.name)
+
+    def test_parse_value(self) -> None:
+        schema = CsvSchema({'age': INT, 'active': BOOL})
+        self.assertEqual(schema.parse_value('age', '30'), 30)
+        self.assertEqual(schema.parse_value('age', 'thirty'), 'thirty')
+        self.assertIsNone(schema.parse_value('age', ''))
+        self.assertIs(schema.parse_value('active', 'true'), True)
+        self.assertEqual(schema.parse_value('name', '30'), '30')
+
+    def test_values_of_another_type_are_not_formatted(self) -> None:
+        schema = CsvSchema({'age': INT, 'active': BOOL})
+        self.assertDictEqual(schema.format_row({'age': 'unknown', 'active': 1}), {'age': 'unknown', 'active': 1})
@@ -4,6 +4,7 @@ from copy import deepcopy
 from unittest.mock import MagicMock, patch
 
 import data_server.data_server_types as dt
+from data_server.core.columnar import ColumnarCollection
 from data_server.core.data_controller import DataController
 from data_server.errors import DataControllerError, DuplicateIDFoundError, ItemNotFoundError
 
@@ -92,6 +93,13 @@ class TestGetItems(unittest.TestCase):
         self.assertEqual(items[len(items) - 1]['title'], 'Advanced Python')
         self.assertEqual(items[0]['title'], 'Python In A Nutshell')
 
+    def test_get_items_sorted_by_field_with_missing_values(self) -> None:
+        data = {'books': [{'id': 1, 'year': None}, {'id': 2, 'year': 2001}, {'id': 3, 'year': 1999}]}
+        items = DataController(data).get_items(['books'], sort_by='year')
+        self.assertListEqual([item['id'] for item in items], [3, 2, 1])
+        items = DataController(data).get_items(['books'], sort_by='year', order='desc')
+        self.assertListEqual([item['id'] for item in items], [1, 2, 3])
+
     def test_get_items_with_page_and_size(self) -> None:
         items = DataController(data_sample).get_items(['books'], page=0, size=2)
         self.assertEqual(len(items), 2)
@@ -421,6 +429,109 @@ class TestFixData(unittest.TestCase):
             self.assertNotIn('created_at', book)
             self.assertNotIn('updated_at', book)
 
+    def test_columnar_collections_cannot_be_fixed(self) -> None:
+        data = {'shelf': {'books': ColumnarCollection.from_rows(['id', 'title'], [['', 'Emma']])}}
+        with self.assertRaisesRegex(DataControllerError, "'books'"):
+            DataController(data, fix=True)
+
+
+class TestVersionedSnapshots(unittest.TestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.data = deepcopy(data_sample)
+
+    def test_writes_do_not_mutate_previous_versions(self) -> None:
+        controller = DataController(self.data)
+        old_books = self.data['books']
+        old_item = controller.get_item(['books'], 1)
+        controller.patch_item(['books'], 1, {'title': 'Python In 30 Days'})
+        controller.replace_item(['books'], 2, {'title': 'Python In 60 Days'})
+        controller.delete_item(['books'], 3)
+        controller.add_item(['books'], {'id': 100, 'title': 'Python In 90 Days'})
+        self.assertListEqual(old_books, data_sample['books'])
+        self.assertDictEqual(old_item, {'id': 1, 'author': 'Kobby Owen', 'title': 'Advanced Python'})
+        self.assertIsNot(self.data['books'], old_books)
+        self.assertEqual(controller.get_item(['books'], 1)['title'], 'Python In 30 Days')
+        self.assertIs(controller.get_item(['books'], 12), old_books[0])
+
+    def test_snapshot_is_unaffected_by_later_writes(self) -> None:
+        controller = DataController(self.data)
+        snapshot = controller.snapshot()
+        controller.delete_item(['books'], 1)
+        self.assertEqual(controller.version, snapshot.version + 1)
+        self.assertEqual(len(snapshot.data['books']), len(data_sample['books']))
+        self.assertEqual(len(controller.snapshot().data['books']), len(data_sample['books']) - 1)
+
+    def test_nested_writes_copy_only_the_changed_path(self) -> None:
+        data = {'posts': {'comments': {'all': [{'id': 1, 'userId': 20}]}, 'tags': []}}
+        controller = DataController(data)
+        old_posts = data['posts']
+        controller.patch_item(['posts', 'comments', 'all'], 1, {'userId': 30})
+        self.assertEqual(old_posts['comments']['all'][0]['userId'], 20)
+        self.assertEqual(data['posts']['comments']['all'][0]['userId'], 30)
+        self.assertIs(data['posts']['tags'], old_posts['tags'])
+
+    def test_apply_changes(self) -> None:
+        data = {'books': [{'id': 1}, {'id': 2, 'title': 'Emma'}, {'id': 3}]}
+        controller = DataController(data)
+        third = data['books'][2]
+        controller.apply_changes(
+            ['books'],
+            [
+                dt.Change(dt.ChangeType.DELETE, ['books'], None, None, {'id': 1}, persisted=True),
+                dt.Change(dt.ChangeType.DELETE, ['books'], None, None, {'id': 4}, persisted=True),
+                dt.Change(dt.ChangeType.UPDATE, ['books'], None, None, {'id': 2, 'title': 'Dracula'}, persisted=True),
+                dt.Change(dt.ChangeType.ADD, ['books'], None, None, {'id': 1, 'title': 'Ulysses'}, persisted=True),
+            ],
+        )
+        self.assertEqual(data['books'], [{'id': 2, 'title': 'Dracula'}, {'id': 3}, {'id': 1, 'title': 'Ulysses'}])
+        self.assertIs(data['books'][1], third)
+        self.assertEqual(controller.version, 1)
+        self.assertEqual(controller.changed_collections(0), set())
+
+    def test_changed_collections(self) -> None:
+        data = {'books': [{'id': 1}], 'settings': [{'id': 1}], 'shelf': {'tags': [{'id': 1}]}}
+        controller = DataController(data)
+        self.assertEqual(controller.changed_collections(0), set())
+        controller.patch_item(['settings'], 1, {'theme': 'dark'})
+        version = controller.version
+        controller.add_item(['shelf', 'tags'], {'id': 2})
+        controller.apply_change(dt.Change(dt.ChangeType.DELETE, ['books'], None, None, {'id': 1}, persisted=True))
+        self.assertEqual(controller.changed_collections(0), {'settings', 'shelf'})
+        self.assertEqual(controller.changed_collections(version), {'shelf'})
+
+
+class TestNamedSnapshots(unittest.TestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.data = deepcopy(data_sample)
+
+    def test_restore_snapshot(self) -> None:
+        controller = DataController(self.data, autogenerate_id=True)
+        controller.create_snapshot('clean')
+        controller.add_item(['books'], {'title': 'Python In 30 Days'})
+        controller.patch_item(['books'], 1, {'title': 'Python In 60 Days'})
+        controller.delete_item(['books'], 2)
+        controller.restore_snapshot('clean')
+        self.assertDictEqual(self.data, data_sample)
+        controller.delete_item(['books'], 2)
+        controller.restore_snapshot('clean')
+        self.assertDictEqual(self.data, data_sample)
+
+    def test_restore_snapshot_that_does_not_exist(self) -> None:
+        controller = DataController(self.data)
+        with self.assertRaises(ItemNotFoundError):
+            controller.restore_snapshot('clean')
+
+    def test_delete_snapshot(self) -> None:
+        controller = DataController(self.data)
+        controller.create_snapshot('clean')
+        self.assertListEqual(list(controller.get_snapshots()), ['clean'])
+        controller.delete_snapshot('clean')
+        self.assertDictEqual(controller.get_snapshots(), {})
+        with self.assertRaises(ItemNotFoundError):
+            controller.delete_snapshot('clean')
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -2,6 +2,7 @@ import typing as t
 from unittest import TestCase
 from unittest.mock import patch
 
+import data_server.data_server_types as dt
 from data_server.core.data_router import DataRouter
 from data_server.errors import ItemNotFoundError
 
@@ -11,15 +12,21 @@ class TestDataRouterInitialization(TestCase):
         adapter_patcher = patch('data_server.core.data_router.DataAdapter')
         csv_patcher = patch('data_server.core.data_router.CsvAdapter')
         json_adapter = patch('data_server.core.data_router.JSONAdapter')
+        sqlite_patcher = patch('data_server.core.data_router.SQLiteAdapter')
+        json_lines_patcher = patch('data_server.core.data_router.JSONLinesAdapter')
         self.adapter_mock = adapter_patcher.start()
         self.csv_adapter_mock = csv_patcher.start()
         self.json_adapter_mock = json_adapter.start()
+        self.sqlite_adapter_mock = sqlite_patcher.start()
+        self.json_lines_adapter_mock = json_lines_patcher.start()
         super().setUp()
 
     def tearDown(self) -> None:
         self.adapter_mock.stop()
         self.csv_adapter_mock.stop()
         self.json_adapter_mock.stop()
+        self.sqlite_adapter_mock.stop()
+        self.json_lines_adapter_mock.stop()
         super().tearDown()
 
     def test_initialization_with_dictionary(self) -> None:
@@ -37,6 +44,42 @@ class TestDataRouterInitialization(TestCase):
         self.assertTrue(self.csv_adapter_mock.called)
         self.assertEqual(router.resource_type, 'csv')
 
+    def test_initialization_with_directory(self) -> None:
+        with patch('data_server.core.data_router.DirectoryAdapter') as directory_adapter_mock:
+            router = DataRouter('.', csv_options={'columnar': True})
+        directory_adapter_mock.assert_called_with('.', csv_options={'columnar': True})
+        self.assertEqual(router.resource_type, 'directory')
+
+    def test_initialization_with_json_lines_file(self) -> None:
+        router = DataRouter('testfile.ndjson', json_options={'lazy': True})
+        self.json_lines_adapter_mock.assert_called_with('testfile.ndjson')
+        self.assertEqual(router.resource_type, 'jsonl')
+
+    def test_initialization_with_sqlite_file(self) -> None:
+        router = DataRouter('testfile.db', json_options={'lazy': True})
+        self.sqlite_adapter_mock.assert_called_with('testfile.db')
+        self.assertEqual(router.resource_type, 'sqlite')
+        router = DataRouter('testfile.data', resource_type=dt.ResourceType.SQLITE_FILE)
+        self.assertEqual(router.resource_type, 'sqlite')
+        DataRouter('testfile.db', sqlite_options={'wal_mode': True})
+        self.sqlite_adapter_mock.assert_called_with('testfile.db', wal_mode=True)
+
+    def test_initialization_with_csv_options(self) -> None:
+        DataRouter('testfile.csv', csv_options={'columnar': True}, id_name='key')
+        self.csv_adapter_mock.assert_called_with('testfile.csv', columnar=True, id_name='key')
+        DataRouter('testfile.json', csv_options={'columnar': True}, id_name='key')
+        self.json_adapter_mock.assert_called_with('testfile.json', id_name='key')
+
+    def test_write_behind_persistence(self) -> None:
+        router = DataRouter('testfile.json', flush_interval=60)
+        adapter = self.json_adapter_mock.return_value
+        adapter.get_urls.return_value = ['/books']
+        router('DELETE', '/books/1')
+        router('DELETE', '/books/2')
+        self.assertFalse(adapter.save_data.called)
+        router.close()
+        adapter.save_data.assert_called_once()
+
     def test_initialization_with_invalid_resource_type(self) -> None:
         router = DataRouter('unknown-file')
         self.assertEqual(router.resource_type, 'json')
@@ -232,3 +275,40 @@ class TestDataRouter(TestCase):
         data = {'name': 'new-data'}
         with self.assertRaises(ValueError):
             router(method='unknown-method', url='/posts/1', data=data)
+
+
+class TestDataRouterSnapshotRequest(TestCase):
+    def setUp(self) -> None:
+        json_adapter = patch('data_server.core.data_router.JSONAdapter')
+        self.json_adapter_mock = json_adapter.start()
+        self.json_adapter_mocked_instance = self.json_adapter_mock.return_value
+        self.json_adapter_mocked_instance.create_snapshot.return_value = 3
+        self.json_adapter_mocked_instance.restore_snapshot.return_value = 5
+        self.json_adapter_mocked_instance.get_snapshots.return_value = {'clean': 3}
+        super().setUp()
+
+    def test_create_snapshot(self) -> None:
+        router = DataRouter('testfile.json')
+        result = router(method='post', url='/__admin/snapshots/clean')
+        self.assertDictEqual(t.cast(t.Any, result), {'name': 'clean', 'version': 3})
+        self.json_adapter_mocked_instance.create_snapshot.assert_called_with('clean')
+
+    def test_restore_snapshot(self) -> None:
+        router = DataRouter('testfile.json')
+        result = router(method='put', url='/__admin/snapshots/clean')
+        self.assertDictEqual(t.cast(t.Any, result), {'name': 'clean', 'version': 5})
+        self.json_adapter_mocked_instance.restore_snapshot.assert_called_with('clean')
+        self.assertTrue(self.json_adapter_mocked_instance.save_data.called)
+
+    def test_list_and_delete_snapshots(self) -> None:
+        router = DataRouter('testfile.json')
+        result = router(method='get', url='/__admin/snapshots')
+        self.assertListEqual(t.cast(t.Any, result), [{'name': 'clean', 'version': 3}])
+        router(method='delete', url='/__admin/snapshots/clean')
+        self.json_adapter_mocked_instance.delete_snapshot.assert_called_with('clean')
+        with self.assertRaises(ValueError):
+            router(method='post', url='/__admin/snapshots')
+
+    def tearDown(self) -> None:
+        self.json_adapter_mock.stop()
+        super().tearDown()
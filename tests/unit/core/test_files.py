@@ -0,0 +1,63 @@
+import gzip
+import lzma
+import os
+import stat
+import tempfile
+import unittest
+
+from data_server.core.files import atomic_write, atomic_write_bytes, open_text, strip_compression
+
+
+class TestAtomicWrite(unittest.TestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.path = os.path.join(self.directory.name, 'data.json')
+        with open(self.path, 'w') as data_file:
+            data_file.write('old')
+        os.chmod(self.path, 0o644)
+
+    def read(self) -> str:
+        with open(self.path) as data_file:
+            return data_file.read()
+
+    def test_replaces_the_file_with_bytes(self) -> None:
+        with atomic_write_bytes(self.path) as data_file:
+            data_file.write(b'new')
+        self.assertEqual(self.read(), 'new')
+
+    def test_replaces_the_file(self) -> None:
+        with atomic_write(self.path, fsync=True) as data_file:
+            data_file.write('new')
+            self.assertEqual(self.read(), 'old')
+        self.assertEqual(self.read(), 'new')
+        self.assertEqual(stat.S_IMODE(os.stat(self.path).st_mode), 0o644)
+        self.assertListEqual(os.listdir(self.directory.name), ['data.json'])
+
+    def test_failed_write_keeps_the_old_file(self) -> None:
+        with self.assertRaises(RuntimeError):
+            with atomic_write(self.path) as data_file:
+                data_file.write('partial')
+                raise RuntimeError('killed')
+        self.assertEqual(self.read(), 'old')
+        self.assertListEqual(os.listdir(self.directory.name), ['data.json'])
+
+    def test_creates_missing_files(self) -> None:
+        path = os.path.join(self.directory.name, 'new.csv')
+        with atomic_write(path, newline='') as data_file:
+            data_file.write('id\r\n')
+        with open(path, newline='') as data_file:
+            self.assertEqual(data_file.read(), 'id\r\n')
+
+    def test_compresses_by_suffix(self) -> None:
+        for path, module in [('data.json.gz', gzip), ('data.json.xz', lzma)]:
+            path = os.path.join(self.directory.name, path)
+            with atomic_write(path, compression_level=1) as data_file:
+                data_file.write('new')
+            with module.open(path, 'rt') as data_file:
+                self.assertEqual(data_file.read(), 'new')
+            with open_text(path) as data_file:
+                self.assertEqual(data_file.read(), 'new')
+        self.assertEqual(strip_compression('data.csv.bz2'), 'data.csv')
+        self.assertEqual(strip_compression('data.csv'), 'data.csv')
@@ -0,0 +1,122 @@
+import json
+import os
+import tempfile
+import time
+import unittest
+
+import data_server.data_server_types as dt
+from data_server.core.adapters.csv_adapter import CsvAdapter
+from data_server.core.adapters.json_adapter import JSONAdapter
+from data_server.core.hot_reload import FileWatcher, diff_data
+from data_server.errors import JSONAdapterError
+
+
+class TestDiffData(unittest.TestCase):
+    def test_items_are_diffed_by_id(self) -> None:
+        current = {'books': [{'id': 1, 'title': 'Emma'}, {'id': 2}, {'id': 3}], 'count': 3, 'old': {}}
+        new = {'books': [{'id': 3}, {'id': 1, 'title': 'Ulysses'}, {'id': 4}], 'count': 3, 'settings': {}}
+        changes = diff_data(current, new, 'id')
+        self.assertEqual(
+            [(change.type, change.path, change.item or change.current) for change in changes],
+            [
+                (dt.ChangeType.RESET, ['old'], None),
+                (dt.ChangeType.DELETE, ['books'], {'id': 2}),
+                (dt.ChangeType.UPDATE, ['books'], {'id': 1, 'title': 'Ulysses'}),
+                (dt.ChangeType.ADD, ['books'], {'id': 4}),
+                (dt.ChangeType.RESET, ['settings'], {}),
+            ],
+        )
+        self.assertTrue(all(change.persisted for change in changes))
+
+    def test_collections_without_unique_ids_are_replaced(self) -> None:
+        for items in [[{'id': 1}, {'id': 1}], [{'title': 'Emma'}], ['Emma']]:
+            changes = diff_data({'books': [{'id': 1}]}, {'books': items}, 'id')
+            self.assertEqual([(change.type, change.current) for change in changes], [(dt.ChangeType.RESET, items)])
+        self.assertEqual(diff_data({'books': [{'id': 1}]}, {'books': [{'id': 1}]}, 'id'), [])
+
+
+class TestFileWatcher(unittest.TestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.path = os.path.join(self.directory.name, 'books.json')
+        self.write({'books': [{'id': 1, 'title': 'Emma'}, {'id': 2, 'title': 'Dracula'}]})
+
+    def write(self, data: dt.JSONItem) -> None:
+        with open(self.path, 'w') as json_file:
+            json.dump(data, json_file)
+
+    def test_changed_paths(self) -> None:
+        watcher = FileWatcher([self.path], lambda: None, interval=60)
+        self.addCleanup(watcher.close)
+        self.assertEqual(watcher.changed_paths(), [])
+        self.write({'books': []})
+        self.assertEqual(watcher.changed_paths(), [self.path])
+        self.assertEqual(watcher.changed_paths(), [])
+        os.remove(self.path)
+        self.assertEqual(watcher.changed_paths(), [])
+        self.write({})
+        watcher.mark_current()
+        self.assertEqual(watcher.changed_paths(), [])
+
+    def test_adapter_applies_external_changes(self) -> None:
+        adapter = JSONAdapter(self.path, watch_interval=60)
+        self.addCleanup(adapter.close)
+        emma = adapter.get_data()['books'][0]
+        adapter.execute_post_request('/books', {'id': 3, 'title': 'Ulysses'})
+        adapter.save_data()
+        # a save of the adapter itself is not reloaded
+        adapter._reload_changed_files()
+        self.assertEqual(adapter._controller.version, 1)
+        self.write({'books': [{'id': 1, 'title': 'Emma'}, {'id': 3, 'title': 'Ulysses', 'year': 1922}], 'tags': []})
+        adapter._reload_changed_files()
+        books = adapter.get_data()['books']
+        self.assertEqual(books, [{'id': 1, 'title': 'Emma'}, {'id': 3, 'title': 'Ulysses', 'year': 1922}])
+        # unchanged items are kept
+        self.assertIs(books[0], emma)
+        self.assertEqual(adapter.get_urls(), ['/books', '/tags'])
+
+    def test_reloaded_collections_are_published_once(self) -> None:
+        books = [{'id': id, 'title': 'Emma'} for id in range(20000)]
+        self.write({'books': books})
+        adapter = JSONAdapter(self.path, watch_interval=60)
+        self.addCleanup(adapter.close)
+        kept = adapter.get_data()['books'][-1]
+        self.write({'books': [{**book, 'title': 'Ulysses'} if book['id'] < 5000 else book for book in books[1:]]})
+        adapter._reload_changed_files()
+        reloaded = adapter.get_data()['books']
+        self.assertEqual(adapter._controller.version, 1)
+        self.assertEqual(len(reloaded), 19999)
+        self.assertEqual(reloaded[0], {'id': 1, 'title': 'Ulysses'})
+        self.assertIs(reloaded[-1], kept)
+        # a collection with mostly changed items is replaced as a whole
+        self.write({'books': [{**book, 'title': 'Dracula'} for book in books]})
+        adapter._reload_changed_files()
+        self.assertEqual(adapter._controller.version, 2)
+        self.assertEqual(adapter.get_data()['books'][-1], {'id': 19999, 'title': 'Dracula'})
+
+    def test_adapter_polls_in_the_background(self) -> None:
+        adapter = JSONAdapter(self.path, watch_interval=0.01)
+        self.addCleanup(adapter.close)
+        self.write({'books': [{'id': 1, 'title': 'Persuasion'}]})
+        deadline = time.monotonic() + 5
+        while adapter.get_data()['books'][0]['title'] != 'Persuasion' and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(adapter.get_data(), {'books': [{'id': 1, 'title': 'Persuasion'}]})
+
+    def test_reloaded_changes_are_not_saved_again(self) -> None:
+        path = os.path.join(self.directory.name, 'books.csv')
+        with open(path, 'w', newline='') as csv_file:
+            csv_file.write('id,title\r\n1,Emma\r\n')
+        adapter = CsvAdapter(path, watch_interval=60)
+        self.addCleanup(adapter.close)
+        with open(path, 'a', newline='') as csv_file:
+            csv_file.write('2,Dracula\r\n')
+        adapter._reload_changed_files()
+        self.assertEqual(adapter.execute_get_item_request('/books', '2'), {'id': '2', 'title': 'Dracula'})
+        self.assertEqual(adapter._unsaved_changes, [])
+
+    def test_lazy_files_cannot_be_watched(self) -> None:
+        with self.assertRaises(JSONAdapterError):
+            JSONAdapter(self.path, lazy=True, watch_interval=1)
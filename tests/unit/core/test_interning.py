@@ -0,0 +1,49 @@
+import json
+import unittest
+
+from data_server.core.interning import StringInterner
+
+
+class TestStringInterner(unittest.TestCase):
+    def test_repeated_strings_share_one_object(self) -> None:
+        interner = StringInterner()
+        first = interner.intern(''.join(['act', 'ive']))
+        second = interner.intern(''.join(['act', 'ive']))
+        self.assertIs(first, second)
+        self.assertEqual(interner.interned_count, 1)
+        self.assertGreater(interner.saved_bytes, 0)
+
+    def test_long_strings_and_other_values_are_not_pooled(self) -> None:
+        interner = StringInterner(max_length=4)
+        value = 'x' * 5
+        self.assertIs(interner.intern(value), value)
+        self.assertIs(interner.intern(1000), 1000)
+        self.assertIs(interner.intern(None), None)
+        self.assertEqual(interner.interned_count, 0)
+
+    def test_pool_stops_growing_at_max_strings(self) -> None:
+        interner = StringInterner(max_strings=1)
+        kept = interner.intern(''.join(['U', 'S']))
+        self.assertIs(interner.intern(''.join(['U', 'S'])), kept)
+        new_value = ''.join(['G', 'H'])
+        self.assertIs(interner.intern(new_value), new_value)
+        self.assertIsNot(interner.intern(''.join(['G', 'H'])), new_value)
+
+    def test_json_and_csv_hooks(self) -> None:
+        interner = StringInterner()
+        items = json.loads(
+            '[{"status": "open", "tags": {"country": "GH"}}, {"status": "open", "tags": {"country": "GH"}}]',
+            object_pairs_hook=interner.intern_pairs,
+        )
+        self.assertIs(items[0]['status'], items[1]['status'])
+        self.assertIs(items[0]['tags']['country'], items[1]['tags']['country'])
+        rows = list(interner.intern_rows([['1', ''.join(['op', 'en'])], ['2', ''.join(['op', 'en'])]]))
+        self.assertIs(rows[0][1], rows[1][1])
+        self.assertIs(rows[0][1], items[0]['status'])
+
+    def test_report(self) -> None:
+        interner = StringInterner()
+        interner.intern_rows([['a'], ['a']])
+        with self.assertLogs('data_server', 'INFO') as logs:
+            interner.report('data.csv')
+        self.assertIn('data.csv', logs.output[0])
@@ -0,0 +1,85 @@
+import io
+import json
+import os
+import tempfile
+import unittest
+import unittest.mock as mock
+from copy import deepcopy
+
+from data_server.core.adapters.json_adapter import JSONAdapter
+from data_server.core.codec import get_codec
+from data_server.core.json_segments import SegmentedJSONWriter
+from data_server.core.records import RecordCompactor
+
+
+class TestSegmentedJSONWriter(unittest.TestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.path = os.path.join(self.directory.name, 'data.json')
+        self.data = {
+            'events': [{'id': 1, 'name': 'Café', 'tags': ['a', 'b']}, {'id': 2, 'nested': {'z': None, 'a': []}}],
+            'settings': {'theme': 'dark'},
+            'count': 2,
+            'empty': {},
+        }
+
+    def read(self) -> str:
+        with open(self.path, encoding='utf-8') as json_file:
+            return json_file.read()
+
+    def dumped(self, compact: bool) -> str:
+        output = io.StringIO()
+        get_codec('json').dump(self.data, output, compact=compact)
+        return output.getvalue()
+
+    def test_writes_like_the_codec(self) -> None:
+        for compact in [False, True]:
+            SegmentedJSONWriter(self.path, get_codec(), compact=compact).write(self.data)
+            self.assertEqual(self.read(), self.dumped(compact))
+        SegmentedJSONWriter(self.path, get_codec()).write({})
+        self.assertEqual(self.read(), '{}')
+
+    def test_unchanged_values_are_copied(self) -> None:
+        original = deepcopy(self.data)
+        for compact in [False, True]:
+            self.data = deepcopy(original)
+            writer = SegmentedJSONWriter(self.path, get_codec(), compact=compact)
+            self.assertEqual(writer.write(self.data), 4)
+            self.data['settings'] = {'theme': 'light'}
+            self.data['events'] = [RecordCompactor().compact({'id': 3})]
+            self.data.pop('empty')
+            # the changed events are not encoded, so the file still holds the previous ones
+            self.assertEqual(writer.write(self.data, {'settings', 'empty'}), 1)
+            written = json.loads(self.read())
+            self.assertEqual(written['settings'], {'theme': 'light'})
+            self.assertEqual(written['events'][0]['name'], 'Café')
+            self.assertEqual(writer.write(self.data, {'events'}), 1)
+            self.assertEqual(self.read(), self.dumped(compact))
+
+    def test_files_changed_by_others_are_encoded_again(self) -> None:
+        writer = SegmentedJSONWriter(self.path, get_codec())
+        writer.write(self.data)
+        with open(self.path, 'w') as json_file:
+            json_file.write('{"other": []}  ')
+        self.assertEqual(writer.write(self.data, set()), 4)
+        self.assertEqual(self.read(), self.dumped(False))
+
+
+class TestPartialSaves(unittest.TestCase):
+    def test_adapter_saves_only_changed_collections(self) -> None:
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'data.json')
+            with open(path, 'w') as json_file:
+                json.dump({'events': [{'id': 1}, {'id': 2}], 'settings': [{'id': 1, 'theme': 'dark'}]}, json_file)
+            adapter = JSONAdapter(path)
+            adapter.save_data()
+            adapter.execute_patch_request('/settings', 1, {'theme': 'light'})
+            writer = adapter._segment_writer
+            assert writer is not None
+            with mock.patch.object(writer, '_write_value', wraps=writer._write_value) as write_patch:
+                adapter.save_data()
+            write_patch.assert_called_once_with(mock.ANY, [{'id': 1, 'theme': 'light'}])
+            with open(path) as json_file:
+                self.assertEqual(json.load(json_file), adapter.get_data())
@@ -0,0 +1,54 @@
+import json
+import unittest
+from io import StringIO
+
+from data_server.core.json_stream import StreamingJSONLoader
+from data_server.core.records import CompactRecord, RecordCompactor
+
+DOCUMENTS = [
+    '{}',
+    '{"posts": []}',
+    ' { "posts" : [ 1 , 22, 333 ] , "count": 12345, "name": "a\\"b\\u00e9" } ',
+    '{"posts": [{"id": 1, "tags": ["a", "b"], "author": {"name": "x"}}, {"id": 2.5e3, "ok": true, "no": null}]}',
+    '{"nested": {"comments": {"all": [{"id": "1"}, {"id": "2"}]}, "empty": {}}, "list": [[1, 2], [], {}]}',
+    '[{"id": 1}, {"id": 2}]',
+    '"text"',
+    '-12.5',
+]
+
+
+class TestStreamingJSONLoader(unittest.TestCase):
+    def load(self, document: str, chunk_size: int = 1, **kwargs: object) -> object:
+        return StreamingJSONLoader(StringIO(document), chunk_size=chunk_size, **kwargs).load()  # type: ignore[arg-type]
+
+    def test_loads_the_same_values_as_json_load(self) -> None:
+        for document in DOCUMENTS:
+            for chunk_size in (1, 3, 1024):
+                with self.subTest(document=document, chunk_size=chunk_size):
+                    self.assertEqual(self.load(document, chunk_size), json.loads(document))
+
+    def test_invalid_documents(self) -> None:
+        for document in ['', '-', '{"a": 1', '{"a" 1}', '{a: 1}', '{"a": [1, 2}', '{"a": [1,]}', '{"a": 1} 2', '[1 2]']:
+            for chunk_size in (1, 1024):
+                with self.subTest(document=document, chunk_size=chunk_size):
+                    with self.assertRaises(json.JSONDecodeError):
+                        self.load(document, chunk_size)
+
+    def test_shares_keys_between_items(self) -> None:
+        first, second = self.load('{"posts": [{"title": "a"}, {"title": "b"}]}')['posts']  # type: ignore[index]
+        self.assertIs(next(iter(first)), next(iter(second)))
+
+    def test_passes_items_through_the_item_hook(self) -> None:
+        data = self.load('{"posts": [{"id": 1}, {"id": 2}], "user": {"id": 3}}', item_hook=RecordCompactor().compact)
+        posts = data['posts']  # type: ignore[index]
+        self.assertTrue(all(isinstance(post, CompactRecord) for post in posts))
+        self.assertListEqual([post['id'] for post in posts], [1, 2])
+        self.assertDictEqual(data['user'], {'id': 3})  # type: ignore[index]
+
+    def test_uses_the_object_pairs_hook(self) -> None:
+        data = self.load('{"posts": [{"id": 1}], "b": {"c": 2}}', object_pairs_hook=lambda pairs: dict(pairs[::-1]))
+        self.assertListEqual(list(data), ['b', 'posts'])  # type: ignore[arg-type]
+
+    def test_reads_values_larger_than_a_chunk(self) -> None:
+        document = json.dumps({'posts': [{'body': 'x' * 10_000, 'id': 123456789}]})
+        self.assertEqual(self.load(document, chunk_size=16), json.loads(document))
@@ -0,0 +1,79 @@
+import os
+import tempfile
+import typing as t
+import unittest
+
+from data_server.core.adapters.csv_adapter import CsvAdapter
+from data_server.core.csv_schema import CsvSchema
+from data_server.core.lazy_csv import LazyCsvCollection, LazyCsvFile
+
+CSV = (
+    'id,title,price\r\n1,Advanced Python,10\r\n\r\n2,"Python, In\r\n30 Days",12.5\r\n3,"Fluent ""Python""",\r\n4,Short'
+)
+
+
+class TestLazyCsvFile(unittest.TestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, 'books.csv')
+        with open(self.path, 'w', newline='', encoding='utf-8') as csv_file:
+            csv_file.write(CSV)
+
+    def load(self, schema: t.Optional[CsvSchema] = None) -> LazyCsvCollection:
+        source = LazyCsvFile(self.path, schema=schema)
+        self.addCleanup(source.close)
+        return source.load()
+
+    def test_load(self) -> None:
+        books = self.load()
+        self.assertListEqual(
+            list(books),
+            [
+                {'id': '1', 'title': 'Advanced Python', 'price': '10'},
+                {'id': '2', 'title': 'Python, In\r\n30 Days', 'price': '12.5'},
+                {'id': '3', 'title': 'Fluent "Python"', 'price': ''},
+                {'id': '4', 'title': 'Short', 'price': None},
+            ],
+        )
+        self.assertListEqual(books.source.fieldnames, ['id', 'title', 'price'])
+
+    def test_index_of(self) -> None:
+        books = self.load()
+        self.assertEqual(books.index_of('id', '3'), 2)
+        self.assertEqual(books.index_of('title', 'Short'), 3)
+        books = books[1:]
+        self.assertEqual(books.index_of('id', '3'), 1)
+        self.assertIsNone(books.index_of('id', '1'))
+
+    def test_encoded_items(self) -> None:
+        books = self.load().copy()
+        books[0] = {'id': '1', 'title': 'changed'}
+        self.assertListEqual(
+            list(books.encoded_items()),
+            [{'id': '1', 'title': 'changed'}, '2,"Python, In\r\n30 Days",12.5', '3,"Fluent ""Python""",', '4,Short'],
+        )
+
+    def test_types_are_inferred_from_a_sample(self) -> None:
+        books = self.load(CsvSchema())
+        self.assertEqual(books[0]['id'], 1)
+        self.assertEqual(books.index_of('id', 4), 3)
+        self.assertEqual(books[1]['price'], 12.5)
+
+    def test_ids_after_quoted_cells(self) -> None:
+        with open(self.path, 'w', newline='') as csv_file:
+            csv_file.write('title,id\n"Python, In 30 Days",1\nFluent Python,2\n\nShort\n"Advanced ""Python""",3\n')
+        books = self.load()
+        self.assertListEqual([book['id'] for book in books], ['1', '2', None, '3'])
+        self.assertEqual(books.index_of('id', '3'), 3)
+        self.assertEqual(books.rows_by_id, {'1': 0, '2': 1, '3': 3})
+
+    def test_files_that_end_with_empty_rows(self) -> None:
+        for contents in ['name,id\n\n', 'name,id\nEmma,1\n\n\r\n']:
+            with open(self.path, 'w', newline='') as csv_file:
+                csv_file.write(contents)
+            with self.subTest(contents=contents):
+                lazy = CsvAdapter(self.path, lazy=True)
+                self.addCleanup(lazy.close)
+                self.assertEqual(list(lazy.get_data()['books']), CsvAdapter(self.path).get_data()['books'])
@@ -0,0 +1,130 @@
+import io
+import json
+import os
+import tempfile
+import unittest
+
+from data_server.core.adapters.json_adapter import JSONAdapter
+from data_server.core.lazy_json import LazyJSONCollection, LazyJSONFile, dump
+from data_server.errors import JSONAdapterError
+
+DATA = {
+    'posts': [{'id': index, 'title': f'tïtle {index}', 'tags': ['a', 'b']} for index in range(1, 6)],
+    'users': {'name': 'café', 'comments': [{'id': 'x', 'text': '€'}], 'numbers': [1, 2], 'empty': []},
+    'count': 5,
+}
+
+
+class TestLazyJSONFile(unittest.TestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, 'data.json')
+        with open(self.path, 'w', encoding='utf-8') as data_file:
+            json.dump(DATA, data_file, indent=2, ensure_ascii=False)
+        self.source = LazyJSONFile(self.path, cache_size=2)
+        self.addCleanup(self.source.close)
+        self.data = self.source.load()
+
+    def test_load(self) -> None:
+        self.assertIsInstance(self.data['posts'], LazyJSONCollection)
+        self.assertIsInstance(self.data['users']['comments'], LazyJSONCollection)
+        self.assertEqual(self.data, DATA)
+
+    def test_index_of(self) -> None:
+        posts = self.data['posts']
+        self.assertEqual(posts.index_of('id', 3), 2)
+        self.assertEqual(posts.index_of('title', 'tïtle 4'), 3)
+        self.assertIsNone(posts.index_of('id', 10))
+        posts = posts[:1] + posts[2:]
+        self.assertEqual(posts.index_of('id', 3), 1)
+        self.assertIsNone(posts.index_of('id', 2))
+        posts = posts.copy()
+        posts[0] = {'id': 10}
+        self.assertEqual(posts.index_of('id', 10), 0)
+        self.assertIsNone(posts.index_of('id', 1))
+
+    def test_caches_the_last_items_that_were_looked_up(self) -> None:
+        posts = self.data['posts']
+        self.assertIs(posts[0], posts[0])
+        first = posts[0]
+        posts[1], posts[2]
+        self.assertIsNot(posts[0], first)
+        self.assertIsNot(next(iter(posts)), next(iter(posts)))
+
+    def test_dump(self) -> None:
+        posts = self.data['posts'].copy()
+        posts[1] = {'id': 2, 'title': 'changed'}
+        data = {**self.data, 'posts': posts + [{'id': 6}]}
+        output = io.StringIO()
+        dump(data, output)
+        self.assertEqual(json.loads(output.getvalue()), json.loads(json.dumps(data, default=list)))
+        output = io.StringIO()
+        dump(data, output, indent=None)
+        self.assertEqual(json.loads(output.getvalue()), json.loads(json.dumps(data, default=list)))
+        # only the unchanged items keep the whitespace of the file
+        self.assertIn('},{"id":2,"title":"changed"},{', output.getvalue())
+        self.assertIn('"numbers":[1,2]', output.getvalue())
+
+    def test_load_finds_ids_without_decoding_items(self) -> None:
+        items = [
+            {'title': 'a } in a string', 'id': 1},
+            {'note': 'an "id": 5 in a string', 'id': 2},
+            {'id': 3, 'nested': {'id': 30}},
+            {'text': 'escaped \\ and \\"', 'id': 4},
+            {'name': 'no id'},
+            {'\u00efd': 'ï', 'tags': ['id', '{']},
+        ]
+        for separators in [(',', ':'), (', ', ': ')]:
+            with open(self.path, 'w', encoding='utf-8') as data_file:
+                json.dump({'items': items}, data_file, separators=separators, ensure_ascii=False)
+            source = LazyJSONFile(self.path)
+            self.addCleanup(source.close)
+            with self.subTest(separators=separators):
+                data = source.load()
+                self.assertEqual(list(data['items']), items)
+                self.assertEqual(data['items'].rows_by_id, {1: 0, 2: 1, 3: 2, 4: 3})
+
+
+class TestJSONAdapterLazy(unittest.TestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, 'data.json')
+        with open(self.path, 'w', encoding='utf-8') as data_file:
+            json.dump(DATA, data_file)
+
+    def test_requests_and_saves(self) -> None:
+        adapter = JSONAdapter(self.path, lazy=True)
+        self.addCleanup(adapter.close)
+        self.assertDictEqual(adapter.execute_get_item_request('/posts', 3), DATA['posts'][2])
+        self.assertListEqual(adapter.execute_get_request('/posts', title='tïtle 2'), [DATA['posts'][1]])
+        adapter.execute_patch_request('/posts', 3, {'title': 'new'})
+        adapter.execute_delete_request('/posts', 1)
+        self.assertEqual(adapter.execute_get_item_request('/posts', 3)['title'], 'new')
+        adapter.save_data()
+        with open(self.path, encoding='utf-8') as data_file:
+            saved = json.load(data_file)
+        self.assertListEqual([post['id'] for post in saved['posts']], [2, 3, 4, 5])
+        self.assertEqual(saved['posts'][1]['title'], 'new')
+        self.assertDictEqual(saved['users'], DATA['users'])
+
+    def test_compact_saves(self) -> None:
+        adapter = JSONAdapter(self.path, lazy=True, compact_json=True)
+        self.addCleanup(adapter.close)
+        adapter.execute_patch_request('/posts', 3, {'title': 'new'})
+        adapter.save_data()
+        with open(self.path, encoding='utf-8') as data_file:
+            contents = data_file.read()
+        self.assertTrue(contents.startswith('{"posts":[{"id": 1, '), contents[:40])
+        self.assertEqual(json.loads(contents)['posts'][2]['title'], 'new')
+
+    def test_invalid_file(self) -> None:
+        for contents in ('', '{"posts": [{"id": 1}'):
+            with open(self.path, 'w') as data_file:
+                data_file.write(contents)
+            with self.subTest(contents=contents):
+                with self.assertRaises(JSONAdapterError):
+                    JSONAdapter(self.path, lazy=True)
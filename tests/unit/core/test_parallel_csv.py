@@ -0,0 +1,67 @@
+import csv
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from data_server.core.adapters.csv_adapter import CsvAdapter
+from data_server.core.columnar import ColumnarCollection
+from data_server.core.parallel_csv import read_csv_columns
+
+
+class TestReadCsvColumns(unittest.TestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.path = os.path.join(self.directory.name, 'books.csv')
+        rows = [['id', 'title', 'note']]
+        for index in range(1, 301):
+            note = f'line one\nline "{index}", two' if index % 7 == 0 else f'note {index}'
+            rows.append([str(index), f'Book {index}', note])
+        with open(self.path, 'w', newline='') as csv_file:
+            csv.writer(csv_file).writerows(rows)
+            # an empty row, a short row and a long row
+            csv_file.write('\r\n301\r\n302,Extra,note,x\r\n')
+
+    def read_sequentially(self) -> ColumnarCollection:
+        with open(self.path) as csv_file:
+            rows = csv.reader(csv_file)
+            return ColumnarCollection.from_rows(next(rows), rows)
+
+    def test_reads_like_a_single_reader(self) -> None:
+        expected = self.read_sequentially()
+        for workers in [1, 3, 8]:
+            fieldnames, columns = read_csv_columns(self.path, workers=workers, min_chunk_size=64)
+            self.assertEqual(fieldnames, ['id', 'title', 'note'])
+            self.assertEqual(columns, expected.columns)
+        self.assertEqual(columns[2][6], 'line one\nline "7", two')
+        self.assertEqual(columns[1][-2:], [None, 'Extra'])
+
+    def test_cells_with_the_separator_are_kept(self) -> None:
+        with open(self.path, 'w', newline='') as csv_file:
+            csv_file.write('id,name\r\n1,a\0b\r\n2,\r\n')
+        self.assertEqual(
+            read_csv_columns(self.path, workers=2, min_chunk_size=1), (['id', 'name'], [['1', '2'], ['a\0b', '']])
+        )
+
+    def test_files_without_rows(self) -> None:
+        with open(self.path, 'w') as csv_file:
+            csv_file.write('id,"multi\nline"\n')
+        self.assertEqual(read_csv_columns(self.path), (['id', 'multi\nline'], [[], []]))
+
+    def test_adapter_reads_in_parallel(self) -> None:
+        sequential = CsvAdapter(self.path, infer_types=True)
+        # files are only read in parallel when there is more than one cpu
+        cpu_count = mock.patch('data_server.core.adapters.csv_adapter.available_cpu_count', return_value=2)
+        read_parallel_rows = mock.patch.object(
+            CsvAdapter, '_read_parallel_rows', autospec=True, side_effect=CsvAdapter._read_parallel_rows
+        )
+        with cpu_count, read_parallel_rows as read:
+            parallel = CsvAdapter(self.path, infer_types=True, parallel_read_threshold=1)
+            columnar = CsvAdapter(self.path, columnar=True, intern_strings=True, parallel_read_threshold=1)
+        self.assertEqual(read.call_count, 2)
+        self.assertEqual(parallel.get_data(), sequential.get_data())
+        self.assertEqual(parallel.get_data()['books'][0], {'id': 1, 'title': 'Book 1', 'note': 'note 1'})
+        self.assertIsInstance(columnar.get_data()['books'], ColumnarCollection)
+        self.assertEqual(columnar.get_data(), CsvAdapter(self.path, columnar=True).get_data())
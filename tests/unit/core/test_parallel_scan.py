@@ -0,0 +1,141 @@
+import array
+import threading
+import unittest
+from multiprocessing import shared_memory
+from unittest.mock import patch
+
+from data_server.core.data_controller import DataController
+from data_server.core.parallel_scan import ParallelScanner, pack_column
+
+
+def make_items(count: int) -> list:
+    return [
+        {
+            'id': index,
+            'group': index % 7,
+            'name': f'name-{(index * 37) % 101}',
+            **({'rank': index % 5} if index % 3 else {}),
+        }
+        for index in range(count)
+    ]
+
+
+class TestParallelScanner(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        super().setUpClass()
+        # the pool is kept between scans, so it is started once for every test
+        cls.scanner = ParallelScanner(threshold=100, workers=4)
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        cls.scanner.close()
+        super().tearDownClass()
+
+    def setUp(self) -> None:
+        super().setUp()
+        self.items = make_items(500)
+
+    def test_can_scan(self) -> None:
+        self.assertTrue(self.scanner.can_scan(self.items))
+        self.assertFalse(self.scanner.can_scan(self.items[:99]))
+        self.assertFalse(ParallelScanner(threshold=0, workers=4).can_scan(self.items))
+        self.assertFalse(ParallelScanner(threshold=100, workers=1).can_scan(self.items))
+
+    def test_scan_matches_a_single_stable_sort(self) -> None:
+        for sort_key, reverse in [('id', False), ('name', False), ('name', True), ('rank', True), ('rank', False)]:
+            expected = sorted(
+                [item for item in self.items if item['group'] == 3],
+                key=lambda item, sort_key=sort_key: item.get(sort_key, -1),
+                reverse=reverse,
+            )
+            result = self.scanner.scan(self.items, {'group': 3}, sort_key, -1, reverse)
+            self.assertListEqual(result, expected)
+
+    def test_scan_with_limit(self) -> None:
+        result = self.scanner.scan(self.items, {}, 'name', -1, limit=10)
+        self.assertListEqual(result, sorted(self.items, key=lambda item: item['name'])[:10])
+
+    def test_columns_are_reused_for_the_same_collection(self) -> None:
+        self.scanner.scan(self.items, {'group': 1}, 'id', -1)
+        column_set = self.scanner._get_column_set(self.items)
+        self.assertIn(('filter', 'group'), column_set.columns)
+        self.assertIsNot(self.scanner._get_column_set(list(self.items)), column_set)
+
+    def test_scan_with_values_that_no_item_has(self) -> None:
+        self.assertListEqual(self.scanner.scan(self.items, {'name': 'Emma'}, 'id', -1), [])
+        self.assertListEqual(self.scanner.scan(self.items, {'group': 'Emma'}, 'id', -1), [])
+
+    def test_fields_that_cannot_be_packed_are_not_scanned(self) -> None:
+        items = [
+            {**item, 'tags': [item['group']], 'mixed': item['id'] if item['id'] % 2 else 'a'} for item in self.items
+        ]
+        self.assertIsNone(self.scanner.scan(items, {'tags': [1]}, 'id', -1))
+        self.assertIsNone(self.scanner.scan(items, {}, 'mixed', -1))
+        # filters do not need to order values
+        self.assertListEqual(self.scanner.scan(items, {'mixed': 'a'}, 'id', -1), items[::2])
+
+    def test_evicted_columns_are_freed(self) -> None:
+        scanner = ParallelScanner(threshold=100, workers=2, max_cached_collections=1)
+        self.addCleanup(scanner.close)
+        scanner.scan(self.items, {}, 'name', -1)
+        name = scanner._get_column_set(self.items).columns[('sort', 'name', '-1')].reference[0]
+        scanner.scan(list(self.items), {}, 'name', -1)
+        with self.assertRaises(FileNotFoundError):
+            shared_memory.SharedMemory(name)
+
+    def test_concurrent_scans_use_their_own_columns(self) -> None:
+        other_items = [{**item, 'group': item['group'] + 1} for item in self.items]
+        results = {}
+
+        def scan(name: str, items: list) -> None:
+            results[name] = self.scanner.scan(items, {'group': 3}, 'id', -1)
+
+        threads = [threading.Thread(target=scan, args=args) for args in [('items', self.items), ('other', other_items)]]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertListEqual(results['items'], [item for item in self.items if item['group'] == 3])
+        self.assertListEqual(results['other'], [item for item in other_items if item['group'] == 3])
+
+    def test_pack_column(self) -> None:
+        self.assertEqual(pack_column([1, 2, 3]), (array.array('q', [1, 2, 3]), None))
+        self.assertEqual(pack_column([0.5, 1.5]), (array.array('d', [0.5, 1.5]), None))
+        self.assertEqual(pack_column(['b', None, 'a', 'b']), (array.array('q', [1, 2, 0, 1]), ['a', 'b', None]))
+        self.assertEqual(pack_column([True, 1, 2**64]), (array.array('q', [0, 0, 1]), [True, 2**64]))
+        self.assertEqual(pack_column([]), (array.array('q'), []))
+        self.assertEqual(pack_column([2, 'a', 2], ordered=False), (array.array('q', [0, 1, 0]), [2, 'a']))
+        for values in [[1, 'a'], [[1]]]:
+            self.assertIsNone(pack_column(values))
+
+
+class TestParallelScanInController(unittest.TestCase):
+    def test_get_items_uses_parallel_scan_above_threshold(self) -> None:
+        data = {'items': make_items(300)}
+        serial = DataController(data)
+        parallel = DataController(data, parallel_scan_threshold=100, parallel_scan_workers=3)
+        self.addCleanup(parallel.close)
+        with patch.object(ParallelScanner, 'scan', wraps=parallel._parallel_scanner.scan) as scan_mock:
+            result = parallel.get_items(['items'], group=2, sort_by='name', order='desc', page=1, size=7)
+        self.assertTrue(scan_mock.called)
+        self.assertListEqual(result, serial.get_items(['items'], group=2, sort_by='name', order='desc', page=1, size=7))
+
+    def test_added_items_are_scanned_with_the_packed_columns(self) -> None:
+        data = {'items': make_items(300)}
+        serial = DataController(data)
+        parallel = DataController(data, parallel_scan_threshold=100, parallel_scan_workers=3)
+        self.addCleanup(parallel.close)
+        parallel.get_items(['items'], group=2, sort_by='name')
+        column_set = parallel._parallel_scanner._get_column_set(data['items'])
+        for id in range(300, 310):
+            parallel.add_item(['items'], {'id': id, 'group': 2, 'name': f'name-{id % 4}'})
+        self.assertIs(parallel._parallel_scanner._get_column_set(data['items']), column_set)
+        self.assertEqual(column_set.size, 300)
+        for order in ['asc', 'desc']:
+            self.assertListEqual(
+                parallel.get_items(['items'], group=2, sort_by='name', order=order, size=50),
+                serial.get_items(['items'], group=2, sort_by='name', order=order, size=50),
+            )
+        parallel.patch_item(['items'], 300, {'group': 3})
+        self.assertIsNot(parallel._parallel_scanner._get_column_set(data['items']), column_set)
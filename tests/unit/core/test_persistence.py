@@ -0,0 +1,81 @@
+import os
+import signal
+import threading
+import time
+import unittest
+
+from data_server.core.persistence import WriteBehindFlusher
+
+
+class SaveRecorder:
+    def __init__(self, fail_times: int = 0) -> None:
+        self.calls = 0
+        self.fail_times = fail_times
+        self.saved = threading.Event()
+
+    def __call__(self) -> None:
+        if self.fail_times:
+            self.fail_times -= 1
+            raise OSError('disk full')
+        self.calls += 1
+        self.saved.set()
+
+
+class TestWriteBehindFlusher(unittest.TestCase):
+    def test_changes_within_an_interval_are_saved_once(self) -> None:
+        save = SaveRecorder()
+        flusher = WriteBehindFlusher(save, interval=0.05)
+        for _ in range(10):
+            flusher.mark_dirty()
+        self.assertEqual(save.calls, 0)
+        self.assertTrue(save.saved.wait(2))
+        time.sleep(0.1)
+        self.assertEqual(save.calls, 1)
+        self.assertEqual(flusher.pending_changes, 0)
+        flusher.close()
+        self.assertEqual(save.calls, 1)
+
+    def test_saves_early_once_max_pending_changes_is_reached(self) -> None:
+        save = SaveRecorder()
+        flusher = WriteBehindFlusher(save, interval=60, max_pending_changes=3)
+        flusher.mark_dirty()
+        flusher.mark_dirty()
+        self.assertFalse(save.saved.wait(0.1))
+        flusher.mark_dirty()
+        self.assertTrue(save.saved.wait(2))
+        flusher.close()
+        self.assertEqual(save.calls, 1)
+
+    def test_close_saves_pending_changes(self) -> None:
+        save = SaveRecorder()
+        flusher = WriteBehindFlusher(save, interval=60)
+        flusher.mark_dirty()
+        flusher.close()
+        self.assertEqual(save.calls, 1)
+        flusher.close()
+        self.assertEqual(save.calls, 1)
+        with self.assertRaises(RuntimeError):
+            flusher.mark_dirty()
+
+    def test_sigterm_saves_pending_changes(self) -> None:
+        self.addCleanup(signal.signal, signal.SIGTERM, signal.signal(signal.SIGTERM, signal.SIG_DFL))
+        save = SaveRecorder()
+        flusher = WriteBehindFlusher(save, interval=60)
+        flusher.mark_dirty()
+        with self.assertRaises(SystemExit):
+            os.kill(os.getpid(), signal.SIGTERM)
+            time.sleep(1)
+        self.assertEqual(save.calls, 1)
+        self.assertEqual(signal.getsignal(signal.SIGTERM), signal.SIG_DFL)
+
+    def test_failed_saves_are_retried(self) -> None:
+        save = SaveRecorder(fail_times=1)
+        flusher = WriteBehindFlusher(save, interval=60)
+        flusher.mark_dirty()
+        with self.assertRaises(OSError):
+            flusher.flush()
+        self.assertEqual(flusher.pending_changes, 1)
+        flusher.flush()
+        self.assertEqual(save.calls, 1)
+        self.assertEqual(flusher.pending_changes, 0)
+        flusher.close()
@@ -0,0 +1,63 @@
+import json
+import pickle
+import sys
+import unittest
+from copy import deepcopy
+
+from data_server.core.adapters.adapter import DataAdapter
+from data_server.core.records import CompactRecord, RecordCompactor, compact_collections, json_default
+
+from tests.unit.fake_data import data_sample, data_sample_with_nested_items
+
+
+class TestCompactRecord(unittest.TestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.item = {'id': 1, 'author': 'Kobby Owen', 'title': 'Advanced Python'}
+        self.record = RecordCompactor().compact(self.item)
+
+    def test_behaves_like_the_dictionary(self) -> None:
+        self.assertIsInstance(self.record, CompactRecord)
+        self.assertEqual(self.record, self.item)
+        self.assertEqual(self.record['author'], 'Kobby Owen')
+        self.assertEqual(self.record.get('missing', 'default'), 'default')
+        self.assertIn('title', self.record)
+        self.assertListEqual(list(self.record.items()), list(self.item.items()))
+        self.assertDictEqual({**self.record, 'title': 'New'}, {**self.item, 'title': 'New'})
+        with self.assertRaises(KeyError):
+            self.record['missing']
+        with self.assertRaises(TypeError):
+            self.record['title'] = 'New'  # type: ignore[index]
+
+    def test_records_with_the_same_keys_share_a_schema(self) -> None:
+        compactor = RecordCompactor()
+        first, second, third = compactor.compact_items([self.item, {**self.item, 'id': 2}, {'id': 3}])
+        self.assertIs(first._schema, second._schema)
+        self.assertIsNot(first._schema, third._schema)
+        self.assertLess(sys.getsizeof(first) + sys.getsizeof(first._values), sys.getsizeof(self.item))
+        self.assertFalse(hasattr(first, '__dict__'))
+
+    def test_serialization(self) -> None:
+        self.assertEqual(json.dumps(self.record, default=json_default), json.dumps(self.item))
+        self.assertEqual(pickle.loads(pickle.dumps(self.record)), self.item)
+        with self.assertRaises(TypeError):
+            json.dumps(object(), default=json_default)
+
+    def test_compact_collections(self) -> None:
+        data = deepcopy(data_sample_with_nested_items)
+        compact_collections(data)
+        self.assertIsInstance(data['posts']['comments']['all'][0], CompactRecord)
+        self.assertEqual(data, data_sample_with_nested_items)
+
+
+class TestCompactRecordsInAdapter(unittest.TestCase):
+    def test_read_and_write_requests(self) -> None:
+        adapter = DataAdapter(data_sample, compact_records=True, autogenerate_id=True)
+        self.assertIsInstance(adapter.get_data()['books'][0], CompactRecord)
+        self.assertEqual(adapter.execute_get_item_request('/books', 1)['title'], 'Advanced Python')
+        items = adapter.execute_get_request('/books', author='Kobby Owen', sort_by='title')
+        self.assertListEqual([item['id'] for item in items], [1, 15])
+        patched = adapter.execute_patch_request('/books', 1, {'title': 'Python In 30 Days'})
+        self.assertIs(type(patched), dict)
+        self.assertIs(type(adapter.execute_get_item_request('/books', 1)), dict)
+        self.assertIsInstance(adapter.execute_get_item_request('/books', 2), CompactRecord)
@@ -75,6 +75,11 @@ class TestServerInitialization(TestCase):
         # mocked_logger.setLevel.assert_called
         server.shutdown()
 
+    def test_shutdown_closes_the_request_handler(self) -> None:
+        request_handler = MagicMock()
+        Server(request_handler).shutdown()
+        request_handler.close.assert_called_once()
+
 
 class TestRequesthandling(TestCase):
     def setUp(self) -> None:
@@ -107,7 +112,7 @@ class TestRequesthandling(TestCase):
     def test_request_with_url_prefix(self) -> None:
         server = Server(default_handler, url_path_prefix='/api/v3.1/')
         server(self.plain_environ_with_url_prefix, self.fake_start_response)
-        target_response = json.dumps(default_handler('GET', '/books/20', {}, {}))
+        target_response = json.dumps(default_handler('GET', '/books/20', {}, {}), separators=(',', ':')).encode()
         self.assertTrue(self.response_adapter_mock.called)
         self.response_adapter_mock.assert_called_with(
             target_response,
@@ -122,9 +127,11 @@ class TestRequesthandling(TestCase):
             server(self.plain_environ, self.fake_start_response)
 
     def test_request_with_additional_headers(self) -> None:
-        server = Server(default_handler, url_path_prefix='', additional_headers='X-Range: 20; X-Limit: 30')
+        server = Server(
+            default_handler, url_path_prefix='', additional_headers='X-Range: 20; X-Limit: 30', json_codec='json'
+        )
         server(self.plain_environ, self.fake_start_response)
-        target_response = json.dumps(default_handler('GET', '/books/20', {}, {}))
+        target_response = json.dumps(default_handler('GET', '/books/20', {}, {}), separators=(',', ':')).encode()
         self.assertTrue(self.response_adapter_mock.called)
         self.response_adapter_mock.assert_called_with(
             target_response,
@@ -136,7 +143,9 @@ class TestRequesthandling(TestCase):
     def test_request_with_json_body(self) -> None:
         server = Server(default_handler)
         server(self.environ_with_data, self.fake_start_response)
-        target_response = json.dumps(default_handler('POST', '/books/20', {}, self.data))
+        target_response = json.dumps(
+            default_handler('POST', '/books/20', {}, self.data), separators=(',', ':')
+        ).encode()
         self.assertTrue(self.response_adapter_mock.called)
         self.response_adapter_mock.assert_called_with(
             target_response,
@@ -161,7 +170,7 @@ class TestRequesthandling(TestCase):
         server(self.options_environ, self.fake_start_response)
         self.assertTrue(self.response_adapter_mock.called)
         self.response_adapter_mock.assert_called_with(
-            '',
+            b'',
             status=200,
             headers={
                 'Access-Control-Allow-Methods': 'GET, POST, PUT, PATCH, DELETE, OPTIONS',
@@ -201,7 +210,9 @@ class TestErrorHandling(TestCase):
 
         server = Server(handler)
         server(self.plain_environ_with_url_prefix, self.fake_start_response)
-        target_response = json.dumps({'error': {'description': 'Not Found', 'code': 404, 'details': 'Not Found, 404'}})
+        target_response = json.dumps(
+            {'error': {'description': 'Not Found', 'code': 404, 'details': 'Not Found, 404'}}, separators=(',', ':')
+        ).encode()
         self.assertTrue(self.response_adapter_mock.called)
         self.response_adapter_mock.assert_called_with(
             target_response,
@@ -216,7 +227,9 @@ class TestErrorHandling(TestCase):
 
         server = Server(handler)
         server(self.plain_environ_with_url_prefix, self.fake_start_response)
-        target_response = json.dumps({'error': {'description': 'Not Found', 'code': 500, 'details': None}})
+        target_response = json.dumps(
+            {'error': {'description': 'Not Found', 'code': 500, 'details': None}}, separators=(',', ':')
+        ).encode()
         self.assertTrue(self.response_adapter_mock.called)
         self.response_adapter_mock.assert_called_with(
             target_response,
@@ -0,0 +1,67 @@
+import os
+import pickle
+import tempfile
+import unittest
+
+from data_server.core.adapters.csv_adapter import CsvAdapter
+from data_server.core.adapters.json_adapter import JSONAdapter
+from data_server.core.csv_schema import INFERRED_TYPES, CsvSchema
+from data_server.core.startup_cache import StartupCache
+
+
+class TestStartupCache(unittest.TestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.path = os.path.join(self.directory.name, 'data.json')
+        self.write('{"books": [{"id": 1}]}')
+
+    def write(self, content: str) -> None:
+        with open(self.path, 'w') as data_file:
+            data_file.write(content)
+
+    def test_load_saved_data(self) -> None:
+        cache = StartupCache(self.path, ('json',))
+        self.assertIsNone(cache.load())
+        self.assertTrue(cache.save({'books': []}, 'state'))
+        self.assertEqual(StartupCache(self.path, ('json',)).load(), ({'books': []}, 'state'))
+        self.assertIsNone(StartupCache(self.path, ('csv',)).load())
+
+    def test_changed_source_is_not_loaded(self) -> None:
+        StartupCache(self.path, ()).save({}, None)
+        self.write('{"books": [{"id": 2}]}')
+        self.assertIsNone(StartupCache(self.path, ()).load())
+
+    def test_unreadable_cache_is_ignored(self) -> None:
+        with open(self.path + '.cache', 'wb') as cache_file:
+            cache_file.write(b'not a pickle')
+        with self.assertLogs('data_server', 'WARNING'):
+            self.assertIsNone(StartupCache(self.path, ()).load())
+
+    def test_data_that_cannot_be_pickled_is_not_saved(self) -> None:
+        with self.assertLogs('data_server', 'WARNING'):
+            self.assertFalse(StartupCache(self.path, ()).save({'books': [lambda: None]}, None))
+        self.assertFalse(os.path.exists(self.path + '.cache'))
+
+    def test_adapter_loads_cache(self) -> None:
+        JSONAdapter(self.path, startup_cache=True)
+        with open(self.path + '.cache', 'rb') as cache_file:
+            pickle.load(cache_file)
+            data, _ = pickle.load(cache_file)
+        data['books'].append({'id': 2})
+        StartupCache(self.path, JSONAdapter(self.path)._read_options()).save(data, None)
+        self.assertEqual(len(JSONAdapter(self.path, startup_cache=True).get_data()['books']), 2)
+        self.assertEqual(len(JSONAdapter(self.path, startup_cache=True, streaming=True).get_data()['books']), 1)
+
+    def test_csv_adapter_restores_columns_and_types(self) -> None:
+        path = os.path.join(self.directory.name, 'books.csv')
+        with open(path, 'w') as csv_file:
+            csv_file.write('id,read\n1,True\n')
+        CsvAdapter(path, infer_types=True, startup_cache=True)
+        adapter = CsvAdapter(path, infer_types=True, startup_cache=True)
+        self.assertEqual(adapter.get_data(), {'books': [{'id': 1, 'read': True}]})
+        self.assertEqual(adapter._fieldnames, ['id', 'read'])
+        assert adapter.schema is not None
+        self.assertIs(adapter.schema.types['read'], INFERRED_TYPES[4])
+        self.assertIsInstance(pickle.loads(pickle.dumps(adapter.schema)), CsvSchema)
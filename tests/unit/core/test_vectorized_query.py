@@ -0,0 +1,98 @@
+import random
+import sys
+import threading
+import unittest
+from copy import deepcopy
+
+from data_server.core.data_controller import DataController
+from data_server.core.vectorized_query import VectorizedQueryEngine, np
+
+
+def make_items(count: int) -> list:
+    generator = random.Random(count)
+    return [
+        {
+            'id': index,
+            'status': generator.choice(['open', 'closed', 'pending']),
+            'score': generator.choice([0.5, 1.25, -3.0, 2.0]),
+            'count': generator.randint(0, 20),
+            'note': None if index % 11 == 0 else f'note-{index % 4}',
+        }
+        for index in range(count)
+    ]
+
+
+@unittest.skipIf(np is None, 'numpy is not installed')
+class TestVectorizedQueryEngine(unittest.TestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.data = {'items': make_items(400)}
+        self.python = DataController(deepcopy(self.data), vectorized_query_threshold=0, autogenerate_id=True)
+        self.vectorized = DataController(deepcopy(self.data), vectorized_query_threshold=10, autogenerate_id=True)
+
+    def assert_same_results(self, **filters: object) -> None:
+        expected = self.python.get_items(['items'], **filters)
+        result = self.vectorized.get_items(['items'], **filters)
+        self.assertListEqual([item['id'] for item in result], [item['id'] for item in expected])
+
+    def test_results_match_the_python_path(self) -> None:
+        for sort_by in ['id', 'status', 'score', 'count', 'missing']:
+            for order in ['asc', 'desc']:
+                for size in [5, 100, 400]:
+                    self.assert_same_results(sort_by=sort_by, order=order, size=size, page=1)
+                    self.assert_same_results(sort_by=sort_by, order=order, size=size, status='open')
+                    self.assert_same_results(sort_by=sort_by, order=order, size=size, count=3, status='closed')
+
+    def test_filter_values_of_other_types(self) -> None:
+        self.assert_same_results(count='3')
+        self.assert_same_results(count=3.0)
+        self.assert_same_results(status=1)
+        self.assert_same_results(note='note-1')
+
+    def test_writes_are_reflected(self) -> None:
+        for controller in (self.python, self.vectorized):
+            controller.get_items(['items'], sort_by='count')
+            for index in range(20):
+                controller.add_item(['items'], {'status': 'open', 'score': 0.5, 'count': index, 'note': None})
+        self.assert_same_results(sort_by='count', status='open', size=500)
+        for controller in (self.python, self.vectorized):
+            controller.patch_item(['items'], 3, {'count': 100})
+            controller.delete_item(['items'], 4)
+        self.assert_same_results(sort_by='count', order='desc', size=500)
+
+    def test_appended_items_are_buffered_until_rebuild(self) -> None:
+        engine = VectorizedQueryEngine(threshold=1, rebuild_after=2)
+        controller = DataController({'items': make_items(50)}, autogenerate_id=True)
+        controller.add_change_listener(engine.on_change)
+        items = controller.data['items']
+        engine.query(items, {}, 'id', None)
+        controller.add_item(['items'], {'count': 1})
+        self.assertEqual(engine._get_column_set(controller.data['items']).size, 50)
+        controller.add_item(['items'], {'count': 2})
+        self.assertEqual(engine._get_column_set(controller.data['items']).size, 52)
+
+    def test_concurrent_queries_and_writes(self) -> None:
+        engine = VectorizedQueryEngine(threshold=1, rebuild_after=1000, max_cached_collections=2)
+        controller = DataController({'items': make_items(200), 'other': make_items(100)}, autogenerate_id=True)
+        controller.add_change_listener(engine.on_change)
+        errors = []
+
+        def query(key: str) -> None:
+            try:
+                for _ in range(200):
+                    engine.query(controller.data[key], {'status': 'open'}, 'count', None)
+            except Exception as error:
+                errors.append(error)
+
+        # switching threads often makes the requests interleave with the writes
+        switch_interval = sys.getswitchinterval()
+        sys.setswitchinterval(1e-6)
+        self.addCleanup(sys.setswitchinterval, switch_interval)
+        threads = [threading.Thread(target=query, args=(key,)) for key in ['items', 'other', 'items']]
+        for thread in threads:
+            thread.start()
+        for index in range(200):
+            controller.add_item(['items'], {'status': 'open', 'score': 0.5, 'count': index, 'note': None})
+        for thread in threads:
+            thread.join()
+        self.assertEqual(errors, [])
@@ -0,0 +1,133 @@
+import json
+import os
+import tempfile
+import time
+import typing as t
+import unittest
+from unittest import mock
+
+import data_server.data_server_types as dt
+from data_server.core.adapters.json_adapter import JSONAdapter
+from data_server.core.data_controller import DataController
+from data_server.core.wal import WriteAheadLog
+
+
+class TestWriteAheadLog(unittest.TestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'data.json.wal')
+
+    def tearDown(self) -> None:
+        self.directory.cleanup()
+        return super().tearDown()
+
+    def test_append_and_read(self) -> None:
+        log = WriteAheadLog(self.path, fsync='always')
+        log.append(dt.Change(dt.ChangeType.ADD, ['books'], [], [], {'id': 1, 'title': 'A'}), 1)
+        log.append(dt.Change(dt.ChangeType.DELETE, ['books'], [], [], {'id': 1, 'title': 'A'}), 2)
+        log.append(dt.Change(dt.ChangeType.RESET, ['authors'], [], None), 3)
+        log.close()
+        log = WriteAheadLog(self.path)
+        changes = list(log.read())
+        log.close()
+        self.assertListEqual(
+            changes,
+            [
+                dt.Change(dt.ChangeType.ADD, ['books'], None, None, {'id': 1, 'title': 'A'}),
+                dt.Change(dt.ChangeType.DELETE, ['books'], None, None, {'id': 1}),
+                dt.Change(dt.ChangeType.RESET, ['authors'], None, None),
+            ],
+        )
+
+    def test_partly_written_last_record_is_skipped(self) -> None:
+        with open(self.path, 'w') as log_file:
+            log_file.write('{"version":1,"type":"add","path":["books"],"item":{"id":1}}\n{"version":2,"ty')
+        log = WriteAheadLog(self.path)
+        with self.assertLogs('data_server', 'WARNING'):
+            changes = list(log.read())
+        log.close()
+        self.assertEqual(len(changes), 1)
+
+    def test_truncate(self) -> None:
+        log = WriteAheadLog(self.path, fsync='never')
+        for version in range(1, 5):
+            log.append(dt.Change(dt.ChangeType.UPDATE, ['books'], [], [], {'id': version}), version)
+        log.truncate(2)
+        self.assertListEqual([change.item for change in log.read()], [{'id': 3}, {'id': 4}])
+        log.append(dt.Change(dt.ChangeType.UPDATE, ['books'], [], [], {'id': 5}), 5)
+        log.truncate()
+        self.assertListEqual(list(log.read()), [])
+        log.close()
+
+    def test_pending_records_are_synced_after_the_interval(self) -> None:
+        log = WriteAheadLog(self.path, fsync='interval', fsync_interval=0.2)
+        self.addCleanup(log.close)
+        with mock.patch('os.fsync') as fsync:
+            log.append(dt.Change(dt.ChangeType.UPDATE, ['books'], [], [], {'id': 1}), 1)
+            fsync.assert_not_called()
+            for _ in range(200):
+                if fsync.called:
+                    break
+                time.sleep(0.01)
+            fsync.assert_called_once()
+
+
+class TestApplyChange(unittest.TestCase):
+    def test_applying_changes_twice(self) -> None:
+        controller = DataController({'books': [{'id': 1, 'title': 'A'}]})
+        changes = [
+            dt.Change(dt.ChangeType.ADD, ['books'], None, None, {'id': 2, 'title': 'B'}),
+            dt.Change(dt.ChangeType.UPDATE, ['books'], None, None, {'id': 1, 'title': 'C'}),
+            dt.Change(dt.ChangeType.DELETE, ['books'], None, None, {'id': 2}),
+            dt.Change(dt.ChangeType.RESET, ['authors'], None, [{'id': 1}]),
+        ]
+        for change in changes * 2:
+            controller.apply_change(change)
+        self.assertDictEqual(controller.data, {'books': [{'id': 1, 'title': 'C'}], 'authors': [{'id': 1}]})
+        self.assertEqual(controller.version, 8)
+        controller.apply_change(dt.Change(dt.ChangeType.RESET, ['authors'], None, None))
+        self.assertNotIn('authors', controller.data)
+
+
+class TestAdapterRecovery(unittest.TestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'data.json')
+        self.addCleanup(self.directory.cleanup)
+        with open(self.path, 'w') as data_file:
+            json.dump({'books': [{'id': 1, 'title': 'A'}, {'id': 2, 'title': 'B'}]}, data_file)
+
+    def read_file(self) -> t.Any:
+        with open(self.path) as data_file:
+            return json.load(data_file)
+
+    def test_changes_are_logged_and_replayed(self) -> None:
+        adapter = JSONAdapter(self.path, write_ahead_log=True)
+        self.addCleanup(adapter.close)
+        adapter.execute_post_request('/books', {'id': 3, 'title': 'C'})
+        adapter.execute_patch_request('/books', 1, {'title': 'D'})
+        adapter.execute_delete_request('/books', 2)
+        expected = adapter.get_data()
+        self.assertListEqual([item['title'] for item in expected['books']], ['D', 'C'])
+        self.assertDictEqual(self.read_file(), {'books': [{'id': 1, 'title': 'A'}, {'id': 2, 'title': 'B'}]})
+
+        # a second adapter on the same file sees the state the first one would have lost in a crash
+        with self.assertLogs('data_server', 'INFO') as logs:
+            recovered = JSONAdapter(self.path, write_ahead_log=True)
+        self.addCleanup(recovered.close)
+        self.assertIn('Recovered 3 changes', logs.output[0])
+        self.assertDictEqual(recovered.get_data(), expected)
+        self.assertDictEqual(self.read_file(), expected)
+        self.assertEqual(os.path.getsize(self.path + '.wal'), 0)
+
+    def test_log_is_compacted_into_the_file(self) -> None:
+        adapter = JSONAdapter(self.path, write_ahead_log=True, wal_compact_after=2)
+        self.addCleanup(adapter.close)
+        adapter.execute_delete_request('/books', 1)
+        adapter.execute_delete_request('/books', 2)
+        assert adapter._log_compactor is not None
+        adapter._log_compactor.flush()
+        self.assertDictEqual(self.read_file(), {'books': []})
+        self.assertEqual(os.path.getsize(self.path + '.wal'), 0)
@@ -21,7 +21,7 @@ class TestArgumentParser(TestCase):
     def test_get_controller_arguments(self) -> None:
         sys.argv = ['argument_parser.py', 'file', '--use-timestamps', 'True']
         parser = ArgumentParser('test', 'Testing', 'Testing Epilog')
-        self.assertEqual(len(parser.get_parsed_controller_arguments()), 10)
+        self.assertEqual(len(parser.get_parsed_controller_arguments()), 12)
         self.assertTrue(parser.get_parsed_controller_arguments()['use_timestamps'])
 
     def test_get_server_arguments(self) -> None:
@@ -34,6 +34,11 @@ class TestArgumentParser(TestCase):
         self.assertEqual(len(parser.get_parsed_server_arguments()), 8)
         self.assertEqual(parser.get_parsed_server_arguments()['url_path_prefix'], '/api/v3')
 
+    def test_get_adapter_arguments(self) -> None:
+        sys.argv = ['argument_parser.py', 'file.csv', '--csv-columnar']
+        parser = ArgumentParser('test', 'Testing', 'Testing Epilog')
+        self.assertTrue(parser.get_parsed_adapter_arguments()['csv_columnar'])
+
     def test_get_parsed_arguments(self) -> None:
         sys.argv = [
             'argument_parser.py',
@@ -44,6 +49,6 @@ class TestArgumentParser(TestCase):
             'True',
         ]
         parser = ArgumentParser('test', 'Testing', 'Testing Epilog')
-        self.assertEqual(len(parser.get_parsed_arguments()), 20)
+        self.assertEqual(len(parser.get_parsed_arguments()), 47)
         self.assertEqual(parser.get_parsed_arguments()['url_path_prefix'], '/api/v3')
         self.assertTrue(parser.get_parsed_arguments()['use_timestamps'])
@@ -26,6 +26,33 @@ class TestMain(unittest.TestCase):
             'created_at_key_name': 'created_at',
             'updated_at_key_name': 'updated_at',
             'page_size': 10,
+            'parallel_scan_threshold': 0,
+            'vectorized_query_threshold': 50_000,
+            'flush_interval': 0,
+            'flush_after_changes': 100,
+            'fsync_saves': False,
+            'write_ahead_log': False,
+            'wal_fsync': 'interval',
+            'wal_compact_after': 1000,
+            'compact_records': False,
+            'intern_strings': False,
+            'startup_cache': False,
+            'compression_level': None,
+            'watch_interval': 0,
+            'json_codec': 'auto',
+            'compact_json': False,
+            'sqlite': False,
+            'sqlite_wal_mode': False,
+            'sqlite_auto_index': False,
+            'json_streaming': False,
+            'json_lazy': False,
+            'json_lazy_cache_size': 10_000,
+            'csv_columnar': False,
+            'csv_infer_types': False,
+            'csv_schema': None,
+            'csv_schema_sample_size': None,
+            'csv_lazy': False,
+            'csv_parallel_read_threshold': 0,
             'url_path_prefix': '/',
             'host': 'localhost',
             'port': 2020,